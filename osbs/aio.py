@@ -0,0 +1,538 @@
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+
+
+asyncio variants of Openshift and OSBS
+
+Requires Python 3.6+ and aiohttp. Every request is made on the event loop, so
+a single loop can follow many builds (watches, log streams) at the same time
+without spending a thread on each of them.
+"""
+
+import asyncio
+import logging
+import ssl
+import sys
+import time
+from functools import wraps
+
+from osbs import codec
+from osbs.build.build_response import BuildResponse
+from osbs.constants import (BUILD_FINISHED_STATES, BUILD_RUNNING_STATES,
+                            WATCH_ERROR, WATCH_BOOKMARK,
+                            HTTP_RETRIES_STATUS_FORCELIST, HTTP_RETRIES_METHODS_WHITELIST,
+                            HTTP_REQUEST_TIMEOUT, MERGE_PATCH_CONTENT_TYPE)
+from osbs.core import (Openshift, LogStreamState, WatchEventDecoder, check_response,
+                       relist_events, track_watched, WATCH_RETRY, WAIT_RETRY)
+from osbs.exceptions import (OsbsException, OsbsNetworkException,
+                             OsbsWatchBuildNotFound)
+from osbs.http import HttpResponse
+from six.moves import http_client
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def osbsapi_async(func):
+    """
+    asyncio counterpart of osbs.api.osbsapi: convert errors to OsbsException
+    """
+    @wraps(func)
+    async def catch_exceptions(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except (OsbsException, asyncio.CancelledError):
+            raise
+        except Exception as ex:
+            # Propogate flexmock errors immediately (used in test cases)
+            if getattr(ex, '__module__', None) == 'flexmock':
+                raise
+            raise OsbsException(cause=ex, traceback=sys.exc_info()[2])
+
+    return catch_exceptions
+
+
+class AsyncOpenshift(Openshift):
+    """
+    Openshift client with coroutine methods
+
+    URLs and authentication headers are built by the Openshift methods
+    (_build_url and _request_args). Obtaining the OAuth token may need
+    blocking calls (kerberos), so it is done in the default executor.
+
+    Use as ``async with AsyncOpenshift(...) as os:`` or call close() when
+    done, to release the connections.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        accepts the same arguments as Openshift, and in addition:
+
+        :param max_connections: int, maximum number of simultaneous
+                                connections, 0 means unlimited (each watch
+                                and log stream holds one connection)
+        """
+        if aiohttp is None:
+            raise RuntimeError('aiohttp is required for asyncio support')
+
+        self.max_connections = kwargs.pop('max_connections', 0)
+        super(AsyncOpenshift, self).__init__(*args, **kwargs)
+        self._session = None
+        self._token_lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _ssl_context(self, ca=None, client_cert=None, client_key=None):
+        if not self.verify_ssl:
+            return False
+
+        if not (ca or client_cert):
+            return True
+
+        context = ssl.create_default_context(cafile=ca)
+        if client_cert:
+            context.load_cert_chain(client_cert, client_key)
+        return context
+
+    def _get_session(self, **kwargs):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                             ssl=self._ssl_context(**kwargs))
+            # cookies are not used by OpenShift API, don't keep them
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  cookie_jar=aiohttp.DummyCookieJar())
+        return self._session
+
+    async def _ensure_token(self, with_auth):
+        if not (with_auth and self.use_auth and self.token is None):
+            return
+
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+
+        async with self._token_lock:
+            if self.token is None:
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(None, self.get_oauth_token)
+
+    async def _open(self, method, url, with_auth=True, data=None, headers=None,
+                    timeout=HTTP_REQUEST_TIMEOUT):
+        """
+        send request and return aiohttp response with unread body
+
+        Requests are retried the same way as in HttpSession.
+
+        :param timeout: float, seconds to wait for connecting and for each
+                        read; the whole request is not limited, so streams
+                        can stay open as long as data keeps coming
+        """
+        await self._ensure_token(with_auth)
+        headers, kwargs = self._request_args(with_auth, headers=headers or {})
+        session = self._get_session(**kwargs)
+        client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout,
+                                               sock_read=timeout)
+
+        policy = None
+        if self.retries_enabled and method.upper() in HTTP_RETRIES_METHODS_WHITELIST:
+            policy = self.retry_policy
+
+        started = time.time()
+        attempt = 0
+        while True:
+            try:
+                response = await session.request(method, url, data=data, headers=headers,
+                                                 allow_redirects=False,
+                                                 timeout=client_timeout)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as ex:
+                delay = policy.next_delay(attempt, started) if policy else None
+                if delay is None:
+                    raise OsbsNetworkException(url, str(ex), '',
+                                               cause=ex, traceback=sys.exc_info()[2])
+                logger.debug("%s %s failed: %r", method.upper(), url, ex)
+            except aiohttp.ClientError as ex:
+                raise OsbsException(cause=ex, traceback=sys.exc_info()[2])
+            else:
+                if policy is None:
+                    return response
+                if response.status not in HTTP_RETRIES_STATUS_FORCELIST:
+                    policy.succeeded()
+                    return response
+
+                response.release()
+                delay = policy.next_delay(attempt, started)
+                if delay is None:
+                    raise OsbsNetworkException(url, "giving up after %d retries" % attempt,
+                                               response.status)
+                logger.debug("%s %s returned %d", method.upper(), url, response.status)
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _request(self, method, url, with_auth=True, **kwargs):
+        response = await self._open(method, url, with_auth=with_auth, **kwargs)
+        try:
+            content = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            raise OsbsNetworkException(url, str(ex), response.status,
+                                       cause=ex, traceback=sys.exc_info()[2])
+        finally:
+            response.release()
+        return HttpResponse(response.status, response.headers, content)
+
+    async def _iter_lines(self, url, with_auth=True, **kwargs):
+        """
+        stream response body line by line
+
+        Lines are yielded as bytes, without the line separator. Connection
+        errors while reading, including read timeouts, simply end the
+        stream, like in HttpStream.
+        """
+        response = await self._open("get", url, with_auth=with_auth, **kwargs)
+        try:
+            if response.status not in (http_client.OK, http_client.CREATED):
+                content = await response.read()
+                check_response(HttpResponse(response.status, response.headers, content))
+
+            pending = b''
+            try:
+                async for chunk in response.content.iter_any():
+                    lines = (pending + chunk).split(b'\n')
+                    pending = lines.pop()
+                    for line in lines:
+                        yield line.rstrip(b'\r')
+            except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError) as ex:
+                logger.debug("stream interrupted: %r", ex)
+            if pending:
+                yield pending.rstrip(b'\r')
+        finally:
+            response.close()
+
+    async def get_build(self, build_id):
+        url = self._build_url("builds/%s/" % build_id)
+        response = await self._request("get", url)
+        check_response(response)
+        return response
+
+    async def list_builds(self, build_config_id=None, koji_task_id=None,
+                          field_selector=None, labels=None):
+        query = self._list_builds_query(build_config_id=build_config_id,
+                                        koji_task_id=koji_task_id,
+                                        field_selector=field_selector,
+                                        labels=labels)
+        url = self._build_url("builds/", **query)
+        return await self._request("get", url)
+
+    async def create_build(self, build_json):
+        url = self._build_url("builds/")
+        logger.debug(build_json)
+        return await self._request("post", url, data=codec.dumpb(build_json),
+                                   headers={"Content-Type": "application/json"})
+
+    async def cancel_build(self, build_id):
+        url = self._build_url("builds/%s/" % build_id)
+        if self.use_patch:
+            response = await self._request("patch", url,
+                                           data=codec.dumpb({'status': {'cancelled': True}}),
+                                           headers={"Content-Type": MERGE_PATCH_CONTENT_TYPE})
+            if response.status_code not in (http_client.METHOD_NOT_ALLOWED,
+                                            http_client.UNSUPPORTED_MEDIA_TYPE):
+                return response
+            logger.info("PATCH rejected by server (%d), using GET and PUT",
+                        response.status_code)
+            self.use_patch = False
+
+        response = await self.get_build(build_id)
+        br = BuildResponse(response.json())
+        br.cancelled = True
+        return await self._request("put", url, data=codec.dumpb(br.json),
+                                   headers={"Content-Type": "application/json"})
+
+    async def watch_resource(self, resource_type, resource_name=None, names=None,
+                             on_relist=None, **request_args):
+        """
+        watch changes of resource(s), see Openshift.watch_resource
+        """
+        path = "watch/namespaces/%s/%s/" % (self.namespace, resource_type)
+        if resource_name is not None:
+            path += "%s/" % resource_name
+        resource_version = request_args.pop('resourceVersion', None)
+        decoder = WatchEventDecoder(names=names)
+        seen = set()
+
+        failures = 0
+        while failures < WATCH_RETRY:
+            query = dict(request_args)
+            if resource_version is not None:
+                query['resourceVersion'] = resource_version
+            url = self._build_url(path, _prepend_namespace=False, **query)
+
+            received = False
+            expired = False
+            lines = self._iter_lines(url)
+            try:
+                async for line in lines:
+                    if not line:
+                        continue
+                    if decoder.skip(line):
+                        received = True
+                        resource_version = decoder.skipped_resource_version or resource_version
+                        continue
+
+                    event = decoder.decode(line)
+                    if event is None:
+                        continue
+                    logger.debug("watch event: %s", event[0])
+
+                    changetype, obj = event
+                    if changetype == WATCH_ERROR and obj.get('code') == http_client.GONE:
+                        expired = True
+                        break
+
+                    received = True
+                    metadata = obj.get('metadata') or {}
+                    resource_version = metadata.get('resourceVersion', resource_version)
+                    if changetype != WATCH_BOOKMARK:
+                        track_watched(seen, changetype, obj)
+                        yield event
+            except OsbsException as ex:
+                status_code = getattr(ex, 'status_code', None)
+                if status_code == http_client.GONE:
+                    expired = True
+                elif not self._is_watch_retryable(ex) or failures + 1 >= WATCH_RETRY:
+                    raise
+                else:
+                    logger.warning("watch failed: %r", ex)
+            finally:
+                await lines.aclose()
+
+            if expired:
+                logger.info("resourceVersion %s is too old, listing %s again",
+                            resource_version, resource_type)
+                objects, resource_version = await self._list_for_watch(resource_type,
+                                                                       resource_name,
+                                                                       request_args,
+                                                                       names=names)
+                if on_relist is not None:
+                    on_relist(objects, resource_version)
+                else:
+                    for event in relist_events(objects, seen):
+                        yield event
+                failures = 0
+                continue
+
+            if received:
+                failures = 0
+                logger.debug("connection closed, resuming from resourceVersion %s",
+                             resource_version)
+                continue
+
+            failures += 1
+            delay = self._watch_backoff(failures)
+            logger.debug("connection closed, reconnecting in %.1fs", delay)
+            await asyncio.sleep(delay)
+
+    async def _list_for_watch(self, resource_type, resource_name, request_args, names=None):
+        selectors = dict((key, value) for key, value in request_args.items()
+                         if key in ('fieldSelector', 'labelSelector'))
+        if resource_name is not None:
+            url = self._build_url("%s/%s/" % (resource_type, resource_name))
+            response = await self._request("get", url)
+            if response.status_code == http_client.NOT_FOUND:
+                return [], None
+            check_response(response)
+            obj = response.json()
+            return [obj], (obj.get('metadata') or {}).get('resourceVersion')
+
+        url = self._build_url("%s/" % resource_type, **selectors)
+        response = await self._request("get", url)
+        check_response(response)
+        list_json = response.json()
+        objects = list_json.get('items') or []
+        if names is not None:
+            objects = [obj for obj in objects
+                       if (obj.get('metadata') or {}).get('name') in names]
+        return objects, (list_json.get('metadata') or {}).get('resourceVersion')
+
+    async def stream_logs(self, build_id, stats=None):
+        """
+        stream logs from build, see Openshift.stream_logs
+        """
+        state = LogStreamState(stats)
+
+        # If connection is closed within this many seconds, give up:
+        min_idle_timeout = 60
+
+        last_activity = time.time()
+        while True:
+            buildlogs_url = self._build_url("builds/%s/log/" % build_id,
+                                            **state.query())
+            try:
+                async for line in self._iter_lines(buildlogs_url):
+                    last_activity = time.time()
+                    line = state.accept(line)
+                    if line is not None:
+                        yield line
+            except OsbsNetworkException as exc:
+                if exc.status_code:
+                    raise
+
+            idle = time.time() - last_activity
+            logger.debug("connection closed after %ds", idle)
+            if idle < min_idle_timeout:
+                # Finish output
+                logger.debug("log of %s streamed: %s", build_id, state.stats)
+                return
+
+            state.reconnecting()
+
+    async def wait(self, build_id, states):
+        logger.info("watching build '%s'", build_id)
+        async for changetype, obj in self.watch_resource("builds", build_id, names={build_id}):
+            if self._is_build_in_states(build_id, states, changetype, obj):
+                return obj
+
+        logger.warning("build '%s' was not found during wait", build_id)
+        raise OsbsWatchBuildNotFound("build '%s' was not found and response stream ended" %
+                                     build_id)
+
+    async def wait_for_build_to_finish(self, build_id):
+        for retry in range(WAIT_RETRY):
+            try:
+                return await self.wait(build_id, BUILD_FINISHED_STATES)
+            except OsbsWatchBuildNotFound:
+                logger.warning("I'm going to wait again. Retry #%d.", retry)
+                continue
+        raise OsbsException("Failed to wait for a build: %s" % build_id)
+
+    async def wait_for_build_to_get_scheduled(self, build_id):
+        for retry in range(WAIT_RETRY):
+            try:
+                return await self.wait(build_id,
+                                       BUILD_FINISHED_STATES + BUILD_RUNNING_STATES)
+            except OsbsWatchBuildNotFound:
+                continue
+        raise OsbsException('Failed to schedule a build in {0} attempts: {1}'.format(WAIT_RETRY,
+                                                                                     build_id))
+
+
+class AsyncOSBS(object):
+    """
+    asyncio counterpart of osbs.api.OSBS for following builds
+
+    Creating a build involves cloning git repositories and rendering
+    templates, so create_build() runs OSBS.create_build in the default
+    executor; all other methods only talk to OpenShift and run on the loop.
+    """
+
+    def __init__(self, openshift_configuration, build_configuration, max_connections=0):
+        # avoid circular import, osbs.api imports osbs.core
+        from osbs.api import OSBS
+
+        self.os_conf = openshift_configuration
+        self.build_conf = build_configuration
+        self.osbs = OSBS(openshift_configuration, build_configuration)
+        self.os = AsyncOpenshift(openshift_api_url=self.os_conf.get_openshift_api_uri(),
+                                 openshift_api_version=self.os_conf.get_openshift_api_version(),
+                                 openshift_oauth_url=self.os_conf.get_openshift_oauth_api_uri(),
+                                 k8s_api_url=self.os_conf.get_k8s_api_uri(),
+                                 verbose=self.os_conf.get_verbosity(),
+                                 username=self.os_conf.get_username(),
+                                 password=self.os_conf.get_password(),
+                                 use_kerberos=self.os_conf.get_use_kerberos(),
+                                 client_cert=self.os_conf.get_client_cert(),
+                                 client_key=self.os_conf.get_client_key(),
+                                 kerberos_keytab=self.os_conf.get_kerberos_keytab(),
+                                 kerberos_principal=self.os_conf.get_kerberos_principal(),
+                                 kerberos_ccache=self.os_conf.get_kerberos_ccache(),
+                                 use_auth=self.os_conf.get_use_auth(),
+                                 verify_ssl=self.os_conf.get_verify_ssl(),
+                                 token=self.os_conf.get_oauth2_token(),
+                                 namespace=self.os_conf.get_namespace(),
+                                 max_connections=max_connections)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        await self.os.close()
+
+    @osbsapi_async
+    async def get_build(self, build_id):
+        response = await self.os.get_build(build_id)
+        return BuildResponse(response.json(), self.osbs)
+
+    @osbsapi_async
+    async def list_builds(self, field_selector=None, koji_task_id=None, running=None,
+                          labels=None):
+        if running:
+            running_fs = ",".join(["status!={status}".format(status=status.capitalize())
+                                  for status in BUILD_FINISHED_STATES])
+            if not field_selector:
+                field_selector = running_fs
+            else:
+                field_selector = ','.join([field_selector, running_fs])
+        response = await self.os.list_builds(field_selector=field_selector,
+                                             koji_task_id=koji_task_id, labels=labels)
+        return [BuildResponse(build, self.osbs) for build in response.json()["items"]]
+
+    @osbsapi_async
+    async def create_build(self, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, lambda: self.osbs.create_build(**kwargs))
+
+    @osbsapi_async
+    async def cancel_build(self, build_id):
+        response = await self.os.cancel_build(build_id)
+        return BuildResponse(response.json(), self.osbs)
+
+    async def watch_builds(self, field_selector=None):
+        kwargs = {}
+        if field_selector is not None:
+            kwargs['fieldSelector'] = field_selector
+
+        async for changetype, obj in self.os.watch_resource("builds", **kwargs):
+            yield changetype, obj
+
+    async def get_build_logs(self, build_id, decode=False):
+        """
+        follow logs of a running build
+
+        :param build_id: str
+        :param decode: bool, whether or not to decode logs as utf-8
+        :return: async iterator of bytes (or str when decoding)
+        """
+        async for line in self.os.stream_logs(build_id):
+            if decode:
+                line = line.decode("utf-8").rstrip()
+            yield line
+
+    @osbsapi_async
+    async def wait_for_build_to_finish(self, build_id):
+        response = await self.os.wait_for_build_to_finish(build_id)
+        return BuildResponse(response, self.osbs)
+
+    @osbsapi_async
+    async def wait_for_build_to_get_scheduled(self, build_id):
+        response = await self.os.wait_for_build_to_get_scheduled(build_id)
+        return BuildResponse(response, self.osbs)
@@ -20,6 +20,7 @@ from functools import wraps
 from contextlib import contextmanager
 from types import GeneratorType
 
+from osbs.build.build_json_store import BuildJsonStore
 from osbs.build.build_request import BuildRequest
 from osbs.build.build_requestv2 import BuildRequestV2
 from osbs.build.user_params import BuildUserParams
@@ -34,10 +35,13 @@ from osbs.constants import (BUILD_RUNNING_STATES, WORKER_OUTER_TEMPLATE,
                             BUILD_TYPE_ORCHESTRATOR, BUILD_FINISHED_STATES,
                             DEFAULT_ARRANGEMENT_VERSION, REACTOR_CONFIG_ARRANGEMENT_VERSION,
                             ANNOTATION_SOURCE_REPO, ANNOTATION_INSECURE_REPO, FILTER_KEY,
-                            RELEASE_LABEL_FORMAT)
+                            RELEASE_LABEL_FORMAT, DEFAULT_PAGE_SIZE)
+from osbs.cache import BuildCache
 from osbs.core import Openshift
+from osbs.logs import OrchestratorLogDemultiplexer, LogFileWriter
 from osbs.exceptions import (OsbsException, OsbsValidationException, OsbsResponseException,
                              OsbsOrchestratorNotEnabled)
+from osbs.repo_utils import RepoInfoCache
 # import utils in this way, so that we can mock standalone functions with flexmock
 from osbs import utils
 from osbs.utils import retry_on_conflict, graceful_chain_get
@@ -77,6 +81,7 @@ def osbsapi(func):
 logger = logging.getLogger(__name__)
 
 LogEntry = namedtuple('LogEntry', ['platform', 'line'])
+BuildResult = namedtuple('BuildResult', ['index', 'request', 'response', 'error'])
 
 
 class OSBS(object):
@@ -110,20 +115,106 @@ class OSBS(object):
                             use_auth=self.os_conf.get_use_auth(),
                             verify_ssl=self.os_conf.get_verify_ssl(),
                             token=self.os_conf.get_oauth2_token(),
-                            namespace=self.os_conf.get_namespace())
+                            namespace=self.os_conf.get_namespace(),
+                            http_pool_maxsize=self.os_conf.get_http_pool_maxsize(),
+                            http_keepalive=self.os_conf.get_http_keepalive(),
+                            api_qps=self.os_conf.get_api_qps(),
+                            api_burst=self.os_conf.get_api_burst(),
+                            api_stream_qps=self.os_conf.get_api_stream_qps(),
+                            api_stream_burst=self.os_conf.get_api_stream_burst())
         self._bm = None
+        self._build_cache = None
+
+        self._repo_info_cache = None
+        repo_info_cache_dir = self.os_conf.get_repo_info_cache_dir()
+        if repo_info_cache_dir:
+            self._repo_info_cache = RepoInfoCache(repo_info_cache_dir,
+                                                  self.os_conf.get_repo_info_cache_size())
+
+    @osbsapi
+    def enable_build_cache(self, timeout=None):
+        """
+        answer build queries from local cache kept up to date by watching builds
+
+        :param timeout: float, seconds to wait for the cache to get populated;
+                        until then, queries go to OpenShift
+        :return: BuildCache instance
+        """
+        if self._build_cache is None:
+            self._build_cache = BuildCache(self.os)
+        self._build_cache.start(timeout=timeout)
+        return self._build_cache
+
+    @osbsapi
+    def disable_build_cache(self):
+        if self._build_cache is not None:
+            self._build_cache.stop()
+            self._build_cache = None
+
+    def _list_build_items(self, **kwargs):
+        """
+        list builds as dicts, from the build cache when possible
+
+        :param kwargs: criteria accepted by Openshift.list_builds and
+                       optional page_size to fetch builds in pages
+        :return: list of dicts
+        """
+        page_size = kwargs.pop('page_size', None)
+        cache = self._build_cache
+        if cache is not None and cache.synced:
+            items = cache.list(**kwargs)
+            if items is not None:
+                return items
+
+        if page_size is not None:
+            return list(self.os.iter_builds(page_size=page_size, **kwargs))
+
+        response = self.os.list_builds(**kwargs)
+        return response.json()['items']
 
     @osbsapi
     def list_builds(self, field_selector=None, koji_task_id=None, running=None,
-                    labels=None):
+                    labels=None, page_size=None):
         """
         List builds with matching fields
 
         :param field_selector: str, field selector for Builds
         :param koji_task_id: str, only list builds for Koji Task ID
+        :param page_size: int, fetch builds in pages of this size to keep
+                          responses small, None fetches all at once
         :return: BuildResponse list
         """
+        field_selector = self._running_field_selector(field_selector, running)
+        kwargs = {}
+        if page_size is not None:
+            kwargs['page_size'] = page_size
+        items = self._list_build_items(field_selector=field_selector,
+                                       koji_task_id=koji_task_id, labels=labels, **kwargs)
+        build_list = []
+        for build in items:
+            build_list.append(BuildResponse(build, self))
+
+        return build_list
+
+    @osbsapi
+    def iter_builds(self, field_selector=None, koji_task_id=None, running=None,
+                    labels=None, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Iterate over builds with matching fields, fetching them in pages
 
+        :param field_selector: str, field selector for Builds
+        :param koji_task_id: str, only list builds for Koji Task ID
+        :param page_size: int, number of builds fetched in one request
+        :return: generator of BuildResponse instances
+        """
+        field_selector = self._running_field_selector(field_selector, running)
+        for build in self.os.iter_builds(field_selector=field_selector,
+                                         koji_task_id=koji_task_id, labels=labels,
+                                         page_size=page_size):
+            yield BuildResponse(build, self)
+
+    @staticmethod
+    def _running_field_selector(field_selector, running):
         if running:
             running_fs = ",".join(["status!={status}".format(status=status.capitalize())
                                   for status in BUILD_FINISHED_STATES])
@@ -131,14 +222,7 @@ class OSBS(object):
                 field_selector = running_fs
             else:
                 field_selector = ','.join([field_selector, running_fs])
-        response = self.os.list_builds(field_selector=field_selector,
-                                       koji_task_id=koji_task_id, labels=labels)
-        serialized_response = response.json()
-        build_list = []
-        for build in serialized_response["items"]:
-            build_list.append(BuildResponse(build, self))
-
-        return build_list
+        return field_selector
 
     def watch_builds(self, field_selector=None):
         kwargs = {}
@@ -150,6 +234,12 @@ class OSBS(object):
 
     @osbsapi
     def get_build(self, build_id):
+        cache = self._build_cache
+        if cache is not None and cache.synced:
+            build_json = cache.get(build_id)
+            if build_json is not None:
+                return BuildResponse(build_json, self)
+
         response = self.os.get_build(build_id)
         build_response = BuildResponse(response.json(), self)
         return build_response
@@ -233,7 +323,7 @@ class OSBS(object):
         return build_response
 
     def _get_running_builds_for_build_config(self, build_config_id):
-        all_builds_for_bc = self.os.list_builds(build_config_id=build_config_id).json()['items']
+        all_builds_for_bc = self._list_build_items(build_config_id=build_config_id)
         running = []
         for b in all_builds_for_bc:
             br = BuildResponse(b, self)
@@ -242,7 +332,7 @@ class OSBS(object):
         return running
 
     def _get_not_cancelled_builds_for_koji_task(self, koji_task_id):
-        all_builds_for_task = self.os.list_builds(koji_task_id=koji_task_id).json()['items']
+        all_builds_for_task = self._list_build_items(koji_task_id=koji_task_id)
         not_cancelled = []
 
         for b in all_builds_for_task:
@@ -271,7 +361,7 @@ class OSBS(object):
                        new_labels)
                 raise OsbsValidationException(msg)
 
-    def _get_existing_build_config(self, build_config):
+    def _get_existing_build_config(self, build_config, concurrent=False):
         """
         Uses the given build config to find an existing matching build config.
         Build configs are a match if:
@@ -282,6 +372,9 @@ class OSBS(object):
           metadata.spec.source.git.uri are equal
         OR
         - metadata.name are equal
+
+        :param concurrent: bool, send all queries at once instead of stopping
+                           at the first one which finds a build config
         """
 
         bc_labels = build_config['metadata']['labels']
@@ -303,19 +396,29 @@ class OSBS(object):
             (self.os.get_build_config, name),
         )
 
-        existing_bc = None
-        for func, kwargs in queries:
+        def query(func, kwargs):
             try:
-                existing_bc = func(**kwargs)
-                # build config found
-                break
+                return func(**kwargs)
             except OsbsException as exc:
                 # doesn't exist
                 logger.info('Build config NOT found via %s: %s',
                             func.__name__, str(exc))
-                continue
+                return None
 
-        return existing_bc
+        if concurrent:
+            results, _ = utils.run_in_parallel([
+                (i, lambda func=func, kwargs=kwargs: query(func, kwargs))
+                for i, (func, kwargs) in enumerate(queries)])
+            lookups = (results[i] for i in range(len(queries)))
+        else:
+            lookups = (query(func, kwargs) for func, kwargs in queries)
+
+        for existing_bc in lookups:
+            if existing_bc is not None:
+                # build config found
+                return existing_bc
+
+        return None
 
     def _verify_running_builds(self, build_config_name):
         running_builds = self._get_running_builds_for_build_config(build_config_name)
@@ -448,10 +551,15 @@ class OSBS(object):
 
         build_config_name = build_json['metadata']['name']
         logger.debug('build config to be named "%s"', build_config_name)
-        existing_bc = self._get_existing_build_config(build_json)
-
-        image_stream, image_stream_tag_name = \
-            self._get_image_stream_info_for_build_request(build_request)
+        results, timings = utils.run_in_parallel([
+            ('build_config',
+             lambda: self._get_existing_build_config(build_json, concurrent=True)),
+            ('image_stream',
+             lambda: self._get_image_stream_info_for_build_request(build_request)),
+        ])
+        logger.info("build config lookup stages: %s", utils.format_timings(timings))
+        existing_bc = results['build_config']
+        image_stream, image_stream_tag_name = results['image_stream']
 
         # Remove triggers in BuildConfig to avoid accidental
         # auto instance of Build. If defined, triggers will
@@ -593,11 +701,34 @@ class OSBS(object):
                 # fix for module requires will have to be determined from experience.
                 raise ValueError("Flatpak build cannot be isolated")
 
-        repo_info = utils.get_repo_info(git_uri, git_ref, git_branch=git_branch)
-        build_request = self.get_build_request(inner_template=inner_template,
-                                               outer_template=outer_template,
-                                               customize_conf=customize_conf,
-                                               arrangement_version=arrangement_version)
+        def get_build_request():
+            build_request = self.get_build_request(inner_template=inner_template,
+                                                   outer_template=outer_template,
+                                                   customize_conf=customize_conf,
+                                                   arrangement_version=arrangement_version)
+            try:
+                build_request.load_templates()
+            except Exception as ex:
+                # raised again when the build request is rendered
+                logger.debug("failed to load templates: %r", ex)
+            return build_request
+
+        # independent steps, run them at the same time
+        stages = [
+            ('repo_info', lambda: utils.get_repo_info(git_uri, git_ref, git_branch=git_branch,
+                                                      cache=self._repo_info_cache)),
+            ('build_request', get_build_request),
+        ]
+        if koji_task_id and build_type == BUILD_TYPE_ORCHESTRATOR:
+            # try to find build for koji_task which isn't canceled and use that one
+            stages.append(('koji_task_builds',
+                           lambda: self._get_not_cancelled_builds_for_koji_task(koji_task_id)))
+
+        results, timings = utils.run_in_parallel(stages)
+        logger.info("build pre-flight stages: %s", utils.format_timings(timings))
+        repo_info = results['repo_info']
+        build_request = results['build_request']
+        builds_for_koji_task = results.get('koji_task_builds', [])
 
         if flatpak:
             req_labels, base_image = self._get_flatpak_labels(repo_info)
@@ -693,11 +824,6 @@ class OSBS(object):
         build_request.set_openshift_required_version(self.os_conf.get_openshift_required_version())
         build_request.set_repo_info(repo_info)
 
-        builds_for_koji_task = []
-        if koji_task_id and build_type == BUILD_TYPE_ORCHESTRATOR:
-            # try to find build for koji_task which isn't canceled and use that one
-            builds_for_koji_task = self._get_not_cancelled_builds_for_koji_task(koji_task_id)
-
         builds_count = len(builds_for_koji_task)
         if builds_count == 1:
             logger.info("found running build for koji task: %s" %
@@ -848,6 +974,154 @@ class OSBS(object):
 
             raise
 
+    @osbsapi
+    def create_builds(self, build_requests, max_workers=None, qps=None):
+        """
+        Create many builds concurrently
+
+        Every request is a dict of keyword arguments for
+        create_orchestrator_build, or for create_worker_build when its
+        'build_type' is BUILD_TYPE_WORKER. All submissions share this
+        instance's connection pool and parsed templates.
+
+        :param build_requests: list of dicts, one per build
+        :param max_workers: int, max number of builds submitted at the same
+                            time, defaults to the HTTP connection pool size
+        :param qps: float, max number of submissions started per second,
+                    unlimited if not set
+        :return: generator of BuildResult instances, in order of completion;
+                 each has either 'response' (BuildResponse) or 'error'
+                 (OsbsException) set
+        """
+        build_requests = list(build_requests)
+
+        def submit(request):
+            kwargs = dict(request)
+            if kwargs.pop('build_type', None) == BUILD_TYPE_WORKER:
+                return self.create_worker_build(**kwargs)
+            return self.create_orchestrator_build(**kwargs)
+
+        return self._run_on_many(submit, build_requests, 'submit', max_workers, qps)
+
+    def _run_on_many(self, func, items, action, max_workers=None, qps=None):
+        """
+        call func for every item from a bounded pool of threads
+
+        :param func: callable, called with one item
+        :param items: list
+        :param action: str, what func does, for logging
+        :param max_workers: int, max number of concurrent calls, defaults to
+                            the HTTP connection pool size
+        :param qps: float, max number of calls started per second
+        :return: generator of BuildResult instances, in order of completion
+        """
+        if max_workers is None:
+            max_workers = self.os_conf.get_http_pool_maxsize()
+        if max_workers < 1:
+            raise OsbsValidationException("max_workers must be positive: %s" % max_workers)
+        # no bursts, space the calls out evenly
+        rate_limiter = utils.RateLimiter(qps, burst=1) if qps else None
+
+        logger.info("%s %d builds, %d at a time", action, len(items), max_workers)
+        return self._iter_build_results(items, action,
+                                        utils.run_concurrently(func, items, max_workers,
+                                                               rate_limiter=rate_limiter))
+
+    def _iter_build_results(self, items, action, results):
+        try:
+            for index, response, exc_info in results:
+                error = exc_info[1] if exc_info else None
+                if error is not None:
+                    logger.warning("failed to %s build #%d: %s", action, index, error)
+                yield BuildResult(index, items[index], response, error)
+        finally:
+            results.close()
+
+    def _select_builds(self, build_ids=None, selector=None, koji_task_id=None, running=None):
+        """
+        names of builds given explicitly or matching selector
+
+        :param build_ids: list of str, build names
+        :param selector: dict, labels builds have to match
+        :param koji_task_id: str, only builds for Koji Task ID
+        :param running: bool, only running builds
+        :return: list of str
+        """
+        if build_ids is not None:
+            if selector or koji_task_id is not None:
+                raise OsbsValidationException("builds can't be given both by name and selector")
+            return list(build_ids)
+
+        if not selector and koji_task_id is None:
+            raise OsbsValidationException("no builds specified, give names or selector")
+
+        return [build.get_build_name()
+                for build in self.iter_builds(koji_task_id=koji_task_id, labels=selector,
+                                              running=running)]
+
+    @osbsapi
+    def cancel_builds(self, build_ids=None, selector=None, koji_task_id=None,
+                      max_workers=None, qps=None):
+        """
+        Cancel many builds concurrently
+
+        Builds are given either by name or by selector; with a selector,
+        only running builds are cancelled.
+
+        :param build_ids: list of str, build names
+        :param selector: dict, labels builds have to match
+        :param koji_task_id: str, cancel builds for Koji Task ID
+        :param max_workers: int, max number of builds cancelled at the same
+                            time, defaults to the HTTP connection pool size
+        :param qps: float, max number of cancellations started per second
+        :return: generator of BuildResult instances, in order of completion;
+                 'request' is the build name and 'response' a BuildResponse
+        """
+        build_ids = self._select_builds(build_ids, selector, koji_task_id, running=True)
+        return self._run_on_many(self.cancel_build, build_ids, 'cancel', max_workers, qps)
+
+    @osbsapi
+    def update_labels_on_builds(self, labels, build_ids=None, selector=None,
+                                koji_task_id=None, max_workers=None, qps=None):
+        """
+        Update labels on many builds concurrently
+
+        :param labels: dict, labels to set
+        :param build_ids: list of str, build names
+        :param selector: dict, labels builds have to match
+        :param koji_task_id: str, update builds for Koji Task ID
+        :param max_workers: int, max number of builds updated at the same time
+        :param qps: float, max number of updates started per second
+        :return: generator of BuildResult instances, in order of completion
+        """
+        build_ids = self._select_builds(build_ids, selector, koji_task_id)
+
+        def label(build_id):
+            return self.update_labels_on_build(build_id, labels)
+
+        return self._run_on_many(label, build_ids, 'label', max_workers, qps)
+
+    @osbsapi
+    def update_annotations_on_builds(self, annotations, build_ids=None, selector=None,
+                                     koji_task_id=None, max_workers=None, qps=None):
+        """
+        Update annotations on many builds concurrently
+
+        :param annotations: dict, annotations to set
+        :param build_ids: list of str, build names
+        :param selector: dict, labels builds have to match
+        :param koji_task_id: str, update builds for Koji Task ID
+        :param max_workers: int, max number of builds updated at the same time
+        :param qps: float, max number of updates started per second
+        :return: generator of BuildResult instances, in order of completion
+        """
+        build_ids = self._select_builds(build_ids, selector, koji_task_id)
+
+        def annotate(build_id):
+            return self.update_annotations_on_build(build_id, annotations)
+
+        return self._run_on_many(annotate, build_ids, 'annotate', max_workers, qps)
+
     def _decode_build_logs_generator(self, logs):
         for line in logs:
             line = line.decode("utf-8").rstrip()
@@ -935,12 +1209,89 @@ class OSBS(object):
             for entry in logs.splitlines():
                 yield LogEntry(*self._parse_build_log_entry(entry))
 
+    @osbsapi
+    def demux_orchestrator_build_logs(self, build_id, sinks, default=None, follow=False,
+                                      wait_if_missing=False):
+        """
+        route lines of orchestrator build log to per-platform sinks
+
+        Same split as get_orchestrator_build_logs, but lines stay bytes and
+        go straight to the sinks, which is much faster for large logs.
+
+        :param build_id: str
+        :param sinks: dict, platform name (None for orchestrator lines) ->
+                      binary file, queue or callable, see osbs.logs.make_sink
+        :param default: sink for lines of platforms not in sinks
+        :param follow: bool, fetch logs as they come?
+        :param wait_if_missing: bool, if build doesn't exist, wait
+        :return: int, number of lines routed
+        """
+        demux = OrchestratorLogDemultiplexer(sinks, default=default)
+        logs = self.get_build_logs(build_id=build_id, follow=follow,
+                                   wait_if_missing=wait_if_missing)
+        if logs is None:
+            return 0
+        return demux.run(logs)
+
+    @osbsapi
+    def download_build_logs(self, build_id, fileobj, follow=False, wait_if_missing=False,
+                            compression=None):
+        """
+        write build logs to a file as they come, without reading them into memory
+
+        Without follow, the log is written exactly as sent by the server;
+        when following, lines are written with newline.
+
+        :param build_id: str
+        :param fileobj: file-like object opened for writing bytes, or int,
+                        file descriptor; it is not closed
+        :param follow: bool, fetch logs as they come?
+        :param wait_if_missing: bool, if build doesn't exist, wait
+        :param compression: str, 'gzip' or 'bz2' to compress the log, or None
+        :return: int, number of bytes of log written, before compression
+        """
+        with LogFileWriter(fileobj, compression=compression) as writer:
+            logs = self.os.logs(build_id, follow=follow, wait_if_missing=wait_if_missing,
+                                chunked=True)
+            if logs is None:
+                return 0
+
+            if follow:
+                for line in logs:
+                    writer.write(line + b'\n')
+            else:
+                for chunk in logs:
+                    writer.write(chunk)
+
+        logger.debug("written %d bytes of logs of build %s", writer.bytes, build_id)
+        return writer.bytes
+
     @osbsapi
     def wait_for_build_to_finish(self, build_id):
         response = self.os.wait_for_build_to_finish(build_id)
         build_response = BuildResponse(response, self)
         return build_response
 
+    @osbsapi
+    def wait_for_builds(self, build_ids, states=None, timeout=None, callback=None):
+        """
+        wait for builds to reach one of given states, using a single watch
+
+        :param build_ids: iterable of str, names of builds to wait for
+        :param states: list of str, lowercase build states to wait for,
+                       default is BUILD_FINISHED_STATES
+        :param timeout: float, seconds to wait for all the builds
+        :param callback: callable, called with BuildResponse for each build
+                         as it reaches one of the states
+        :return: generator yielding BuildResponse instances in the order
+                 builds reached the states
+        """
+        for build_json in self.os.wait_for_builds(build_ids, states=states, timeout=timeout):
+            build_response = BuildResponse(build_json, self)
+            if callback is not None:
+                callback(build_response)
+            yield build_response
+
     @osbsapi
     def wait_for_build_to_get_scheduled(self, build_id):
         response = self.os.wait_for_build_to_get_scheduled(build_id)
@@ -975,6 +1326,9 @@ class OSBS(object):
     def set_annotations_on_build(self, build_id, annotations):
         return self.os.set_annotations_on_build(build_id, annotations)
 
+    def _build_json_store(self):
+        return BuildJsonStore(self.os_conf.get_build_json_store())
+
     @osbsapi
     def import_image(self, name, tags=None):
         """
@@ -982,10 +1336,7 @@ class OSBS(object):
 
         :return: bool, whether tags were imported
         """
-        stream_import_file = os.path.join(self.os_conf.get_build_json_store(),
-                                          'image_stream_import.json')
-        with open(stream_import_file) as f:
-            stream_import = json.load(f)
+        stream_import = self._build_json_store().load('image_stream_import.json')
         return self.os.import_image(name, stream_import, tags=tags)
 
     @osbsapi
@@ -1069,10 +1420,7 @@ class OSBS(object):
                                 set to True in ImageStreamTag
         :return: bool, whether or not modifications were performed
         """
-        img_stream_tag_file = os.path.join(self.os_conf.get_build_json_store(),
-                                           'image_stream_tag.json')
-        with open(img_stream_tag_file) as f:
-            tag_template = json.load(f)
+        tag_template = self._build_json_store().load('image_stream_tag.json')
         return self.os.ensure_image_stream_tag(stream, tag_name, tag_template,
                                                scheduled)
 
@@ -1094,9 +1442,7 @@ class OSBS(object):
         :param insecure_registry: bool, whether plain HTTP should be used
         :return: response
         """
-        img_stream_file = os.path.join(self.os_conf.get_build_json_store(), 'image_stream.json')
-        with open(img_stream_file) as f:
-            stream = json.load(f)
+        stream = self._build_json_store().load('image_stream.json')
         stream['metadata']['name'] = name
         stream['metadata'].setdefault('annotations', {})
         stream['metadata']['annotations'][ANNOTATION_SOURCE_REPO] = docker_image_repository
@@ -1106,10 +1452,7 @@ class OSBS(object):
         return self.os.create_image_stream(json.dumps(stream))
 
     def _load_quota_json(self, quota_name=None):
-        quota_file = os.path.join(self.os_conf.get_build_json_store(),
-                                  'pause_quota.json')
-        with open(quota_file) as fp:
-            quota_json = json.load(fp)
+        quota_json = self._build_json_store().load('pause_quota.json')
 
         if quota_name:
             quota_json['metadata']['name'] = quota_name
@@ -1134,9 +1477,10 @@ class OSBS(object):
             if not running_builds:
                 break
 
-            name = running_builds[0].get_build_name()
-            logger.info("waiting for build to finish: %s", name)
-            self.wait_for_build_to_finish(name)
+            names = [build.get_build_name() for build in running_builds]
+            logger.info("waiting for builds to finish: %s", ', '.join(names))
+            for build in self.wait_for_builds(names):
+                logger.debug("build finished: %s", build.get_build_name())
 
     @osbsapi
     def resume_builds(self, quota_name=None):
@@ -1152,6 +1496,53 @@ class OSBS(object):
     def dump_resource(self, resource_type):
         return self.os.dump_resource(resource_type).json()
 
+    @osbsapi
+    def iter_resource_pages(self, resource_type, page_size=DEFAULT_PAGE_SIZE):
+        """
+        :return: generator of dicts, each a List object with up to page_size items
+        """
+        for page in self.os.iter_resource_pages(resource_type, page_size=page_size):
+            yield page
+
+    @osbsapi
+    def dump_resource_to_file(self, resource_type, fileobj, page_size=DEFAULT_PAGE_SIZE):
+        """
+        write JSON dump of resources into file, one page of resources at a time
+
+        The result is the same List object dump_resource returns, serialized
+        to JSON, so it can be loaded and passed to restore_resource.
+
+        :param resource_type: str, e.g. 'builds'
+        :param fileobj: file-like object opened for writing bytes
+        :param page_size: int, number of resources fetched in one request
+        :return: int, number of resources written
+        """
+        count = 0
+        header = None
+        pages = self.os.iter_resource_pages(resource_type, page_size=page_size)
+        for page in pages:
+            if header is None:
+                header = dict((key, value) for key, value in page.items() if key != 'items')
+                metadata = header.get('metadata')
+                if metadata:
+                    header['metadata'] = dict((key, value) for key, value in metadata.items()
+                                              if key != 'continue')
+                header = json.dumps(header)
+                separator = ', ' if header != '{}' else ''
+                fileobj.write((header[:-1] + separator + '"items": [').encode('ascii'))
+
+            for item in page.get('items') or []:
+                if count:
+                    fileobj.write(b', ')
+                fileobj.write(json.dumps(item).encode('ascii'))
+                count += 1
+
+        if header is None:
+            # no pages at all, still write a valid empty list
+            fileobj.write(b'{"items": [')
+        fileobj.write(b']}')
+        return count
+
     @osbsapi
     def restore_resource(self, resource_type, resources, continue_on_error=False):
         nfailed = 0
@@ -1223,9 +1614,7 @@ class OSBS(object):
         :param data: dict, dictionary of data to be stored
         :returns: ConfigMapResponse containing the ConfigMap with name and data
         """
-        config_data_file = os.path.join(self.os_conf.get_build_json_store(), 'config_map.json')
-        with open(config_data_file) as f:
-            config_data = json.load(f)
+        config_data = self._build_json_store().load('config_map.json')
         config_data['metadata']['name'] = name
         data_dict = {}
         for key, value in data.items():
@@ -1278,4 +1667,5 @@ class OSBS(object):
         user_params = BuildUserParams()
         user_params.from_json(user_params_json)
 
-        return PluginsConfiguration(user_params).render()
+        return PluginsConfiguration(user_params,
+                                    repo_info_cache=self._repo_info_cache).render()
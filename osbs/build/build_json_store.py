@@ -0,0 +1,82 @@
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import json
+import logging
+import os
+import threading
+
+from six.moves import cPickle as pickle
+
+
+logger = logging.getLogger(__name__)
+
+
+class BuildJsonStore(object):
+    """
+    JSON files from build_json_store directory
+
+    Each file is parsed only once per process and parsed again only when its
+    modification time or size changes. Every load() returns a new copy,
+    which callers are free to modify.
+    """
+
+    # path -> (mtime, size, pickled content); shared by all instances
+    _cache = {}
+    _lock = threading.Lock()
+
+    def __init__(self, build_json_store):
+        """
+        :param build_json_store: str, path to directory with JSON build files
+        """
+        self.build_json_store = build_json_store
+
+    def load(self, name):
+        """
+        :param name: str, path of the file relative to build_json_store
+        :return: parsed JSON content of the file
+        :raises IOError: when the file can't be read
+        """
+        return self.load_file(os.path.join(self.build_json_store, name))
+
+    @classmethod
+    def load_file(cls, path):
+        """
+        :param path: str, path of the JSON file
+        :return: parsed JSON content of the file
+        :raises IOError: when the file can't be read
+        """
+        try:
+            st = os.stat(path)
+        except OSError as ex:
+            # same exception as open() would raise
+            raise IOError(ex.errno, ex.strerror, path)
+
+        with cls._lock:
+            cached = cls._cache.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime, st.st_size):
+            return pickle.loads(cached[2])
+
+        with open(path, "r") as fp:
+            st = os.fstat(fp.fileno())
+            content = json.load(fp)
+
+        logger.debug("parsed %s", path)
+        with cls._lock:
+            cls._cache[path] = (st.st_mtime, st.st_size,
+                                pickle.dumps(content, pickle.HIGHEST_PROTOCOL))
+        return content
+
+    @classmethod
+    def clear(cls):
+        """
+        forget all parsed files
+        """
+        with cls._lock:
+            cls._cache.clear()
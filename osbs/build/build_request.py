@@ -7,7 +7,6 @@ of the BSD license. See the LICENSE file for details.
 """
 from __future__ import print_function, absolute_import, unicode_literals
 
-import json
 import logging
 import os
 import re
@@ -15,6 +14,7 @@ from pkg_resources import parse_version
 
 from six.moves import zip_longest
 
+from osbs.build.build_json_store import BuildJsonStore
 from osbs.build.manipulate import DockJsonManipulator
 from osbs.build.spec import BuildSpec
 from osbs.constants import (SECRETS_PATH, DEFAULT_OUTER_TEMPLATE, DEFAULT_INNER_TEMPLATE,
@@ -162,8 +162,7 @@ class BuildRequest(object):
             path = os.path.join(self.build_json_store, self._outer_template_path)
             logger.debug("loading template from path %s", path)
             try:
-                with open(path, "r") as fp:
-                    self._template = json.load(fp)
+                self._template = BuildJsonStore.load_file(path)
             except (IOError, OSError) as ex:
                 raise OsbsException("Can't open template '%s': %s" %
                                     (path, repr(ex)))
@@ -174,8 +173,7 @@ class BuildRequest(object):
         if self._inner_template is None:
             path = os.path.join(self.build_json_store, self._inner_template_path)
             logger.debug("loading inner template from path %s", path)
-            with open(path, "r") as fp:
-                self._inner_template = json.load(fp)
+            self._inner_template = BuildJsonStore.load_file(path)
         return self._inner_template
 
     @property
@@ -184,14 +182,19 @@ class BuildRequest(object):
             path = os.path.join(self.build_json_store, self._customize_conf_path)
             logger.debug("loading customize conf from path %s", path)
             try:
-                with open(path, "r") as fp:
-                    self._customize_conf = json.load(fp)
+                self._customize_conf = BuildJsonStore.load_file(path)
             except IOError:
                 # File not found, which is perfectly fine. Set to empty string
                 self._customize_conf = {}
 
         return self._customize_conf
 
+    def load_templates(self):
+        """
+        load template files now instead of on first use
+        """
+        return self.template, self.inner_template, self.customize_conf
+
     @property
     def dj(self):
         if self._dj is None:
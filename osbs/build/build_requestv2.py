@@ -102,6 +102,10 @@ class BuildRequestV2(BuildRequest):
         logger.debug("now setting params '%s' for user_params", kwargs)
         self.user_params.set_params(**kwargs)
 
+    # Override
+    def load_templates(self):
+        return self.template
+
     # Override
     @property
     def inner_template(self):
@@ -7,9 +7,10 @@ of the BSD license. See the LICENSE file for details.
 """
 from __future__ import print_function, absolute_import, unicode_literals
 
-import json
+import copy
 import logging
 
+from osbs import codec
 from osbs.utils import graceful_chain_get, get_time_from_rfc3339
 from osbs.constants import BUILD_FINISHED_STATES, BUILD_RUNNING_STATES, \
     BUILD_SUCCEEDED_STATES, BUILD_FAILED_STATES, BUILD_PENDING_STATES, \
@@ -21,17 +22,58 @@ logger = logging.getLogger(__name__)
 
 
 class BuildResponse(object):
-    """ class which wraps json from http response from OpenShift """
+    """
+    class which wraps json from http response from OpenShift
+
+    Fields used by most callers (name, phase, creation time, labels,
+    annotations, image tag) are extracted once, when the instance is
+    created, and JSON strings stored in annotations are decoded once, on
+    first use; getters don't walk or parse the Build again. The rest of the
+    Build is only kept serialized and is parsed again when `json` is first
+    accessed, so instances held in large numbers don't keep whole Build
+    dicts. Getters of decoded annotations return copies, the decoded values
+    themselves are never handed out.
+    """
+
+    __slots__ = ('osbs', '_json', '_raw', '_status', '_cancelled', '_name', '_image_tag',
+                 '_time_created', '_time_created_in_seconds', '_labels',
+                 '_annotations', '_decoded')
 
     def __init__(self, build_json, osbs=None):
         """
         :param build_json: dict from JSON of OpenShift Build object
         :param osbs: object of the creater's OSBS instance
         """
-        self.json = build_json
-        self._status = None
-        self._cancelled = None
         self.osbs = osbs
+        self.json = build_json
+
+    @property
+    def json(self):
+        if self._json is None and self._raw is not None:
+            # from now on the dict is kept, callers may change it
+            self._extract(codec.loads(self._raw))
+            self._raw = None
+        return self._json
+
+    @json.setter
+    def json(self, build_json):
+        self._extract(build_json)
+        self._raw = codec.dumpb(build_json) if build_json is not None else None
+        self._json = None
+
+    def _extract(self, build_json):
+        self._json = build_json
+        metadata = graceful_chain_get(build_json, "metadata") or {}
+        phase = graceful_chain_get(build_json, "status", "phase")
+        self._status = phase.lower() if phase is not None else None
+        self._cancelled = graceful_chain_get(build_json, "status", "cancelled")
+        self._name = metadata.get("name")
+        self._image_tag = graceful_chain_get(build_json, "spec", "output", "to", "name")
+        self._time_created = metadata.get("creationTimestamp")
+        self._time_created_in_seconds = None
+        self._labels = metadata.get("labels")
+        self._annotations = metadata.get("annotations")
+        self._decoded = {}
 
     @property
     def status(self):
@@ -48,8 +90,6 @@ class BuildResponse(object):
 
     @property
     def cancelled(self):
-        if self._cancelled is None:
-            self._cancelled = self.json['status'].get('cancelled')
         return self._cancelled
 
     @cancelled.setter
@@ -79,31 +119,55 @@ class BuildResponse(object):
         return self.status not in BUILD_FINISHED_STATES
 
     def get_build_name(self):
-        return graceful_chain_get(self.json, "metadata", "name")
+        return self._name
 
     def get_image_tag(self):
-        return graceful_chain_get(self.json, "spec", "output", "to", "name")
+        return self._image_tag
 
     def get_time_created(self):
-        return graceful_chain_get(self.json, "metadata", "creationTimestamp")
+        return self._time_created
 
     def get_time_created_in_seconds(self):
-        return get_time_from_rfc3339(self.get_time_created())
+        if self._time_created_in_seconds is None:
+            self._time_created_in_seconds = get_time_from_rfc3339(self._time_created)
+        return self._time_created_in_seconds
 
     def get_annotations(self):
-        return graceful_chain_get(self.json, "metadata", "annotations")
+        return copy.deepcopy(self._annotations)
 
     def get_labels(self):
-        return graceful_chain_get(self.json, "metadata", "labels")
+        return copy.deepcopy(self._labels)
 
     def get_annotations_or_labels(self):
-        r = self.get_annotations()
-        if r is None:
-            r = self.get_labels()
-        return r
+        return copy.deepcopy(self._get_annotations_or_labels())
+
+    def _get_annotations_or_labels(self):
+        # not copied, for read-only lookups
+        if self._annotations is None:
+            return self._labels
+        return self._annotations
+
+    def _get_decoded(self, values, key):
+        """
+        decode JSON string values[key], decoding each string only once
+
+        :return: decoded value, or None if the key is missing or empty; not
+                 a copy, callers must not modify it
+        """
+        value = graceful_chain_get(values, key)
+        if not value:
+            return None
+
+        cached = self._decoded.get(key)
+        if cached is not None and cached[0] is value:
+            return cached[1]
+
+        decoded = codec.loads(value)
+        self._decoded[key] = (value, decoded)
+        return decoded
 
     def get_dockerfile(self):
-        return graceful_chain_get(self.get_annotations_or_labels(), "dockerfile")
+        return graceful_chain_get(self._get_annotations_or_labels(), "dockerfile")
 
     def get_error_message(self):
         """
@@ -123,15 +187,13 @@ class BuildResponse(object):
                 return "Error in plugin %s" % plugin
 
     def get_error_reason(self):
-        str_metadata = graceful_chain_get(self.get_annotations(),
-                                          "plugins-metadata")
-        if str_metadata:
-            try:
-                metadata_dict = json.loads(str_metadata)
+        try:
+            metadata_dict = self._get_decoded(self._annotations, "plugins-metadata")
+            if metadata_dict:
                 plugin, error_message = list(metadata_dict['errors'].items())[0]
                 return {'plugin': [plugin, error_message]}
-            except (ValueError, KeyError, IndexError):
-                pass
+        except (ValueError, KeyError, IndexError):
+            pass
 
         if not self.osbs:
             return {'pod': 'OSBS unavailable; Pod related errors cannot be retrieved'}
@@ -143,45 +205,43 @@ class BuildResponse(object):
             return None
 
     def get_commit_id(self):
-        return graceful_chain_get(self.get_annotations_or_labels(), "commit_id")
+        return graceful_chain_get(self._get_annotations_or_labels(), "commit_id")
 
     def get_repositories(self):
-        repositories_json = graceful_chain_get(self.get_annotations_or_labels(), "repositories")
-        if repositories_json:
-            return json.loads(repositories_json)
+        return copy.deepcopy(self._get_decoded(self._get_annotations_or_labels(),
+                                               "repositories"))
 
     def get_tar_metadata(self):
-        tar_md_json = graceful_chain_get(self.get_annotations_or_labels(), "tar_metadata")
-        if tar_md_json:
-            return json.loads(tar_md_json)
+        return copy.deepcopy(self._get_tar_metadata())
+
+    def _get_tar_metadata(self):
+        return self._get_decoded(self._get_annotations_or_labels(), "tar_metadata")
 
     def get_tar_metadata_size(self):
-        return graceful_chain_get(self.get_tar_metadata(), "size")
+        return graceful_chain_get(self._get_tar_metadata(), "size")
 
     def get_tar_metadata_md5sum(self):
-        return graceful_chain_get(self.get_tar_metadata(), "md5sum")
+        return graceful_chain_get(self._get_tar_metadata(), "md5sum")
 
     def get_tar_metadata_sha256sum(self):
-        return graceful_chain_get(self.get_tar_metadata(), "sha256sum")
+        return graceful_chain_get(self._get_tar_metadata(), "sha256sum")
 
     def get_tar_metadata_filename(self):
-        return graceful_chain_get(self.get_tar_metadata(), "filename")
+        return graceful_chain_get(self._get_tar_metadata(), "filename")
 
     def get_image_id(self):
-        return graceful_chain_get(self.get_annotations_or_labels(), "image-id")
+        return graceful_chain_get(self._get_annotations_or_labels(), "image-id")
 
     def get_base_image_id(self):
-        return graceful_chain_get(self.get_annotations_or_labels(),
+        return graceful_chain_get(self._get_annotations_or_labels(),
                                   "base-image-id")
 
     def get_base_image_name(self):
-        return graceful_chain_get(self.get_annotations_or_labels(),
+        return graceful_chain_get(self._get_annotations_or_labels(),
                                   "base-image-name")
 
     def get_digests(self):
-        digests_json = graceful_chain_get(self.get_annotations_or_labels(), "digests")
-        if digests_json:
-            return json.loads(digests_json)
+        return copy.deepcopy(self._get_decoded(self._get_annotations_or_labels(), "digests"))
 
     def get_koji_build_id(self):
-        return graceful_chain_get(self.get_labels(), "koji-build-id")
+        return graceful_chain_get(self._labels, "koji-build-id")
@@ -8,9 +8,9 @@ of the BSD license. See the LICENSE file for details.
 from __future__ import print_function, absolute_import, unicode_literals
 
 import logging
-import json
 import yaml
 
+from osbs import codec
 from osbs.utils import graceful_chain_get
 
 
@@ -52,7 +52,7 @@ class ConfigMapResponse(object):
             if self.is_yaml(key):
                 data_dict[key] = yaml.load(data[key])
             else:
-                data_dict[key] = json.loads(data[key])
+                data_dict[key] = codec.loads(data[key])
 
         return data_dict
 
@@ -69,4 +69,4 @@ class ConfigMapResponse(object):
 
         if self.is_yaml(name):
             return yaml.load(data[name]) or {}
-        return json.loads(data[name])
+        return codec.loads(data[name])
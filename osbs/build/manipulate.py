@@ -7,16 +7,102 @@ of the BSD license. See the LICENSE file for details.
 """
 from __future__ import print_function, absolute_import, unicode_literals
 
-import json
 import copy
 
+from osbs import codec
+
+
+class PluginIndex(object):
+    """
+    atomic-reactor plugin configuration indexed by phase and plugin name
+
+    Wraps dict in atomic-reactor format, mapping phase (e.g.
+    'prebuild_plugins') to list of plugins. Lookups and updates of plugins
+    don't scan the lists. Changes are made in the wrapped dict right away,
+    so it always has the plugins in the same order as before.
+    """
+
+    def __init__(self, conf):
+        """
+        :param conf: dict, plugin configuration
+        """
+        self.conf = conf
+        # phase -> {plugin name: [plugin dicts with this name, in order]}
+        self._plugins = {}
+
+    def reset(self, phase):
+        """ forget index of phase, e.g. when its list was replaced """
+        self._plugins.pop(phase, None)
+
+    def _index(self, phase):
+        """
+        :raises KeyError: when there is no such phase
+        """
+        plugins = self._plugins.get(phase)
+        if plugins is None:
+            plugins = {}
+            for plugin in self.conf[phase]:
+                plugins.setdefault(plugin.get('name'), []).append(plugin)
+            self._plugins[phase] = plugins
+        return plugins
+
+    def get(self, phase, name):
+        """
+        Return the configuration for a plugin.
+
+        Raises KeyError if there are no plugins of that type.
+        Raises IndexError if the named plugin is not listed.
+        """
+        return self._index(phase).get(name, [])[0]
+
+    def remove(self, phase, name):
+        """
+        remove plugin if configured
+
+        :return: bool, whether the plugin was removed
+        """
+        plugins = self._index(phase)
+        matching = plugins.get(name)
+        if not matching:
+            return False
+
+        plugin = matching.pop(0)
+        conf = self.conf[phase]
+        # find it by identity, an earlier plugin may be equal to it
+        del conf[next(i for i, p in enumerate(conf) if p is plugin)]
+        if not matching:
+            del plugins[name]
+        return True
+
+    def add(self, phase, name, args):
+        """
+        set args of all plugins with this name, add the plugin if missing
+
+        :return: bool, whether the plugin was added
+        """
+        plugins = self._index(phase)
+        matching = plugins.get(name)
+        if matching:
+            for plugin in matching:
+                plugin['args'] = args
+            return False
+
+        plugin = {"name": name, "args": args}
+        plugins[name] = [plugin]
+        self.conf[phase].append(plugin)
+        return True
+
 
 class DockJsonManipulator(object):
     """ """
     def __init__(self, build_json, dock_json):
         """ """
         self.build_json = build_json
-        self.dock_json = dock_json
+        self._plugins = PluginIndex(dock_json)
+
+    @property
+    def dock_json(self):
+        return self._plugins.conf
 
     def get_dock_json(self):
         """ return dock json from existing build json """
@@ -28,7 +114,7 @@ class DockJsonManipulator(object):
         if len(p) <= 0:
             raise RuntimeError("\"env\" misses key ATOMIC_REACTOR_PLUGINS")
         dock_json_str = p[0]['value']
-        dock_json = json.loads(dock_json_str)
+        dock_json = codec.loads(dock_json_str)
         return dock_json
 
     def dock_json_get_plugin_conf(self, plugin_type, plugin_name):
@@ -38,32 +124,19 @@ class DockJsonManipulator(object):
         Raises KeyError if there are no plugins of that type.
         Raises IndexError if the named plugin is not listed.
         """
-        match = [x for x in self.dock_json[plugin_type] if x.get('name') == plugin_name]
-        return match[0]
+        return self._plugins.get(plugin_type, plugin_name)
 
     def remove_plugin(self, plugin_type, plugin_name):
         """
         if config contains plugin, remove it
         """
-        for p in self.dock_json[plugin_type]:
-            if p.get('name') == plugin_name:
-                self.dock_json[plugin_type].remove(p)
-                break
+        self._plugins.remove(plugin_type, plugin_name)
 
     def add_plugin(self, plugin_type, plugin_name, args_dict):
         """
         if config has plugin, override it, else add it
         """
-
-        plugin_modified = False
-
-        for plugin in self.dock_json[plugin_type]:
-            if plugin['name'] == plugin_name:
-                plugin['args'] = args_dict
-                plugin_modified = True
-
-        if not plugin_modified:
-            self.dock_json[plugin_type].append({"name": plugin_name, "args": args_dict})
+        self._plugins.add(plugin_type, plugin_name, args_dict)
 
     def dock_json_has_plugin_conf(self, plugin_type, plugin_name):
         """
@@ -87,6 +160,7 @@ class DockJsonManipulator(object):
 
     def dock_json_set_param(self, param, value):
         self.dock_json[param] = value
+        self._plugins.reset(param)
 
     def dock_json_set_arg(self, plugin_type, plugin_name, arg_key, arg_value):
         plugin_conf = self._dock_json_get_plugin_conf_or_fail(plugin_type, plugin_name)
@@ -110,4 +184,4 @@ class DockJsonManipulator(object):
         p = [env for env in env_json if env["name"] == "ATOMIC_REACTOR_PLUGINS"]
         if len(p) <= 0:
             raise RuntimeError("\"env\" misses key ATOMIC_REACTOR_PLUGINS")
-        p[0]['value'] = json.dumps(self.dock_json)
+        p[0]['value'] = codec.dumps(self.dock_json)
@@ -12,6 +12,8 @@ import os
 import json
 import re
 
+from osbs.build.build_json_store import BuildJsonStore
+from osbs.build.manipulate import PluginIndex
 from osbs.constants import BUILD_TYPE_ORCHESTRATOR
 from osbs.exceptions import OsbsException
 from osbs import utils
@@ -21,7 +23,7 @@ logger = logging.getLogger(__name__)
 
 class PluginsTemplate(object):
     def __init__(self, build_json_dir, template_path, customize_conf_path):
-        self._template = None
+        self._plugins = None
         self._customize_conf = None
         self._build_json_dir = build_json_dir
         self._template_path = template_path
@@ -29,16 +31,20 @@ class PluginsTemplate(object):
 
     @property
     def template(self):
-        if self._template is None:
+        return self.plugins.conf
+
+    @property
+    def plugins(self):
+        if self._plugins is None:
             path = os.path.join(self._build_json_dir, self._template_path)
             logger.debug("loading template from path %s", path)
             try:
-                with open(path, "r") as fp:
-                    self._template = json.load(fp)
+                template = BuildJsonStore.load_file(path)
             except (IOError, OSError) as ex:
                 raise OsbsException("Can't open template '%s': %s" %
                                     (path, repr(ex)))
-        return self._template
+            self._plugins = PluginIndex(template)
+        return self._plugins
 
     @property
     def customize_conf(self):
@@ -46,8 +52,7 @@ class PluginsTemplate(object):
             path = os.path.join(self._build_json_dir, self._customize_conf_path)
             logger.info('loading customize conf from path %s', path)
             try:
-                with open(path, "r") as fp:
-                    self._customize_conf = json.load(fp)
+                self._customize_conf = BuildJsonStore.load_file(path)
             except IOError:
                 # File not found, which is perfectly fine. Set to empty dict
                 logger.info('failed to find customize conf from path %s', path)
@@ -58,28 +63,15 @@ class PluginsTemplate(object):
         """
         if config contains plugin, remove it
         """
-        for p in self.template[phase]:
-            if p.get('name') == name:
-                self.template[phase].remove(p)
-                if reason:
-                    logger.info('Removing {0}:{1}, {2}'.format(phase, name, reason))
-                break
+        if self.plugins.remove(phase, name) and reason:
+            logger.info('Removing {0}:{1}, {2}'.format(phase, name, reason))
 
     def add_plugin(self, phase, name, args, reason=None):
         """
         if config has plugin, override it, else add it
         """
-        plugin_modified = False
-
-        for plugin in self.template[phase]:
-            if plugin['name'] == name:
-                plugin['args'] = args
-                plugin_modified = True
-
-        if not plugin_modified:
-            self.template[phase].append({"name": name, "args": args})
-            if reason:
-                logger.info('{0}:{1} with args {2}, {3}'.format(phase, name, args, reason))
+        if self.plugins.add(phase, name, args) and reason:
+            logger.info('{0}:{1} with args {2}, {3}'.format(phase, name, args, reason))
 
     def get_plugin_conf(self, phase, name):
         """
@@ -88,8 +80,7 @@ class PluginsTemplate(object):
         Raises KeyError if there are no plugins of that type.
         Raises IndexError if the named plugin is not listed.
         """
-        match = [x for x in self.template[phase] if x.get('name') == name]
-        return match[0]
+        return self.plugins.get(phase, name)
 
     def has_plugin_conf(self, phase, name):
         """
@@ -126,9 +117,10 @@ class PluginsTemplate(object):
 
 
 class PluginsConfiguration(object):
-    def __init__(self, user_params):
+    def __init__(self, user_params, repo_info_cache=None):
         # Figure out inner template to use from user_params:
         self.user_params = user_params
+        self.repo_info_cache = repo_info_cache
 
         #    <build_type>_inner:<arrangement_version>.json
         arrangement_version = self.user_params.arrangement_version.value
@@ -487,7 +479,8 @@ class PluginsConfiguration(object):
 
         repo_info = utils.get_repo_info(self.user_params.git_uri.value,
                                         self.user_params.git_ref.value,
-                                        git_branch=self.user_params.git_branch.value)
+                                        git_branch=self.user_params.git_branch.value,
+                                        cache=self.repo_info_cache)
 
         unique_tag = self.user_params.image_tag.value.split(':')[-1]
         tag_suffixes = {'unique': [unique_tag], 'primary': []}
@@ -8,8 +8,8 @@ of the BSD license. See the LICENSE file for details.
 from __future__ import print_function, absolute_import, unicode_literals
 
 import logging
-import json
 
+from osbs import codec
 from osbs.build.spec import BuildParam, BuildIDParam, UserParam, BuildCommon
 from osbs.constants import (DEFAULT_GIT_REF, REACTOR_CONFIG_ARRANGEMENT_VERSION,
                             DEFAULT_CUSTOMIZE_CONF)
@@ -164,7 +164,7 @@ class BuildUserParams(BuildCommon):
     def from_json(self, user_params_json):
         if not user_params_json:
             return
-        json_dict = json.loads(user_params_json)
+        json_dict = codec.loads(user_params_json)
         for key, value in json_dict.items():
             try:
                 self.convert_dict[key].value = value
@@ -183,4 +183,4 @@ class BuildUserParams(BuildCommon):
 
     def to_json(self):
         json_dict = self.to_dict(self.convert_dict.keys())
-        return json.dumps(json_dict, sort_keys=True)
+        return codec.dumps(json_dict, sort_keys=True)
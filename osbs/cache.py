@@ -0,0 +1,345 @@
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+
+
+Local cache of builds kept up to date by watching OpenShift
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import copy
+import logging
+import threading
+
+from osbs.constants import WATCH_DELETED, WATCH_ERROR
+from osbs.exceptions import OsbsException
+from osbs.utils import graceful_chain_get
+
+
+logger = logging.getLogger(__name__)
+
+# wait this long before watching again after the watch failed
+BUILD_CACHE_RETRY_SECS = 5
+
+# wait this long for the watch thread to exit when stopping
+BUILD_CACHE_STOP_SECS = 5
+
+# field selector keys which can be evaluated on cached builds
+FIELD_SELECTOR_PATHS = {
+    'status': ('status', 'phase'),
+    'metadata.name': ('metadata', 'name'),
+}
+
+
+def parse_field_selector(field_selector):
+    """
+    parse field selector into list of (path, operator, value) requirements
+
+    :param field_selector: str, e.g. 'status!=Failed,status!=Complete'
+    :return: list of tuples, or None when the selector can't be evaluated
+             locally
+    """
+    requirements = []
+    if not field_selector:
+        return requirements
+
+    for term in field_selector.split(','):
+        for operator in ('!=', '==', '='):
+            if operator in term:
+                key, value = term.split(operator, 1)
+                break
+        else:
+            return None
+
+        path = FIELD_SELECTOR_PATHS.get(key.strip())
+        if path is None:
+            return None
+
+        requirements.append((path, operator != '!=', value.strip()))
+
+    return requirements
+
+
+class BuildCache(object):
+    """
+    In-memory store of all builds in the namespace
+
+    The store is populated by listing builds once and then updated from a
+    watch on builds, resumed from the last seen resourceVersion. When the
+    resourceVersion is too old (410 Gone), the watch lists builds again and
+    the store is replaced with the list, so builds deleted in the meantime
+    are dropped.
+
+    Builds are indexed by name, build config, Koji task ID and phase, so
+    queries don't need to scan the whole store. Returned build objects are
+    copies and can be modified freely.
+
+    Each start() runs its own watch thread with its own stop event; a
+    thread left behind by stop() never updates the store again, even if it
+    is still waiting for the watch to end.
+    """
+
+    def __init__(self, openshift, retry_secs=BUILD_CACHE_RETRY_SECS):
+        """
+        :param openshift: osbs.core.Openshift instance
+        :param retry_secs: int, seconds to wait before watching again on error
+        """
+        self.os = openshift
+        self.retry_secs = retry_secs
+        self.resource_version = None
+
+        self._lock = threading.RLock()
+        self._synced = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        self._builds = {}
+        self._by_build_config = {}
+        self._by_koji_task_id = {}
+        self._by_phase = {}
+
+    @property
+    def synced(self):
+        """
+        whether the store was populated and can answer queries
+        """
+        return self._synced.is_set()
+
+    def start(self, timeout=None):
+        """
+        populate the store and keep it up to date in a background thread
+
+        :param timeout: float, seconds to wait for initial population
+                        (None waits until it's done)
+        :return: bool, whether the store is populated
+        """
+        if self._thread is None:
+            self._stopped = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stopped,),
+                                            name='osbs-build-cache')
+            self._thread.daemon = True
+            self._thread.start()
+        return self._synced.wait(timeout)
+
+    def stop(self, timeout=BUILD_CACHE_STOP_SECS):
+        """
+        stop updating the store
+
+        The watch thread exits once the currently open watch receives an event
+        or is closed by the server; it doesn't touch the store after this
+        returns, even when it is still running.
+
+        :param timeout: float, seconds to wait for the watch thread to exit
+                        (None waits until it does)
+        :return: bool, whether the watch thread has exited
+        """
+        self._stopped.set()
+        self._synced.clear()
+        thread, self._thread = self._thread, None
+        if thread is None or thread is threading.current_thread():
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _run(self, stopped):
+        while not stopped.is_set():
+            try:
+                if self.resource_version is None:
+                    self._relist(stopped)
+                else:
+                    self._resume(stopped)
+                self._watch(stopped)
+            except Exception as ex:
+                logger.warning("build cache: watch failed, retrying in %ds: %r",
+                               self.retry_secs, ex)
+                stopped.wait(self.retry_secs)
+
+    def _resume(self, stopped):
+        # restarted after stop(), the watch continues where the previous one
+        # ended and brings the store up to date
+        with self._lock:
+            if not stopped.is_set():
+                self._synced.set()
+
+    def relist(self):
+        """
+        replace content of the store with current list of builds
+
+        :return: str, resourceVersion of the list
+        """
+        return self._relist(None)
+
+    def _relist(self, stopped):
+        builds_json = self.os.list_builds().json()
+        self._replace(builds_json['items'],
+                      graceful_chain_get(builds_json, 'metadata', 'resourceVersion'),
+                      stopped)
+        return self.resource_version
+
+    def _replace(self, builds, resource_version, stopped):
+        with self._lock:
+            if stopped is not None and stopped.is_set():
+                return
+            self._builds.clear()
+            self._by_build_config.clear()
+            self._by_koji_task_id.clear()
+            self._by_phase.clear()
+            for build in builds:
+                self._add(build)
+            self.resource_version = resource_version
+            self._synced.set()
+        logger.debug("build cache: listed %d builds at resourceVersion %s",
+                     len(builds), resource_version)
+
+    def watch(self):
+        """
+        apply changes from build watch until the watch ends
+        """
+        self._watch(self._stopped)
+
+    def _watch(self, stopped):
+        if stopped.is_set():
+            return
+
+        kwargs = {}
+        if self.resource_version is not None:
+            kwargs['resourceVersion'] = self.resource_version
+
+        def on_relist(builds, resource_version):
+            self._replace(builds, resource_version, stopped)
+
+        for changetype, obj in self.os.watch_resource("builds", on_relist=on_relist, **kwargs):
+            if stopped.is_set():
+                return
+
+            if changetype == WATCH_ERROR:
+                raise OsbsException("build cache: watch error: %r" % obj)
+
+            with self._lock:
+                # stop() may have been called while waiting for the event
+                if stopped.is_set():
+                    return
+                self.apply_event(changetype, obj)
+
+    def apply_event(self, changetype, obj):
+        """
+        update the store from watch event
+
+        :param changetype: str, type of watch event
+        :param obj: dict, build from the watch event
+        """
+        name = graceful_chain_get(obj, 'metadata', 'name')
+        if name is None:
+            return
+
+        version = graceful_chain_get(obj, 'metadata', 'resourceVersion')
+        with self._lock:
+            current = self._builds.get(name)
+            if current is not None:
+                if self._is_older(version, current):
+                    # replayed event after watch reconnected
+                    return
+                self._remove(current)
+
+            if changetype != WATCH_DELETED:
+                self._add(obj)
+
+            if version is not None:
+                self.resource_version = version
+
+    @staticmethod
+    def _is_older(version, build):
+        current_version = graceful_chain_get(build, 'metadata', 'resourceVersion')
+        try:
+            return int(version) < int(current_version)
+        except (TypeError, ValueError):
+            # resourceVersion is opaque, it's not always a number
+            return False
+
+    @staticmethod
+    def _index_keys(build):
+        labels = graceful_chain_get(build, 'metadata', 'labels') or {}
+        phase = graceful_chain_get(build, 'status', 'phase') or ''
+        return labels.get('buildconfig'), labels.get('koji-task-id'), phase.lower()
+
+    def _add(self, build):
+        name = build['metadata']['name']
+        build_config, koji_task_id, phase = self._index_keys(build)
+        self._builds[name] = build
+        for index, key in ((self._by_build_config, build_config),
+                           (self._by_koji_task_id, koji_task_id),
+                           (self._by_phase, phase)):
+            if key is not None:
+                index.setdefault(key, set()).add(name)
+
+    def _remove(self, build):
+        name = build['metadata']['name']
+        build_config, koji_task_id, phase = self._index_keys(build)
+        self._builds.pop(name, None)
+        for index, key in ((self._by_build_config, build_config),
+                           (self._by_koji_task_id, koji_task_id),
+                           (self._by_phase, phase)):
+            names = index.get(key)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del index[key]
+
+    def get(self, build_id):
+        """
+        :param build_id: str, name of the build
+        :return: dict, build, or None when not in the store
+        """
+        with self._lock:
+            build = self._builds.get(build_id)
+            return copy.deepcopy(build) if build is not None else None
+
+    def list(self, build_config_id=None, koji_task_id=None, phases=None,
+             labels=None, field_selector=None):
+        """
+        list builds from the store matching all given criteria
+
+        :param build_config_id: str, only builds created from BuildConfig
+        :param koji_task_id: str, only builds for Koji Task ID
+        :param phases: list of str, only builds in these (lowercase) phases
+        :param labels: dict, only builds with these labels
+        :param field_selector: str, field selector using 'status' and
+                               'metadata.name' fields only
+        :return: list of dicts, or None if field selector is not supported
+        """
+        requirements = parse_field_selector(field_selector)
+        if requirements is None:
+            return None
+
+        with self._lock:
+            candidates = None
+            for index, keys in ((self._by_build_config, [build_config_id]),
+                                (self._by_koji_task_id,
+                                 [str(koji_task_id) if koji_task_id is not None else None]),
+                                (self._by_phase, phases)):
+                if keys is None or keys == [None]:
+                    continue
+                names = set()
+                for key in keys:
+                    names.update(index.get(key, ()))
+                candidates = names if candidates is None else candidates & names
+
+            if candidates is None:
+                candidates = self._builds.keys()
+
+            result = []
+            for name in sorted(candidates):
+                build = self._builds[name]
+                if labels:
+                    build_labels = graceful_chain_get(build, 'metadata', 'labels') or {}
+                    if any(build_labels.get(key) != value for key, value in labels.items()):
+                        continue
+                if not all((graceful_chain_get(build, *path) == value) == equal
+                           for path, equal, value in requirements):
+                    continue
+                result.append(copy.deepcopy(build))
+
+        return result
@@ -18,6 +18,7 @@ import time
 import os.path
 import sys
 import argparse
+import tempfile
 from osbs import set_logging
 from osbs.api import OSBS
 from osbs.build.build_response import BuildResponse
@@ -25,7 +26,8 @@ from osbs.cli.render import TablePrinter
 from osbs.conf import Configuration
 from osbs.constants import (DEFAULT_CONFIGURATION_FILE, DEFAULT_CONFIGURATION_SECTION,
                             CLI_LIST_BUILDS_DEFAULT_COLS, PY3, BACKUP_RESOURCES,
-                            BUILD_FINISHED_STATES, CLI_WATCH_BUILDS_DEFAULT_COLS)
+                            BUILD_FINISHED_STATES, CLI_WATCH_BUILDS_DEFAULT_COLS,
+                            DEFAULT_PAGE_SIZE, LOG_COMPRESSIONS)
 from osbs.exceptions import (OsbsNetworkException, OsbsException, OsbsAuthException,
                              OsbsResponseException)
 from osbs.cli.capture import setup_json_capture
@@ -296,8 +298,36 @@ def cmd_get_build(args, osbs):
         print(template.format(**context))
 
 
+def parse_selector(selector):
+    """
+    parse list of KEY=VALUE strings into dict
+    """
+    labels = {}
+    for item in selector or []:
+        key, sep, value = item.partition('=')
+        if not sep or not key:
+            raise OsbsException("Invalid selector '%s', expected KEY=VALUE" % item)
+        labels[key] = value
+    return labels
+
+
 def cmd_cancel_build(args, osbs):
-    osbs.cancel_build(args.BUILD_ID[0])
+    if len(args.BUILD_ID) == 1 and not (args.selector or args.koji_task_id):
+        osbs.cancel_build(args.BUILD_ID[0])
+        return
+
+    results = osbs.cancel_builds(build_ids=args.BUILD_ID or None,
+                                 selector=parse_selector(args.selector),
+                                 koji_task_id=args.koji_task_id)
+    failed = 0
+    for result in results:
+        if result.error is None:
+            print("cancelled %s" % result.request)
+        else:
+            failed += 1
+            logger.error("failed to cancel %s: %s", result.request, result.error)
+    if failed:
+        raise OsbsException("failed to cancel %d builds" % failed)
 
 
 def cmd_build(args, osbs):
@@ -384,6 +414,15 @@ def cmd_build_logs(args, osbs):
     build_id = args.BUILD_ID[0]
     follow = args.follow
 
+    if args.output_file:
+        with open(args.output_file, 'wb') as fp:
+            osbs.download_build_logs(build_id, fp, follow=follow,
+                                     wait_if_missing=args.wait_if_missing,
+                                     compression=args.compress)
+        return
+    if args.compress:
+        raise OsbsException("--compress requires --output")
+
     logs = osbs.get_build_logs(build_id, follow=follow,
                                wait_if_missing=args.wait_if_missing,
                                decode=True)
@@ -475,8 +514,11 @@ def cmd_backup(args, osbs):
             for resource_type in BACKUP_RESOURCES:
                 try:
                     logger.info("dumping %s", resource_type)
-                    resources = osbs.dump_resource(resource_type)
-                    t.write_file(resource_type + ".json", json.dumps(resources).encode('ascii'))
+                    # spool to disk so that only one page of resources is in memory
+                    with tempfile.TemporaryFile() as dump:
+                        osbs.dump_resource_to_file(resource_type, dump,
+                                                   page_size=args.page_size)
+                        t.write_fileobj(resource_type + ".json", dump)
                 except Exception as e:
                     if args.continue_on_error:
                         logger.warning(
@@ -601,8 +643,13 @@ def cli():
     get_build_parser.set_defaults(func=cmd_get_build)
 
     cancel_build_parser = subparsers.add_parser(str_on_2_unicode_on_3('cancel-build'),
-                                                help='cancel build specified by ID')
-    cancel_build_parser.add_argument("BUILD_ID", help="build ID", nargs=1)
+                                                help='cancel builds specified by ID or selector')
+    cancel_build_parser.add_argument("BUILD_ID", help="build ID", nargs="*")
+    cancel_build_parser.add_argument("--selector", action="append", metavar="KEY=VALUE",
+                                     help="cancel running builds with this label; "
+                                     "may be used multiple times")
+    cancel_build_parser.add_argument("--koji-task-id",
+                                     help="cancel running builds for this Koji task")
     cancel_build_parser.set_defaults(func=cmd_cancel_build)
 
     import_image_parser = subparsers.add_parser(str_on_2_unicode_on_3('import-image'),
@@ -639,6 +686,10 @@ def cli():
                                    action="store_true", default=False)
     build_logs_parser.add_argument("--wait-if-missing", help="if build is not created yet, wait",
                                    action="store_true", default=False)
+    build_logs_parser.add_argument("--output", metavar="FILE", dest="output_file",
+                                   help="write logs, as received, to this file")
+    build_logs_parser.add_argument("--compress", choices=LOG_COMPRESSIONS, default=None,
+                                   help="compress logs written to file")
     build_logs_parser.set_defaults(func=cmd_build_logs)
 
     get_quota_parser = subparsers.add_parser(str_on_2_unicode_on_3('get-quota'),
@@ -750,6 +801,8 @@ def cli():
                                 help="ignore resourcequota errors")
     backup_builder.add_argument("--continue-on-error", action='store_true',
                                 help="don't stop when backing up a resource fails")
+    backup_builder.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                                help="number of resources fetched in one request")
     backup_builder.set_defaults(func=cmd_backup)
 
     restore_builder = subparsers.add_parser(str_on_2_unicode_on_3('restore-builder'),
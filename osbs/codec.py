@@ -0,0 +1,335 @@
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+
+
+JSON encoding and decoding
+
+The fastest available backend is picked at import time: orjson, rapidjson or
+ujson, falling back to json from the standard library.
+
+loads() parses bytes or str. dumpb() serializes request bodies to bytes in
+the format of the backend, which may differ in whitespace and escaping from
+the standard library. dumps() always produces exactly what json.dumps()
+does, for JSON kept as text in objects, such as USER_PARAMS or annotations.
+JsonItemsParser parses list responses incrementally, element by element.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import codecs
+import json
+import logging
+import re
+import sys
+
+import six
+from requests.utils import guess_json_utf
+
+from osbs.exceptions import OsbsValidationException
+
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('orjson', 'rapidjson', 'ujson', 'json')
+
+# json.loads() only takes bytes since Python 3.6
+_STDLIB_LOADS_BYTES = not (3, 0) <= sys.version_info < (3, 6)
+
+
+def _stdlib_loads(data):
+    if isinstance(data, six.binary_type) and not _STDLIB_LOADS_BYTES:
+        data = data.decode(guess_json_utf(data))
+    return json.loads(data)
+
+
+def _stdlib_dumpb(obj, sort_keys=False):
+    return json.dumps(obj, sort_keys=sort_keys).encode('utf-8')
+
+
+def _orjson_codec(orjson):
+    def dumpb(obj, sort_keys=False):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+    return orjson.loads, dumpb
+
+
+def _rapidjson_codec(rapidjson):
+    def dumpb(obj, sort_keys=False):
+        return rapidjson.dumps(obj, sort_keys=sort_keys).encode('utf-8')
+
+    return rapidjson.loads, dumpb
+
+
+def _ujson_codec(ujson):
+    def dumpb(obj, sort_keys=False):
+        return ujson.dumps(obj, sort_keys=sort_keys, ensure_ascii=False,
+                           escape_forward_slashes=False).encode('utf-8')
+
+    return ujson.loads, dumpb
+
+
+_CODECS = {
+    'orjson': _orjson_codec,
+    'rapidjson': _rapidjson_codec,
+    'ujson': _ujson_codec,
+}
+
+BACKEND = None
+_loads = _stdlib_loads
+_dumpb = _stdlib_dumpb
+
+
+def use_backend(name=None):
+    """
+    select JSON backend
+
+    :param name: str, one of BACKENDS, or None for the fastest one available
+    :return: str, name of the backend in use
+    """
+    global BACKEND, _loads, _dumpb  # pylint: disable=global-statement
+
+    if name is not None and name not in BACKENDS:
+        raise OsbsValidationException("unknown JSON backend %r, use one of: %s" %
+                                      (name, ", ".join(BACKENDS)))
+
+    # the other backends differ in the types they return on Python 2
+    if name is not None:
+        candidates = [name]
+    else:
+        candidates = BACKENDS if six.PY3 else ['json']
+    for candidate in candidates:
+        if candidate == 'json':
+            BACKEND, _loads, _dumpb = 'json', _stdlib_loads, _stdlib_dumpb
+            break
+        try:
+            module = __import__(candidate)
+        except ImportError:
+            if name is not None:
+                raise OsbsValidationException("JSON backend %r is not installed" % name)
+            continue
+        _loads, _dumpb = _CODECS[candidate](module)
+        BACKEND = candidate
+        break
+
+    logger.debug("using JSON backend %s", BACKEND)
+    return BACKEND
+
+
+def loads(data):
+    """
+    parse JSON document
+
+    :param data: bytes or str
+    :return: parsed object
+    :raises ValueError: when data is not valid JSON
+    """
+    return _loads(data)
+
+
+def dumpb(obj, sort_keys=False):
+    """
+    serialize object to JSON, e.g. to send it in a request body
+
+    :param obj: object to serialize
+    :param sort_keys: bool, whether to sort keys of dicts
+    :return: bytes, UTF-8 encoded JSON
+    """
+    try:
+        return _dumpb(obj, sort_keys=sort_keys)
+    except (TypeError, OverflowError):
+        if _dumpb is _stdlib_dumpb:
+            raise
+        # e.g. non-str dict keys or very large ints, which the standard
+        # library takes
+        return _stdlib_dumpb(obj, sort_keys=sort_keys)
+
+
+def dumps(obj, **kwargs):
+    """
+    serialize object to JSON text, exactly as json.dumps does
+
+    :param obj: object to serialize
+    :param kwargs: keyword arguments of json.dumps, e.g. sort_keys
+    :return: str
+    """
+    return json.dumps(obj, **kwargs)
+
+
+class JsonItemsParser(object):
+    """
+    incremental parser of a JSON object with an array member, such as a List
+    object returned by the API server
+
+    The document, encoded in UTF-8, is fed in chunks as it is received.
+    Elements of the array are parsed and returned as soon as they are
+    complete, so only one of them is held in memory at a time. The rest of
+    the object is parsed once the whole document has been fed, with the
+    array left empty.
+
+    Elements are parsed with the scanner of the standard library, which
+    tells where each of them ends. An element not received whole yet is
+    parsed again only once its data has doubled, so large elements are not
+    parsed over and over.
+    """
+
+    # a string (with closing quote missing when it continues in next chunk)
+    # or a structural character
+    TOKEN_RE = re.compile(r'"([^"\\]*(?:\\.[^"\\]*)*)(")?|[\[\]{},:]', re.S)
+    SEPARATOR_RE = re.compile(r'[\s,]*')
+
+    def __init__(self, key='items'):
+        """
+        :param key: str, name of the array member of the top-level object
+        """
+        self._key = key
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._scanner = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0  # where to continue reading in _buf
+        self._depth = 0
+        self._last_string = None  # last string at top level, maybe a key
+        self._expect_items = False  # after key of the array and colon
+        self._in_items = False
+        self._retry_size = 0  # data needed to parse incomplete element again
+        self._final = False  # whole document was fed
+        self._envelope = []  # parts of document outside the array
+        self._envelope_start = 0  # None while in the array
+        self.items = 0
+
+    def feed(self, data, final=False):
+        """
+        :param data: bytes, next chunk of document
+        :param final: bool, whether it is the last chunk
+        :return: list of elements completed in this chunk
+        """
+        self._buf += self._decoder.decode(data, final)
+        if final:
+            self._final = True
+            self._retry_size = 0
+        elements = []
+        while True:
+            if self._in_items:
+                more = self._read_items(elements)
+            else:
+                more = self._read_envelope()
+            if not more:
+                break
+        self._trim()
+        self.items += len(elements)
+        return elements
+
+    def _read_envelope(self):
+        """
+        :return: bool, whether the array starts, False when more data is needed
+        """
+        buf = self._buf
+        search = self.TOKEN_RE.search
+        while True:
+            match = search(buf, self._pos)
+            if match is None:
+                self._pos = len(buf)
+                return False
+
+            token = match.group(0)
+            if token[0] == '"':
+                if match.group(2) is None:
+                    # string continues in next chunk
+                    self._pos = match.start()
+                    return False
+                if self._depth == 1:
+                    self._last_string = match.group(1)
+            elif token in '{[':
+                self._depth += 1
+                if self._expect_items and token == '[':
+                    self._pos = match.end()
+                    self._envelope.append(buf[self._envelope_start:self._pos])
+                    self._envelope_start = None
+                    self._in_items = True
+                    self._expect_items = False
+                    return True
+                self._expect_items = False
+            elif token in '}]':
+                self._depth -= 1
+            elif token == ',':
+                self._expect_items = False
+            else:  # colon
+                self._expect_items = self._depth == 1 and self._last_string == self._key
+            self._pos = match.end()
+
+    def _read_items(self, elements):
+        """
+        :return: bool, whether the array ends, False when more data is needed
+        """
+        buf = self._buf
+        while True:
+            pos = self.SEPARATOR_RE.match(buf, self._pos).end()
+            self._pos = pos
+            if pos == len(buf) or len(buf) - pos < self._retry_size:
+                return False
+            if buf[pos] == ']':
+                # read by _read_envelope as part of the rest of the object
+                self._in_items = False
+                self._envelope_start = pos
+                return True
+
+            try:
+                element, end = self._scanner.raw_decode(buf, pos)
+            except ValueError:
+                # not received whole yet
+                self._retry_size = 2 * (len(buf) - pos)
+                return False
+            if (buf[pos] not in '{["' and not self._final and
+                    (end == len(buf) or buf[end] not in ',] \t\r\n')):
+                # number or literal may continue in next chunk
+                return False
+            elements.append(element)
+            self._pos = end
+            self._retry_size = 0
+
+    def _trim(self):
+        # drop what was read and is not needed any more
+        if not self._in_items:
+            self._envelope.append(self._buf[self._envelope_start:self._pos])
+            self._envelope_start = 0
+        self._buf = self._buf[self._pos:]
+        self._pos = 0
+
+    def close(self):
+        """
+        :return: parsed document without the elements of the array
+        :raises ValueError: when the document is incomplete or not valid JSON
+        """
+        if not self._final:
+            self.feed(b'', final=True)
+        if self._in_items or self._depth:
+            raise ValueError("JSON document is incomplete")
+        self._envelope.append(self._buf)
+        self._buf = ''
+        return loads(''.join(self._envelope))
+
+
+def iter_json_items(chunks, key='items', envelope=None):
+    """
+    parse JSON object from chunks, yielding elements of its array member
+
+    :param chunks: iterable of bytes
+    :param key: str, name of the array member of the top-level object
+    :param envelope: dict, updated with the rest of the object when all
+                     chunks have been read, e.g. to get metadata.continue
+    :return: iterator of parsed elements
+    """
+    parser = JsonItemsParser(key)
+    for chunk in chunks:
+        for element in parser.feed(chunk):
+            yield element
+    for element in parser.feed(b'', final=True):
+        yield element
+    rest = parser.close()
+    if envelope is not None:
+        envelope.update(rest)
+
+
+use_backend()
@@ -19,7 +19,9 @@ from six.moves.urllib.parse import urljoin
 
 from osbs.constants import (DEFAULT_CONFIGURATION_FILE, DEFAULT_CONFIGURATION_SECTION,
                             GENERAL_CONFIGURATION_SECTION, DEFAULT_NAMESPACE,
-                            DEFAULT_ARRANGEMENT_VERSION, REACTOR_CONFIG_ARRANGEMENT_VERSION)
+                            DEFAULT_ARRANGEMENT_VERSION, REACTOR_CONFIG_ARRANGEMENT_VERSION,
+                            HTTP_POOL_MAXSIZE, REPO_INFO_CACHE_SIZE, API_QPS, API_BURST,
+                            API_STREAM_QPS, API_STREAM_BURST)
 from osbs.exceptions import OsbsValidationException
 from osbs import utils
 
@@ -338,6 +340,51 @@ class Configuration(object):
         return self._get_value("verify_ssl", self.conf_section, "verify_ssl",
                                default=True, is_bool_val=True)
 
+    def get_http_pool_maxsize(self):
+        value = self._get_value("http_pool_maxsize", self.conf_section, "http_pool_maxsize",
+                                default=HTTP_POOL_MAXSIZE)
+        try:
+            return int(value)
+        except ValueError:
+            raise OsbsValidationException("Invalid http_pool_maxsize: %s" % value)
+
+    def _get_rate_limit(self, key, default, type_):
+        value = self._get_value(key, self.conf_section, key, default=default)
+        try:
+            value = type_(value)
+        except ValueError:
+            raise OsbsValidationException("Invalid %s: %s" % (key, value))
+        if value < 0:
+            raise OsbsValidationException("Invalid %s: %s" % (key, value))
+        return value
+
+    def get_api_qps(self):
+        return self._get_rate_limit("api_qps", API_QPS, float)
+
+    def get_api_burst(self):
+        return self._get_rate_limit("api_burst", API_BURST, int)
+
+    def get_api_stream_qps(self):
+        return self._get_rate_limit("api_stream_qps", API_STREAM_QPS, float)
+
+    def get_api_stream_burst(self):
+        return self._get_rate_limit("api_stream_burst", API_STREAM_BURST, int)
+
+    def get_http_keepalive(self):
+        return self._get_value("http_keepalive", self.conf_section, "http_keepalive",
+                               default=True, is_bool_val=True)
+
+    def get_repo_info_cache_dir(self):
+        return self._get_value("repo_info_cache_dir", self.conf_section, "repo_info_cache_dir")
+
+    def get_repo_info_cache_size(self):
+        value = self._get_value("repo_info_cache_size", self.conf_section,
+                                "repo_info_cache_size", default=REPO_INFO_CACHE_SIZE)
+        try:
+            return int(value)
+        except ValueError:
+            raise OsbsValidationException("Invalid repo_info_cache_size: %s" % value)
+
     def get_vendor(self):
         return self._get_deprecated("vendor", self.conf_section, "vendor")
 
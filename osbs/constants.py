@@ -47,6 +47,7 @@ WATCH_ADDED = 'added'
 WATCH_DELETED = 'deleted'
 WATCH_MODIFIED = 'modified'
 WATCH_ERROR = 'error'
+WATCH_BOOKMARK = 'bookmark'
 
 # https://github.com/openshift/origin/blob/master/pkg/build/api/types.go
 # type BuildStatus string
@@ -77,27 +78,68 @@ REPO_CONFIG_FILE = '.osbs-repo-config'
 ADDITIONAL_TAGS_FILE = 'additional-tags'
 REPO_CONTAINER_CONFIG = 'container.yaml'
 
+# files from the git repository which RepoInfo is made from
+REPO_INFO_FILES = ('Dockerfile', REPO_CONFIG_FILE, REPO_CONTAINER_CONFIG, ADDITIONAL_TAGS_FILE)
+
+# maximum total size in bytes of files kept in repository info cache
+REPO_INFO_CACHE_SIZE = 50 * 1024 * 1024
+
 # number of retries for http requests
 HTTP_MAX_RETRIES = 8
 
-# how many seconds should request wait for in case non-critical error has occurred
+# upper bound in seconds of the first random delay before retrying http request,
+# doubled for every following retry
 HTTP_BACKOFF_FACTOR = 4
 
 # Statuses which should trigger automatic retry
 HTTP_RETRIES_STATUS_FORCELIST = [408, 500, 502, 503, 504]
 
 # HTTP methods that we should retry on
-HTTP_RETRIES_METHODS_WHITELIST = ['GET', 'PUT', 'POST', 'DELETE']
+HTTP_RETRIES_METHODS_WHITELIST = ['GET', 'PUT', 'POST', 'DELETE', 'PATCH']
+
+# content types of PATCH requests
+MERGE_PATCH_CONTENT_TYPE = 'application/merge-patch+json'
+JSON_PATCH_CONTENT_TYPE = 'application/json-patch+json'
 
 # requests timeout in seconds
 HTTP_REQUEST_TIMEOUT = 600
 
+# number of objects fetched in one request by paginated list calls
+DEFAULT_PAGE_SIZE = 500
+
+# number of per-host connection pools kept by each pooled session
+HTTP_POOL_CONNECTIONS = 10
+
+# maximum number of connections kept alive in a single per-host pool
+HTTP_POOL_MAXSIZE = 10
+
+# client-side rate limits for OpenShift API calls: requests per second
+# (0 means unlimited) and number of requests allowed in a burst; watch and
+# log streams have a separate budget
+API_QPS = 0
+API_BURST = 10
+API_STREAM_QPS = 0
+API_STREAM_BURST = 5
+
 # number of retries on openshift conflict
 OS_CONFLICT_MAX_RETRIES = 8
 
-# number of seconds to wait, before retrying on openshift conflict
+# upper bound in seconds of the first random delay before retrying on openshift
+# conflict, doubled for every following retry
 OS_CONFLICT_WAIT = 5
 
+# upper bound in seconds of any delay between retries
+RETRY_MAX_DELAY = 60
+
+# no more retries of a single call after this many seconds
+RETRY_DEADLINE = 300
+
+# retries are shared among all calls: each retry takes a token from the budget,
+# each successful call returns a fraction of one; retrying stops while half of
+# the budget is used up
+RETRY_BUDGET_TOKENS = 100
+RETRY_BUDGET_RATIO = 0.1
+
 BUILD_TYPE_ORCHESTRATOR = "orchestrator"
 BUILD_TYPE_WORKER = "worker"
 
@@ -112,3 +154,12 @@ ANNOTATION_INSECURE_REPO = 'openshift.io/image.insecureRepository'
 
 # optional key path for filtering existing build config results
 FILTER_KEY = 'spec.source.git.uri'
+
+# size in bytes of pieces in which build logs are read when written to a file
+LOG_CHUNK_SIZE = 64 * 1024
+
+# compression formats of build logs written to a file
+LOG_COMPRESSIONS = ('gzip', 'bz2')
+
+# size in bytes of pieces in which list responses are read when parsed as they come
+JSON_STREAM_CHUNK_SIZE = 64 * 1024
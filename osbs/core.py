@@ -7,8 +7,11 @@ of the BSD license. See the LICENSE file for details.
 """
 from __future__ import print_function, unicode_literals, absolute_import
 import json
+import math
 import os
+import re
 import numbers
+import random
 import time
 import base64
 
@@ -16,16 +19,19 @@ import logging
 from osbs.kerberos_ccache import kerberos_ccache_init
 from osbs.build.build_response import BuildResponse
 from osbs.constants import (DEFAULT_NAMESPACE, BUILD_FINISHED_STATES, BUILD_RUNNING_STATES,
-                            WATCH_MODIFIED, WATCH_DELETED,
+                            WATCH_MODIFIED, WATCH_DELETED, WATCH_ERROR, WATCH_BOOKMARK,
                             SERVICEACCOUNT_SECRET, SERVICEACCOUNT_TOKEN,
                             SERVICEACCOUNT_CACRT, ANNOTATION_SOURCE_REPO,
-                            ANNOTATION_INSECURE_REPO)
-from osbs.exceptions import (OsbsResponseException, OsbsException,
-                             OsbsWatchBuildNotFound, OsbsAuthException,
+                            ANNOTATION_INSECURE_REPO, HTTP_POOL_MAXSIZE, DEFAULT_PAGE_SIZE,
+                            API_QPS, API_BURST, API_STREAM_QPS, API_STREAM_BURST,
+                            MERGE_PATCH_CONTENT_TYPE, JSON_PATCH_CONTENT_TYPE, LOG_CHUNK_SIZE)
+from osbs.exceptions import (OsbsResponseException, OsbsException, OsbsNetworkException,
+                             OsbsWatchBuildNotFound, OsbsWatchTimeout, OsbsAuthException,
                              ImportImageFailed, ImportImageFailedServerError)
-from osbs.utils import graceful_chain_get, retry_on_conflict, retry_on_exception
+from osbs.utils import (graceful_chain_get, retry_on_conflict, retry_on_exception,
+                        RateLimiter)
+from osbs import codec
 from requests.exceptions import ConnectionError
-from requests.utils import guess_json_utf
 from requests import codes
 
 from six.moves import http_client
@@ -37,7 +43,9 @@ from .http import HttpSession
 logger = logging.getLogger(__name__)
 
 
-# Retry each connection attempt after 30 seconds, for a maximum of 10 times
+# Reconnect watch after failure with exponential backoff starting at 1 second
+# and capped at 30 seconds; give up after 10 consecutive failures
+WATCH_BACKOFF_SECS = 1
 WATCH_RETRY_SECS = 30
 WATCH_RETRY = 10
 # Give up after 12 hours
@@ -56,6 +64,217 @@ def check_response(response, log_level=logging.ERROR):
         raise OsbsResponseException(message=content, status_code=response.status_code)
 
 
+class LogStreamState(object):
+    """
+    position in a followed build log, used to resume it without gaps or repeats
+
+    Log lines are requested with timestamps=true, so every line starts with
+    RFC 3339 time in UTC followed by a space. The timestamp is stripped from
+    lines passed on. After reconnecting with sinceTime set to the time of
+    the last line received, lines which were already received are dropped:
+    those older than it, and as many of the lines with exactly that time as
+    were received before.
+
+    Counters in `stats`: 'lines' and 'bytes' passed on, 'reconnects' and
+    'duplicates' dropped.
+    """
+
+    TIMESTAMP_RE = re.compile(br'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?Z$')
+
+    def __init__(self, stats=None):
+        """
+        :param stats: dict to keep counters in
+        """
+        self.stats = stats if stats is not None else {}
+        for counter in ('lines', 'bytes', 'reconnects', 'duplicates'):
+            self.stats.setdefault(counter, 0)
+
+        self.last_timestamp = None
+        self._last_key = None
+        self._last_count = 0  # lines received with the last timestamp
+        self._resuming = False
+        self._repeated = 0  # lines with the last timestamp received again
+
+    def query(self):
+        """
+        :return: dict, query parameters for the log request
+        """
+        query = {'follow': 1, 'timestamps': 'true'}
+        if self.last_timestamp is not None:
+            query['sinceTime'] = self.last_timestamp
+        return query
+
+    def reconnecting(self):
+        self.stats['reconnects'] += 1
+        self._resuming = self._last_key is not None
+        self._repeated = 0
+        logger.debug("resuming log from %s", self.last_timestamp or 'start')
+
+    @staticmethod
+    def _timestamp_key(timestamp):
+        # fraction of second has variable length, make keys comparable
+        seconds, _, fraction = timestamp[:-1].partition(b'.')
+        return seconds, fraction.ljust(9, b'0')
+
+    def accept(self, line):
+        """
+        :param line: bytes, line received from server
+        :return: bytes, line without timestamp, or None when it's a repeat
+        """
+        timestamp, _, content = line.partition(b' ')
+        if not self.TIMESTAMP_RE.match(timestamp):
+            # no timestamp to tell repeats by
+            timestamp, content = None, line
+
+        if timestamp is not None:
+            key = self._timestamp_key(timestamp)
+            if self._resuming:
+                if key < self._last_key:
+                    self.stats['duplicates'] += 1
+                    return None
+                if key == self._last_key and self._repeated < self._last_count:
+                    self._repeated += 1
+                    self.stats['duplicates'] += 1
+                    return None
+                self._resuming = False
+
+            if key == self._last_key:
+                self._last_count += 1
+            else:
+                self._last_key = key
+                self._last_count = 1
+                self.last_timestamp = timestamp.decode('ascii')
+
+        self.stats['lines'] += 1
+        self.stats['bytes'] += len(content)
+        return content
+
+
+class WatchEventDecoder(object):
+    """
+    decode lines of a watch stream into (change type, object) tuples
+
+    Lines are parsed as JSON straight from bytes. When names of objects of
+    interest are given, events for other objects are skipped before being
+    parsed: their type and the "name" fields are found with regular
+    expressions, which is much cheaper than parsing the whole object. The
+    check is conservative, an event is only skipped when it has a "type"
+    field with a known event type, none of them ERROR or BOOKMARK, and no
+    "name" field in it has one of the names. Fields may come in any order.
+    The resourceVersion of a skipped event is kept in
+    `skipped_resource_version`, it is the first "resourceVersion" field in
+    the event, which is the one in the object's metadata.
+
+    Counters in `stats`: 'decoded' events, 'skipped' events and 'invalid'
+    lines.
+    """
+
+    EVENT_TYPE_RE = re.compile(br'"type"\s*:\s*"(ADDED|MODIFIED|DELETED|ERROR|BOOKMARK)"')
+    NAME_RE = re.compile(br'"name"\s*:\s*"([^"]*)"')
+    RESOURCE_VERSION_RE = re.compile(br'"resourceVersion"\s*:\s*"([^"]*)"')
+    UNSKIPPABLE_TYPES = (b'ERROR', b'BOOKMARK')
+
+    def __init__(self, names=None, loads=None, stats=None):
+        """
+        :param names: set of str, names of objects to decode events for,
+                      None decodes all events; it may change while decoding
+        :param loads: callable, parses JSON from bytes, default osbs.codec.loads
+        :param stats: dict to keep counters in
+        """
+        self.names = names
+        self._loads = loads or codec.loads
+        self.stats = stats if stats is not None else {}
+        for counter in ('decoded', 'skipped', 'invalid'):
+            self.stats.setdefault(counter, 0)
+        self.skipped_resource_version = None
+
+    def skip(self, line):
+        """
+        :param line: bytes, line received from watch stream
+        :return: bool, whether the event is not about any of the names; when
+                 True, skipped_resource_version is set to the event's
+                 resourceVersion, or None if not found
+        """
+        if self.names is None:
+            return False
+        # objects may have "type" fields too, look at all of them
+        types = self.EVENT_TYPE_RE.findall(line)
+        if not types or any(t in self.UNSKIPPABLE_TYPES for t in types):
+            return False
+        for name in self.NAME_RE.findall(line):
+            if name.decode('utf-8') in self.names:
+                return False
+        self.stats['skipped'] += 1
+        match = self.RESOURCE_VERSION_RE.search(line)
+        self.skipped_resource_version = match.group(1).decode('utf-8') if match else None
+        return True
+
+    def decode(self, line):
+        """
+        :param line: bytes, line received from watch stream, which skip()
+                     returned False for
+        :return: tuple (change type, object), or None for invalid events
+        """
+        try:
+            j = self._loads(line)
+        except ValueError:
+            logger.error("Cannot decode watch event: %s", line)
+            self.stats['invalid'] += 1
+            return None
+
+        if 'object' not in j:
+            logger.error("Watch event has no 'object': %s", j)
+            self.stats['invalid'] += 1
+            return None
+
+        if 'type' not in j:
+            logger.error("Watch event has no 'type': %s", j)
+            self.stats['invalid'] += 1
+            return None
+
+        self.stats['decoded'] += 1
+        return (j['type'].lower(), j['object'])
+
+
+def track_watched(seen, changetype, obj):
+    """
+    keep names of objects a watch yielded events for, see relist_events
+
+    :param seen: set of str, updated
+    :param changetype: str, type of watch event
+    :param obj: dict, object from the watch event
+    """
+    name = graceful_chain_get(obj, 'metadata', 'name')
+    if name is None or changetype in (WATCH_ERROR, WATCH_BOOKMARK):
+        return
+    if changetype == WATCH_DELETED:
+        seen.discard(name)
+    else:
+        seen.add(name)
+
+
+def relist_events(objects, seen):
+    """
+    events for objects listed again after the watch expired (410 Gone)
+
+    Objects the watch yielded events for which are not listed any more were
+    deleted while it was down; they are reported as deleted, with only their
+    name known. Listed objects are reported as modified.
+
+    :param objects: list of dicts, objects listed
+    :param seen: set of str, names of objects the watch yielded events for,
+                 updated
+    :return: list of tuples (change type, object)
+    """
+    listed = set(graceful_chain_get(obj, 'metadata', 'name') for obj in objects)
+    events = [(WATCH_DELETED, {'metadata': {'name': name}})
+              for name in sorted(seen - listed)]
+    events.extend((WATCH_MODIFIED, obj) for obj in objects)
+    seen.clear()
+    seen.update(name for name in listed if name is not None)
+    return events
+
+
 # TODO: error handling: create function which handles errors in response object
 class Openshift(object):
     def __init__(self, openshift_api_url, openshift_api_version, openshift_oauth_url,
@@ -63,7 +282,11 @@ class Openshift(object):
                  verbose=False, username=None, password=None, use_kerberos=False,
                  kerberos_keytab=None, kerberos_principal=None, kerberos_ccache=None,
                  client_cert=None, client_key=None, verify_ssl=True, use_auth=None,
-                 token=None, namespace=DEFAULT_NAMESPACE):
+                 token=None, namespace=DEFAULT_NAMESPACE,
+                 http_pool_maxsize=HTTP_POOL_MAXSIZE, http_keepalive=True,
+                 api_qps=API_QPS, api_burst=API_BURST,
+                 api_stream_qps=API_STREAM_QPS, api_stream_burst=API_STREAM_BURST,
+                 retry_policy=None):
         self.os_api_url = openshift_api_url
         self.k8s_api_url = k8s_api_url
         self._os_api_version = openshift_api_version
@@ -71,8 +294,18 @@ class Openshift(object):
         self.namespace = namespace
         self.verbose = verbose
         self.verify_ssl = verify_ssl
-        self._con = HttpSession(verbose=self.verbose)
+        self._con = HttpSession(verbose=self.verbose, pool_maxsize=http_pool_maxsize,
+                                keepalive=http_keepalive, retry_policy=retry_policy,
+                                throttle=self._throttle)
+        self.retry_policy = self._con.retry_policy
+        # cleared when the server rejects PATCH, objects are then updated with GET + PUT
+        self.use_patch = True
         self.retries_enabled = True
+        # short requests and long-running watch/log streams are limited separately,
+        # so that open streams don't use up the budget for other calls
+        self._rate_limiter = RateLimiter(api_qps, api_burst) if api_qps else None
+        self._stream_rate_limiter = (RateLimiter(api_stream_qps, api_stream_burst)
+                                     if api_stream_qps else None)
 
         # auth stuff
         self.use_kerberos = use_kerberos
@@ -168,29 +401,73 @@ class Openshift(object):
 
         return headers, kwargs
 
-    def _post(self, url, with_auth=True, **kwargs):
-        headers, kwargs = self._request_args(with_auth, **kwargs)
-        return self._con.post(
-            url, headers=headers, verify_ssl=self.verify_ssl,
-            retries_enabled=self.retries_enabled, **kwargs)
+    def _throttle(self, url, long_lived=False):
+        # only watches and followed logs count against the stream limit, pages
+        # of lists are streamed too but they are ordinary short requests
+        limiter = self._stream_rate_limiter if long_lived else self._rate_limiter
+        if limiter is not None:
+            waited = limiter.acquire()
+            if waited:
+                logger.debug("rate limited, waited %.3fs before requesting %s", waited, url)
 
-    def _get(self, url, with_auth=True, **kwargs):
+    def _request(self, send, url, with_auth, operation, kwargs):
         headers, kwargs = self._request_args(with_auth, **kwargs)
-        return self._con.get(
-            url, headers=headers, verify_ssl=self.verify_ssl,
-            retries_enabled=self.retries_enabled, **kwargs)
+        self._throttle(url, kwargs.get('long_lived', False))
+        return send(url, headers=headers, verify_ssl=self.verify_ssl,
+                    retries_enabled=self.retries_enabled, operation=operation, **kwargs)
 
-    def _put(self, url, with_auth=True, **kwargs):
-        headers, kwargs = self._request_args(with_auth, **kwargs)
-        return self._con.put(
-            url, headers=headers, verify_ssl=self.verify_ssl,
-            retries_enabled=self.retries_enabled, **kwargs)
+    def _post(self, url, with_auth=True, operation=None, **kwargs):
+        return self._request(self._con.post, url, with_auth, operation, kwargs)
 
-    def _delete(self, url, with_auth=True, **kwargs):
-        headers, kwargs = self._request_args(with_auth, **kwargs)
-        return self._con.delete(
-            url, headers=headers, verify_ssl=self.verify_ssl,
-            retries_enabled=self.retries_enabled, **kwargs)
+    def _get(self, url, with_auth=True, operation=None, **kwargs):
+        return self._request(self._con.get, url, with_auth, operation, kwargs)
+
+    def _put(self, url, with_auth=True, operation=None, **kwargs):
+        return self._request(self._con.put, url, with_auth, operation, kwargs)
+
+    def _delete(self, url, with_auth=True, operation=None, **kwargs):
+        return self._request(self._con.delete, url, with_auth, operation, kwargs)
+
+    def _patch(self, url, with_auth=True, operation=None, **kwargs):
+        return self._request(self._con.patch, url, with_auth, operation, kwargs)
+
+    def add_request_hook(self, hook):
+        """
+        call hook with osbs.http.RequestRecord of each request once it is
+        done, tagged with the operation which made it, e.g. 'get_build'
+
+        :param hook: callable taking RequestRecord, e.g. osbs.http.RequestStats
+        """
+        self._con.add_request_hook(hook)
+
+    def remove_request_hook(self, hook):
+        self._con.remove_request_hook(hook)
+
+    def patch_object(self, url, patch, content_type=MERGE_PATCH_CONTENT_TYPE,
+                     operation='patch_object'):
+        """
+        update object with a single PATCH request
+
+        :param url: str, URL of the object
+        :param patch: dict or list, merge patch or JSON patch document
+        :param content_type: str, MERGE_PATCH_CONTENT_TYPE or JSON_PATCH_CONTENT_TYPE
+        :param operation: str, name of the operation the request is made for
+        :return: HttpResponse, or None when the server doesn't support PATCH
+        """
+        if not self.use_patch:
+            return None
+
+        response = self._patch(url, data=codec.dumpb(patch),
+                               headers={"Content-Type": content_type}, operation=operation)
+        if response.status_code in (http_client.METHOD_NOT_ALLOWED,
+                                    http_client.UNSUPPORTED_MEDIA_TYPE):
+            logger.info("PATCH rejected by server (%d), using GET and PUT",
+                        response.status_code)
+            self.use_patch = False
+            return None
+
+        check_response(response)
+        return response
 
     def get_oauth_token(self):
         url = self.os_oauth_url + "?response_type=token&client_id=openshift-challenging-client"
@@ -198,7 +475,8 @@ class Openshift(object):
             if self.username and self.password:
                 logger.debug("using basic authentication")
                 r = self._get(url, with_auth=False, allow_redirects=False,
-                              username=self.username, password=self.password)
+                              username=self.username, password=self.password,
+                              operation='get_oauth_token')
             elif self.use_kerberos:
                 logger.debug("using kerberos authentication")
 
@@ -209,13 +487,15 @@ class Openshift(object):
                     kerberos_ccache_init(self.kerberos_principal, self.kerberos_keytab,
                                          ccache_file=self.kerberos_ccache)
 
-                r = self._get(url, with_auth=False, allow_redirects=False, kerberos_auth=True)
+                r = self._get(url, with_auth=False, allow_redirects=False, kerberos_auth=True,
+                              operation='get_oauth_token')
             else:
                 logger.debug("using identity authentication")
-                r = self._get(url, with_auth=False, allow_redirects=False)
+                r = self._get(url, with_auth=False, allow_redirects=False,
+                              operation='get_oauth_token')
         else:
             logger.debug("getting token without any authentication (fingers crossed)")
-            r = self._get(url, with_auth=False, allow_redirects=False)
+            r = self._get(url, with_auth=False, allow_redirects=False, operation='get_oauth_token')
 
         try:
             redir_url = r.headers['location']
@@ -238,7 +518,7 @@ class Openshift(object):
         :return: dict
         """
         url = self._build_url("users/%s/" % username, _prepend_namespace=False)
-        response = self._get(url)
+        response = self._get(url, operation='get_user')
         check_response(response)
         return response
 
@@ -246,7 +526,7 @@ class Openshift(object):
         result = {}
 
         url = self._build_k8s_url("serviceaccounts/%s/" % username, _prepend_namespace=True)
-        response = self._get(url)
+        response = self._get(url, operation='get_serviceaccount_tokens')
         check_response(response)
         sa_json = response.json()
         if not sa_json:
@@ -269,7 +549,7 @@ class Openshift(object):
                 continue
 
             url = self._build_k8s_url("secrets/%s/" % secret_name, _prepend_namespace=True)
-            response = self._get(url)
+            response = self._get(url, operation='get_serviceaccount_tokens')
             check_response(response)
 
             secret_json = response.json()
@@ -299,27 +579,48 @@ class Openshift(object):
         """
         url = self._build_url("builds/")
         logger.debug(build_json)
-        return self._post(url, data=json.dumps(build_json),
-                          headers={"Content-Type": "application/json"})
+        return self._post(url, data=codec.dumpb(build_json),
+                          headers={"Content-Type": "application/json"}, operation='create_build')
 
     def cancel_build(self, build_id):
+        url = self._build_url("builds/%s/" % build_id)
+        response = self.patch_object(url, {'status': {'cancelled': True}},
+                                     operation='cancel_build')
+        if response is not None:
+            return response
+
         response = self.get_build(build_id)
         br = BuildResponse(response.json())
         br.cancelled = True
         url = self._build_url("builds/%s/" % build_id)
-        return self._put(url, data=json.dumps(br.json),
-                         headers={"Content-Type": "application/json"})
+        return self._put(url, data=codec.dumpb(br.json),
+                         headers={"Content-Type": "application/json"}, operation='cancel_build')
 
     def list_pods(self, label=None):
         kwargs = {}
         if label is not None:
             kwargs['labelSelector'] = label
         url = self._build_k8s_url("pods/", **kwargs)
-        return self._get(url)
+        return self._get(url, operation='list_pods')
+
+    def iter_pods(self, label=None, page_size=DEFAULT_PAGE_SIZE):
+        """
+        iterate over pods, fetching them in pages and parsing them as they
+        are received
+
+        :param label: str, label selector
+        :param page_size: int, maximum number of pods in one page
+        :return: iterator of dicts
+        """
+        query = {}
+        if label is not None:
+            query['labelSelector'] = label
+        return self._iter_list(self._build_k8s_url, "pods/", page_size, query,
+                               operation="iter_pods")
 
     def get_build_config(self, build_config_id):
         url = self._build_url("buildconfigs/%s/" % build_config_id)
-        response = self._get(url)
+        response = self._get(url, operation='get_build_config')
         build_config = response.json()
         return build_config
 
@@ -331,7 +632,16 @@ class Openshift(object):
         labels = ['%s=%s' % (field, value) for field, value in label_selectors]
         labels = ','.join(labels)
         url = self._build_url("buildconfigs/", labelSelector=labels)
-        return self._get(url).json()['items']
+        return self._get(url, operation='get_all_build_configs_by_labels').json()['items']
+
+    def iter_build_configs_by_labels(self, label_selectors, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Iterate over build configs matching a given set of label selectors,
+        fetching them in pages of page_size objects.
+        """
+        labels = ['%s=%s' % (field, value) for field, value in label_selectors]
+        labels = ','.join(labels)
+        return self.iter_resource("buildconfigs", page_size=page_size, labelSelector=labels)
 
     def get_build_config_by_labels(self, label_selectors):
         """
@@ -384,12 +694,14 @@ class Openshift(object):
         """
         url = self._build_url("buildconfigs/")
         return self._post(url, data=build_config_json,
-                          headers={"Content-Type": "application/json"})
+                          headers={"Content-Type": "application/json"},
+                          operation='create_build_config')
 
     def update_build_config(self, build_config_id, build_config_json):
         url = self._build_url("buildconfigs/%s" % build_config_id)
         response = self._put(url, data=build_config_json,
-                             headers={"Content-Type": "application/json"})
+                             headers={"Content-Type": "application/json"},
+                             operation='update_build_config')
         check_response(response)
         return response
 
@@ -403,7 +715,8 @@ class Openshift(object):
             },
         })
         return self._post(url, data=data,
-                          headers={"Content-Type": "application/json"})
+                          headers={"Content-Type": "application/json"},
+                          operation='instantiate_build_config')
 
     def start_build(self, build_config_id):
         """
@@ -431,14 +744,19 @@ class Openshift(object):
         raise OsbsResponseException("New BuildConfig instance not found",
                                     http_client.NOT_FOUND)
 
-    def stream_logs(self, build_id):
+    def stream_logs(self, build_id, stats=None):
         """
         stream logs from build
 
+        Lines are requested with timestamps, so that when the connection
+        is closed, following the log is resumed from the last line received
+        and lines sent again by the server are dropped.
+
         :param build_id: str
+        :param stats: dict, updated with counters, see LogStreamState
         :return: iterator
         """
-        kwargs = {'follow': 1}
+        state = LogStreamState(stats)
 
         # If connection is closed within this many seconds, give up:
         min_idle_timeout = 60
@@ -450,15 +768,17 @@ class Openshift(object):
         last_activity = time.time()
         while True:
             buildlogs_url = self._build_url("builds/%s/log/" % build_id,
-                                            **kwargs)
+                                            **state.query())
             try:
-                response = self._get(buildlogs_url, stream=1,
-                                     headers={'Connection': 'close'})
+                response = self._get(buildlogs_url, stream=1, long_lived=True,
+                                     operation='stream_logs')
                 check_response(response)
 
                 for line in response.iter_lines():
                     last_activity = time.time()
-                    yield line
+                    line = state.accept(line)
+                    if line is not None:
+                        yield line
             # NOTE1: If self._get causes ChunkedEncodingError, ConnectionError,
             # or IncompleteRead to be raised, they'll be wrapped in
             # OsbsNetworkException or OsbsException
@@ -476,13 +796,22 @@ class Openshift(object):
             logger.debug("connection closed after %ds", idle)
             if idle < min_idle_timeout:
                 # Finish output
+                logger.debug("log of %s streamed: %s", build_id, state.stats)
                 return
 
-            since = int(idle - 1)
-            logger.debug("fetching logs starting from %ds ago", since)
-            kwargs['sinceSeconds'] = since
+            state.reconnecting()
+
+    def _iter_log_chunks(self, build_id):
+        buildlogs_url = self._build_url("builds/%s/log/" % build_id)
+        response = self._get(buildlogs_url, stream=True, headers={'Connection': 'close'},
+                             operation='logs')
+        with response:
+            check_response(response)
+            for chunk in response.iter_chunks(LOG_CHUNK_SIZE):
+                yield chunk
 
-    def logs(self, build_id, follow=False, build_json=None, wait_if_missing=False):
+    def logs(self, build_id, follow=False, build_json=None, wait_if_missing=False,
+             chunked=False):
         """
         provide logs from build
 
@@ -490,6 +819,8 @@ class Openshift(object):
         :param follow: bool, fetch logs as they come?
         :param build_json: dict, to save one get-build query
         :param wait_if_missing: bool, if build doesn't exist, wait
+        :param chunked: bool, when not following, return iterator of raw
+                        chunks of the log instead of reading it whole
         :return: None, str or iterator
         """
         # does build exist?
@@ -514,8 +845,11 @@ class Openshift(object):
         if follow:
             return self.stream_logs(build_id)
 
+        if chunked:
+            return self._iter_log_chunks(build_id)
+
         buildlogs_url = self._build_url("builds/%s/log/" % build_id)
-        response = self._get(buildlogs_url, headers={'Connection': 'close'})
+        response = self._get(buildlogs_url, headers={'Connection': 'close'}, operation='logs')
         check_response(response)
         return response.content
 
@@ -529,6 +863,42 @@ class Openshift(object):
         :param field_selector: str, field selector for query
         :return: HttpResponse
         """
+        query = self._list_builds_query(build_config_id=build_config_id,
+                                        koji_task_id=koji_task_id,
+                                        field_selector=field_selector,
+                                        labels=labels)
+        url = self._build_url("builds/", **query)
+        return self._get(url, operation='list_builds')
+
+    def iter_builds(self, build_config_id=None, koji_task_id=None,
+                    field_selector=None, labels=None, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Iterate over builds matching criteria, fetching them in pages
+
+        Builds are parsed as they are received, so only one of them is held
+        in memory at a time.
+
+        :param build_config_id: str, only list builds created from BuildConfig
+        :param koji_task_id: str, only list builds for Koji Task ID
+        :param field_selector: str, field selector for query
+        :param labels: dict, only list builds with these labels
+        :param page_size: int, number of builds fetched in one request
+        :return: iterator of dicts
+        """
+        query = self._list_builds_query(build_config_id=build_config_id,
+                                        koji_task_id=koji_task_id,
+                                        field_selector=field_selector,
+                                        labels=labels)
+        return self.iter_resource("builds", page_size=page_size, **query)
+
+    @staticmethod
+    def _list_builds_query(build_config_id=None, koji_task_id=None,
+                           field_selector=None, labels=None):
+        """
+        query parameters for listing builds matching criteria
+
+        :return: dict
+        """
         query = {}
         selector = '{key}={value}'
 
@@ -549,8 +919,7 @@ class Openshift(object):
 
         if field_selector is not None:
             query['fieldSelector'] = field_selector
-        url = self._build_url("builds/", **query)
-        return self._get(url)
+        return query
 
     def get_build(self, build_id):
         """
@@ -558,19 +927,19 @@ class Openshift(object):
         :return:
         """
         url = self._build_url("builds/%s/" % build_id)
-        response = self._get(url)
+        response = self._get(url, operation='get_build')
         check_response(response)
         return response
 
     def list_resource_quotas(self):
         url = self._build_k8s_url("resourcequotas/")
-        response = self._get(url)
+        response = self._get(url, operation='list_resource_quotas')
         check_response(response)
         return response
 
     def get_resource_quota(self, quota_name):
         url = self._build_k8s_url("resourcequotas/%s" % quota_name)
-        response = self._get(url)
+        response = self._get(url, operation='get_resource_quota')
         check_response(response)
         return response
 
@@ -583,57 +952,188 @@ class Openshift(object):
 
         url = self._build_k8s_url("resourcequotas/")
         response = self._post(url, data=json.dumps(quota_json),
-                              headers={"Content-Type": "application/json"})
+                              headers={"Content-Type": "application/json"},
+                              operation='create_resource_quota')
         if response.status_code == http_client.CONFLICT:
             url = self._build_k8s_url("resourcequotas/%s" % name)
             response = self._put(url, data=json.dumps(quota_json),
-                                 headers={"Content-Type": "application/json"})
+                                 headers={"Content-Type": "application/json"},
+                                 operation='create_resource_quota')
 
         check_response(response)
         return response
 
     def delete_resource_quota(self, name):
         url = self._build_k8s_url("resourcequotas/%s" % name)
-        response = self._delete(url)
+        response = self._delete(url, operation='delete_resource_quota')
         if response.status_code != http_client.NOT_FOUND:
             check_response(response)
 
         return response
 
-    def watch_resource(self, resource_type, resource_name=None, **request_args):
+    def watch_resource(self, resource_type, resource_name=None, deadline=None, names=None,
+                       on_relist=None, **request_args):
+        """
+        watch changes of resource(s)
+
+        The watch is resumed from the last seen resourceVersion immediately
+        after the server closes it. Failed or empty watch streams are retried
+        with jittered exponential backoff, up to WATCH_RETRY times in a row.
+        When the resourceVersion is too old (410 Gone), objects are listed
+        again before watching from the list's resourceVersion: listed objects
+        are yielded as modified, and objects yielded before which are missing
+        from the list as deleted, see relist_events.
+
+        :param resource_type: str, e.g. 'builds'
+        :param resource_name: str, name of the object to watch, or None for
+                              all objects in the namespace
+        :param deadline: float, time (as returned by time.time()) when to stop
+                         watching, None watches until retries are exhausted
+        :param names: set of str, only yield events for objects of these
+                      names, others are skipped without being parsed, see
+                      WatchEventDecoder, and left out when listing again;
+                      None yields all events
+        :param on_relist: callable, called with the list of objects and its
+                          resourceVersion instead of yielding events for them
+                          after the watch expired, e.g. to replace a local
+                          store of objects
+        :param request_args: query parameters, e.g. fieldSelector,
+                             resourceVersion (to start from),
+                             timeoutSeconds or allowWatchBookmarks
+        :return: iterator of tuples (change type, object)
+        """
         path = "watch/namespaces/%s/%s/" % (self.namespace, resource_type)
         if resource_name is not None:
             path += "%s/" % resource_name
-        url = self._build_url(path, _prepend_namespace=False, **request_args)
+        resource_version = request_args.pop('resourceVersion', None)
+        decoder = WatchEventDecoder(names=names)
+        seen = set()
+
+        failures = 0
+        while failures < WATCH_RETRY:
+            query = dict(request_args)
+            if resource_version is not None:
+                query['resourceVersion'] = resource_version
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    logger.debug("watch deadline reached")
+                    return
+                # let the server close the watch when the deadline is reached
+                timeout = int(math.ceil(remaining))
+                query['timeoutSeconds'] = min(timeout,
+                                              int(query.get('timeoutSeconds', timeout)))
+            url = self._build_url(path, _prepend_namespace=False, **query)
+
+            received = False
+            expired = False
+            try:
+                response = self._get(url, stream=True, long_lived=True,
+                                     headers={'Connection': 'close'},
+                                     operation='watch_resource')
+                check_response(response)
+                for line in response.iter_lines():
+                    if decoder.skip(line):
+                        received = True
+                        resource_version = decoder.skipped_resource_version or resource_version
+                        continue
+
+                    event = decoder.decode(line)
+                    if event is None:
+                        continue
+                    logger.debug("watch event: %s", event[0])
+
+                    changetype, obj = event
+                    if changetype == WATCH_ERROR and obj.get('code') == http_client.GONE:
+                        expired = True
+                        break
+
+                    received = True
+                    metadata = obj.get('metadata') or {}
+                    resource_version = metadata.get('resourceVersion', resource_version)
+                    if changetype != WATCH_BOOKMARK:
+                        track_watched(seen, changetype, obj)
+                        yield event
+            except OsbsException as ex:
+                status_code = getattr(ex, 'status_code', None)
+                if status_code == http_client.GONE:
+                    expired = True
+                elif not self._is_watch_retryable(ex) or failures + 1 >= WATCH_RETRY:
+                    raise
+                else:
+                    logger.warning("watch failed: %r", ex)
+
+            if expired:
+                logger.info("resourceVersion %s is too old, listing %s again",
+                            resource_version, resource_type)
+                objects, resource_version = self._list_for_watch(resource_type,
+                                                                 resource_name,
+                                                                 request_args,
+                                                                 names=names)
+                if on_relist is not None:
+                    on_relist(objects, resource_version)
+                else:
+                    for event in relist_events(objects, seen):
+                        yield event
+                failures = 0
+                continue
 
-        for retry in range(WATCH_RETRY):
-            response = self._get(url, stream=True, headers={'Connection': 'close'})
-            check_response(response)
-            encoding = None
-            for line in response.iter_lines():
-                logger.debug(line)
+            if received:
+                failures = 0
+                logger.debug("connection closed, resuming from resourceVersion %s",
+                             resource_version)
+                continue
 
-                if not encoding:
-                    encoding = guess_json_utf(line)
+            failures += 1
+            delay = self._watch_backoff(failures)
+            if deadline is not None:
+                delay = max(min(delay, deadline - time.time()), 0)
+            logger.debug("connection closed, reconnecting in %.1fs", delay)
+            time.sleep(delay)
 
-                try:
-                    j = json.loads(line.decode(encoding))
-                except ValueError:
-                    logger.error("Cannot decode watch event: %s", line)
-                    continue
+    @staticmethod
+    def _is_watch_retryable(exc):
+        if isinstance(exc, OsbsResponseException):
+            return exc.status_code >= 500
+        return isinstance(exc, OsbsNetworkException) or isinstance(exc.cause, ConnectionError)
 
-                if 'object' not in j:
-                    logger.error("Watch event has no 'object': %s", j)
-                    continue
+    @staticmethod
+    def _watch_backoff(failures):
+        """
+        :param failures: int, number of consecutive failed watch attempts
+        :return: float, seconds to wait before watching again (full jitter)
+        """
+        return random.uniform(0, min(WATCH_RETRY_SECS,
+                                     WATCH_BACKOFF_SECS * 2 ** (failures - 1)))
 
-                if 'type' not in j:
-                    logger.error("Watch event has no 'type': %s", j)
-                    continue
+    def _list_for_watch(self, resource_type, resource_name, request_args, names=None):
+        """
+        get current state of watched resource(s)
 
-                yield (j['type'].lower(), j['object'])
+        :param names: set of str, only return objects of these names,
+                      None returns all objects
+        :return: tuple (list of objects, resourceVersion to watch from)
+        """
+        selectors = dict((key, value) for key, value in request_args.items()
+                         if key in ('fieldSelector', 'labelSelector'))
+        if resource_name is not None:
+            url = self._build_url("%s/%s/" % (resource_type, resource_name))
+            response = self._get(url, operation='watch_resource')
+            if response.status_code == http_client.NOT_FOUND:
+                return [], None
+            check_response(response)
+            obj = response.json()
+            return [obj], graceful_chain_get(obj, 'metadata', 'resourceVersion')
 
-            logger.debug("connection closed, reconnecting in %ds", WATCH_RETRY_SECS)
-            time.sleep(WATCH_RETRY_SECS)
+        url = self._build_url("%s/" % resource_type, **selectors)
+        response = self._get(url, operation='watch_resource')
+        check_response(response)
+        list_json = response.json()
+        objects = list_json.get('items') or []
+        if names is not None:
+            objects = [obj for obj in objects
+                       if graceful_chain_get(obj, 'metadata', 'name') in names]
+        return objects, graceful_chain_get(list_json, 'metadata', 'resourceVersion')
 
     def wait(self, build_id, states):
         """
@@ -642,32 +1142,9 @@ class Openshift(object):
         :return:
         """
         logger.info("watching build '%s'", build_id)
-        for changetype, obj in self.watch_resource("builds", build_id):
-            try:
-                obj_name = obj["metadata"]["name"]
-            except KeyError:
-                logger.error("'object' doesn't have any name")
-                continue
-            try:
-                obj_status = obj["status"]["phase"]
-            except KeyError:
-                logger.error("'object' doesn't have any status")
-                continue
-            else:
-                obj_status_lower = obj_status.lower()
-            logger.info("object has changed: '%s', status: '%s', name: '%s'",
-                        changetype, obj_status, obj_name)
-            if obj_name == build_id:
-                logger.info("matching build found")
-                logger.debug("is %s in %s?", repr(obj_status_lower), states)
-                if obj_status_lower in states:
-                    logger.debug("Yes, build is in the state I'm waiting for.")
-                    return obj
-                else:
-                    logger.debug("No, build is not in the state I'm "
-                                 "waiting for.")
-            else:
-                logger.info("The build %r isn't me %r", obj_name, build_id)
+        for changetype, obj in self.watch_resource("builds", build_id, names={build_id}):
+            if self._is_build_in_states(build_id, states, changetype, obj):
+                return obj
 
         # I'm not sure how we can end up here since there are two possible scenarios:
         #   1. our object was found and we are returning in the loop
@@ -677,6 +1154,95 @@ class Openshift(object):
         raise OsbsWatchBuildNotFound("build '%s' was not found and response stream ended" %
                                      build_id)
 
+    def wait_for_builds(self, build_ids, states=None, timeout=None, callback=None):
+        """
+        wait for builds to reach one of given states
+
+        All builds are followed using a single watch on builds in the
+        namespace, so waiting for many builds needs only one connection.
+
+        :param build_ids: iterable of str, names of builds to wait for
+        :param states: list of str, lowercase build states to wait for,
+                       default is BUILD_FINISHED_STATES
+        :param timeout: float, seconds to wait for all the builds, None waits
+                        for as long as wait_for_build_to_finish would
+        :param callback: callable, called with build json for each build as
+                         it reaches one of the states
+        :return: iterator of build jsons in the order builds reached the states
+        """
+        if states is None:
+            states = BUILD_FINISHED_STATES
+        pending = set(build_ids)
+        deadline = None if timeout is None else time.time() + timeout
+        logger.info("watching builds %s", ', '.join(sorted(pending)))
+
+        for retry in range(WAIT_RETRY):
+            if not pending:
+                return
+
+            for changetype, obj in self.watch_resource("builds", deadline=deadline,
+                                                       names=pending):
+                name = (obj.get('metadata') or {}).get('name')
+                if name not in pending:
+                    continue
+
+                phase = ((obj.get('status') or {}).get('phase') or '').lower()
+                logger.debug("build %s has changed: '%s', status: '%s'", name, changetype, phase)
+                if phase in states:
+                    pending.discard(name)
+                    if callback is not None:
+                        callback(obj)
+                    yield obj
+                    if not pending:
+                        return
+                elif changetype == WATCH_DELETED:
+                    raise OsbsWatchBuildNotFound("build '%s' was deleted during wait" % name)
+
+            if deadline is not None and time.time() >= deadline:
+                raise OsbsWatchTimeout("Timed out waiting for builds: %s" %
+                                       ', '.join(sorted(pending)))
+            logger.warning("I'm going to wait again. Retry #%d.", retry)
+
+        raise OsbsException("Failed to wait for builds: %s" % ', '.join(sorted(pending)))
+
+    @staticmethod
+    def _is_build_in_states(build_id, states, changetype, obj):
+        """
+        check whether watch event reports given build in one of given states
+
+        :param build_id: str, name of the build being waited for
+        :param states: list of str, lowercase build states
+        :param changetype: str, type of watch event
+        :param obj: dict, object from watch event
+        :return: bool
+        """
+        try:
+            obj_name = obj["metadata"]["name"]
+        except KeyError:
+            logger.error("'object' doesn't have any name")
+            return False
+        try:
+            obj_status = obj["status"]["phase"]
+        except KeyError:
+            logger.error("'object' doesn't have any status")
+            return False
+        else:
+            obj_status_lower = obj_status.lower()
+        logger.info("object has changed: '%s', status: '%s', name: '%s'",
+                    changetype, obj_status, obj_name)
+        if obj_name == build_id:
+            logger.info("matching build found")
+            logger.debug("is %s in %s?", repr(obj_status_lower), states)
+            if obj_status_lower in states:
+                logger.debug("Yes, build is in the state I'm waiting for.")
+                return True
+            else:
+                logger.debug("No, build is not in the state I'm "
+                             "waiting for.")
+        else:
+            logger.info("The build %r isn't me %r", obj_name, build_id)
+        return False
+
     def wait_for_build_to_finish(self, build_id):
         for retry in range(WAIT_RETRY):
             try:
@@ -708,7 +1274,8 @@ class Openshift(object):
         metadata[things] = values
 
     @retry_on_conflict
-    def adjust_attributes_on_object(self, collection, name, things, values, how):
+    def adjust_attributes_on_object(self, collection, name, things, values, how,
+                                    operation='adjust_attributes_on_object'):
         """
         adjust labels or annotations on object
 
@@ -721,36 +1288,71 @@ class Openshift(object):
         :param values: dict, values to set
         :param how: callable, how to adjust the values e.g.
                     self._replace_metadata_things
+        :param operation: str, name of the operation the requests are made for
         :return:
         """
         url = self._build_url("%s/%s" % (collection, name))
-        response = self._get(url)
-        logger.debug("before modification: %s", response.content)
-        build_json = response.json()
+        response = self._get(url, operation=operation)
+        build_json = response.json(release=True)
+        logger.debug("%s before modification: %s", things, build_json['metadata'].get(things))
         how(build_json['metadata'], things, values)
-        response = self._put(url, data=json.dumps(build_json), use_json=True)
+        response = self._put(url, data=codec.dumpb(build_json), use_json=True,
+                             operation=operation)
         check_response(response)
         return response
 
+    def patch_attributes_on_object(self, collection, name, things, values, how,
+                                   operation='patch_attributes_on_object'):
+        """
+        adjust labels or annotations on object with a single request
+
+        Same as adjust_attributes_on_object(), which is used when the server
+        doesn't support PATCH or `how` isn't one of _update_metadata_things
+        and _replace_metadata_things.
+        """
+        if how is self._update_metadata_things:
+            patch = {'metadata': {things: values}}
+            content_type = MERGE_PATCH_CONTENT_TYPE
+        elif how is self._replace_metadata_things:
+            # merge patch can't drop keys it doesn't know about
+            patch = [{'op': 'add', 'path': '/metadata/%s' % things, 'value': values}]
+            content_type = JSON_PATCH_CONTENT_TYPE
+        else:
+            patch = None
+
+        if patch is not None:
+            url = self._build_url("%s/%s" % (collection, name))
+            response = self.patch_object(url, patch, content_type=content_type,
+                                         operation=operation)
+            if response is not None:
+                return response
+
+        return self.adjust_attributes_on_object(collection, name, things, values, how,
+                                                operation=operation)
+
     def update_labels_on_build(self, build_id, labels):
-        return self.adjust_attributes_on_object('builds', build_id,
-                                                'labels', labels,
-                                                self._update_metadata_things)
+        return self.patch_attributes_on_object('builds', build_id,
+                                               'labels', labels,
+                                               self._update_metadata_things,
+                                               operation='update_labels_on_build')
 
     def set_labels_on_build(self, build_id, labels):
-        return self.adjust_attributes_on_object('builds', build_id,
-                                                'labels', labels,
-                                                self._replace_metadata_things)
+        return self.patch_attributes_on_object('builds', build_id,
+                                               'labels', labels,
+                                               self._replace_metadata_things,
+                                               operation='set_labels_on_build')
 
     def update_labels_on_build_config(self, build_config_id, labels):
-        return self.adjust_attributes_on_object('buildconfigs', build_config_id,
-                                                'labels', labels,
-                                                self._update_metadata_things)
+        return self.patch_attributes_on_object('buildconfigs', build_config_id,
+                                               'labels', labels,
+                                               self._update_metadata_things,
+                                               operation='update_labels_on_build_config')
 
     def set_labels_on_build_config(self, build_config_id, labels):
-        return self.adjust_attributes_on_object('buildconfigs', build_config_id,
-                                                'labels', labels,
-                                                self._replace_metadata_things)
+        return self.patch_attributes_on_object('buildconfigs', build_config_id,
+                                               'labels', labels,
+                                               self._replace_metadata_things,
+                                               operation='set_labels_on_build_config')
 
     def update_annotations_on_build(self, build_id, annotations):
         """
@@ -760,25 +1362,28 @@ class Openshift(object):
         :param annotations: dict, annotations to set
         :return:
         """
-        return self.adjust_attributes_on_object('builds', build_id,
-                                                'annotations', annotations,
-                                                self._update_metadata_things)
+        return self.patch_attributes_on_object('builds', build_id,
+                                               'annotations', annotations,
+                                               self._update_metadata_things,
+                                               operation='update_annotations_on_build')
 
     def set_annotations_on_build(self, build_id, annotations):
-        return self.adjust_attributes_on_object('builds', build_id,
-                                                'annotations', annotations,
-                                                self._replace_metadata_things)
+        return self.patch_attributes_on_object('builds', build_id,
+                                               'annotations', annotations,
+                                               self._replace_metadata_things,
+                                               operation='set_annotations_on_build')
 
     def get_image_stream_tag(self, tag_id):
         url = self._build_url("imagestreamtags/%s" % tag_id)
-        response = self._get(url)
+        response = self._get(url, operation='get_image_stream_tag')
         check_response(response, log_level=logging.DEBUG)
         return response
 
     def put_image_stream_tag(self, tag_id, tag):
         url = self._build_url("imagestreamtags/%s" % tag_id)
         response = self._put(url, data=json.dumps(tag),
-                             headers={"Content-Type": "application/json"})
+                             headers={"Content-Type": "application/json"},
+                             operation='put_image_stream_tag')
         check_response(response)
         return response
 
@@ -831,21 +1436,22 @@ class Openshift(object):
 
     def get_image_stream(self, stream_id):
         url = self._build_url("imagestreams/%s" % stream_id)
-        response = self._get(url)
+        response = self._get(url, operation='get_image_stream')
         check_response(response, log_level=logging.DEBUG)
         return response
 
     def create_image_stream(self, stream_json):
         url = self._build_url("imagestreams/")
         response = self._post(url, data=stream_json,
-                              headers={"Content-Type": "application/json"})
+                              headers={"Content-Type": "application/json"},
+                              operation='create_image_stream')
         check_response(response)
         return response
 
     def update_image_stream(self, stream_id, stream_json):
         url = self._build_url("imagestreams/%s" % stream_id)
         response = self._put(url, data=json.dumps(stream_json),
-                             use_json=True)
+                             use_json=True, operation='update_image_stream')
         check_response(response)
         return response
 
@@ -893,7 +1499,7 @@ class Openshift(object):
 
         import_url = self._build_url("imagestreamimports/")
         import_response = self._post(import_url, data=json.dumps(stream_import),
-                                     use_json=True)
+                                     use_json=True, operation='import_image')
         self._check_import_image_response(import_response)
 
         new_tags = [
@@ -927,32 +1533,89 @@ class Openshift(object):
 
     def dump_resource(self, resource_type):
         url = self._build_url("%s" % resource_type)
-        response = self._get(url)
+        response = self._get(url, operation='dump_resource')
         check_response(response)
         return response
 
+    def iter_resource_pages(self, resource_type, page_size=DEFAULT_PAGE_SIZE, **query):
+        """
+        list resources in pages using limit and continue tokens
+
+        Servers which don't support pagination return everything in
+        the first page.
+
+        :param resource_type: str, e.g. 'builds'
+        :param page_size: int, maximum number of objects in one page
+        :param query: additional query parameters, e.g. labelSelector
+        :return: iterator of dicts, each a List object with some of the items
+        """
+        query['limit'] = page_size
+        while True:
+            url = self._build_url("%s/" % resource_type, **query)
+            response = self._get(url, operation='iter_resource_pages')
+            check_response(response)
+            page = response.json()
+            yield page
+
+            token = (page.get('metadata') or {}).get('continue')
+            if not token:
+                break
+            query['continue'] = token
+
+    def iter_resource(self, resource_type, page_size=DEFAULT_PAGE_SIZE, **query):
+        """
+        iterate over resources, fetching them in pages
+
+        Pages are parsed as they are received and objects are yielded one by
+        one, so only one of them is held in memory at a time, even when the
+        server doesn't support pagination and returns everything at once.
+
+        :param resource_type: str, e.g. 'builds'
+        :param page_size: int, maximum number of objects in one page
+        :param query: additional query parameters, e.g. labelSelector
+        :return: iterator of dicts
+        """
+        return self._iter_list(self._build_url, "%s/" % resource_type, page_size, query,
+                               operation="iter_%s" % resource_type)
+
+    def _iter_list(self, build_url, path, page_size, query, operation):
+        query['limit'] = page_size
+        while True:
+            url = build_url(path, **query)
+            envelope = {}
+            with self._get(url, stream=True, operation=operation) as response:
+                check_response(response)
+                for item in response.iter_items(envelope=envelope):
+                    yield item
+
+            token = graceful_chain_get(envelope, 'metadata', 'continue')
+            if not token:
+                break
+            query['continue'] = token
+
     def restore_resource(self, resource_type, resource):
         url = self._build_url("%s" % resource_type)
         response = self._post(url, data=json.dumps(resource),
-                              headers={"Content-Type": "application/json"})
+                              headers={"Content-Type": "application/json"},
+                              operation='restore_resource')
         check_response(response)
         return response
 
     def create_config_map(self, config_data):
         url = self._build_k8s_url("configmaps/")
-        response = self._post(url, data=json.dumps(config_data))
+        response = self._post(url, data=json.dumps(config_data), operation='create_config_map')
         check_response(response)
         return response
 
     def get_config_map(self, config_name):
         url = self._build_k8s_url("configmaps/%s" % config_name)
-        response = self._get(url)
+        response = self._get(url, operation='get_config_map')
         check_response(response)
         return response
 
     def delete_config_map(self, config_name):
         url = self._build_k8s_url("configmaps/%s" % config_name)
-        response = self._delete(url, data='{}')
+        response = self._delete(url, data='{}', operation='delete_config_map')
         check_response(response)
 
 
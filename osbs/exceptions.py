@@ -89,6 +89,10 @@ class OsbsWatchBuildNotFound(OsbsException):
     """ watch stream ended and build was not found """
 
 
+class OsbsWatchTimeout(OsbsException):
+    """ builds didn't reach expected state before deadline """
+
+
 class ImportImageFailed(OsbsException):
     """Import image via ImageStream failed"""
 
@@ -13,19 +13,26 @@ from __future__ import print_function, absolute_import, unicode_literals
 
 import sys
 import logging
-import json
+import math
+import threading
+import time
+from collections import deque
+
+import six
 from six.moves import http_client
+from six.moves.http_cookiejar import DefaultCookiePolicy
+from six.moves.urllib.parse import urlparse
 
 
 from osbs.exceptions import OsbsException, OsbsNetworkException, OsbsResponseException
 from osbs.constants import (
-    HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR, HTTP_RETRIES_STATUS_FORCELIST,
-    HTTP_RETRIES_METHODS_WHITELIST, HTTP_REQUEST_TIMEOUT)
+    HTTP_RETRIES_STATUS_FORCELIST, HTTP_RETRIES_METHODS_WHITELIST, HTTP_REQUEST_TIMEOUT,
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, JSON_STREAM_CHUNK_SIZE)
+from osbs import codec, utils
 
 import requests
 from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util import Retry
-from requests.exceptions import HTTPError, RetryError, Timeout
+from requests.exceptions import ConnectionError, HTTPError, RetryError, Timeout
 from requests.utils import guess_json_utf
 try:
     from requests_kerberos import HTTPKerberosAuth
@@ -39,8 +46,70 @@ logger = logging.getLogger(__name__)
 
 
 class HttpSession(object):
-    def __init__(self, verbose=False):
+    """
+    Entry point for all HTTP calls made by osbs-client
+
+    Connections are kept alive and reused: requests.Session objects (and their
+    urllib3 connection pools) are shared process-wide between all HttpSession
+    instances. A pooled session is only ever used for one combination of
+    scheme, host, TLS settings and pool size, so requests with different TLS
+    settings never end up on the same connection.
+
+    Requests which fail to connect or get one of HTTP_RETRIES_STATUS_FORCELIST
+    statuses are retried according to the retry policy.
+
+    Request hooks are called with a RequestRecord once each request is done:
+    when its body has been read, when a stream is closed, or when it failed.
+
+    When throttle is set, it is called before every retry, so that retries
+    are rate limited the same way as the requests which failed.
+    """
+
+    # (scheme, netloc, verify, cert, pool sizes) -> requests.Session
+    _sessions = {}
+    _sessions_lock = threading.Lock()
+
+    def __init__(self, verbose=False, pool_connections=HTTP_POOL_CONNECTIONS,
+                 pool_maxsize=HTTP_POOL_MAXSIZE, keepalive=True, retry_policy=None,
+                 request_hooks=None, throttle=None):
+        """
+        :param verbose: bool, enable verbose output
+        :param pool_connections: int, number of per-host pools to keep
+        :param pool_maxsize: int, max number of connections kept in one pool
+        :param keepalive: bool, keep connections open between requests
+        :param retry_policy: RetryPolicy, defaults to utils.HTTP_RETRY_POLICY
+        :param request_hooks: list of callables, see add_request_hook
+        :param throttle: callable taking URL and long-lived flag, blocks until
+                         the request may be sent again
+        """
         self.verbose = verbose
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keepalive = keepalive
+        self.retry_policy = retry_policy or utils.HTTP_RETRY_POLICY
+        self.request_hooks = list(request_hooks or [])
+        self.throttle = throttle
+
+    def add_request_hook(self, hook):
+        """
+        call hook with RequestRecord of each request once it is done
+
+        Hooks are called in the thread which made the request; exceptions
+        raised by them are logged and ignored.
+
+        :param hook: callable taking RequestRecord, e.g. RequestStats
+        """
+        self.request_hooks.append(hook)
+
+    def remove_request_hook(self, hook):
+        self.request_hooks.remove(hook)
+
+    def _call_request_hooks(self, record):
+        for hook in list(self.request_hooks):
+            try:
+                hook(record)
+            except Exception:
+                logger.exception("request hook %r failed", hook)
 
     def get(self, url, **kwargs):
         return self.request(url, "get", **kwargs)
@@ -54,15 +123,82 @@ class HttpSession(object):
     def delete(self, url, **kwargs):
         return self.request(url, "delete", **kwargs)
 
+    def patch(self, url, **kwargs):
+        return self.request(url, "patch", **kwargs)
+
+    def _get_session(self, url, verify_ssl=True, ca=None, client_cert=None, client_key=None,
+                     **kwargs):
+        """
+        return pooled requests.Session suitable for given request
+
+        :param url: str, URL of request
+        :return: requests.Session
+        """
+        parsed = urlparse(url)
+        verify = (ca or True) if verify_ssl else False
+        key = (parsed.scheme, parsed.netloc, verify, client_cert, client_key,
+               self.pool_connections, self.pool_maxsize)
+
+        with self._sessions_lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = make_session(pool_connections=self.pool_connections,
+                                       pool_maxsize=self.pool_maxsize)
+                self._sessions[key] = session
+        return session
+
     def request(self, url, *args, **kwargs):
+        """
+        :param url: str
+        :param operation: str, name of the logical operation, e.g. 'get_build',
+                          passed on to request hooks
+        :param long_lived: bool, the request is a watch or a followed log,
+                           passed on to throttle
+        :return: HttpResponse, or HttpStream when stream is set
+        """
+        operation = kwargs.pop('operation', None)
+        if not self.request_hooks:
+            return self._request(url, None, *args, **kwargs)
+
+        method = args[0] if args else kwargs['method']
+        record = RequestRecord(operation, method, url, stream=kwargs.get('stream', False),
+                               bytes_sent=_body_size(kwargs.get('data')))
+        try:
+            response = self._request(url, record, *args, **kwargs)
+        except Exception as ex:
+            record.finish(error=ex)
+            self._call_request_hooks(record)
+            raise
+
+        if isinstance(response, HttpStream):
+            def on_close(bytes_received):
+                record.bytes_received = bytes_received
+                self._call_request_hooks(record.finish())
+
+            response.on_close = on_close
+        else:
+            self._call_request_hooks(record.finish())
+        return response
+
+    def _request(self, url, record, *args, **kwargs):
         try:
-            stream = HttpStream(url, *args, verbose=self.verbose, **kwargs)
+            if not self.keepalive:
+                headers = dict(kwargs.get('headers') or {})
+                headers.setdefault('Connection', 'close')
+                kwargs['headers'] = headers
+
+            session = self._get_session(url, **kwargs)
+            stream = self._open(url, session, record, *args, **kwargs)
             if kwargs.get('stream', False):
                 return stream
 
             with stream as s:
                 content = s.req.content
+                if record is not None:
+                    record.bytes_received = s.bytes_received() or len(content or b'')
                 return HttpResponse(s.status_code, s.headers, content)
+        except OsbsException:
+            raise
         # Timeout will catch both ConnectTimout and ReadTimeout
         except (RetryError, Timeout) as ex:
             raise OsbsNetworkException(url, str(ex), '',
@@ -73,6 +209,279 @@ class HttpSession(object):
         except Exception as ex:
             raise OsbsException(cause=ex, traceback=sys.exc_info()[2])
 
+    def _open(self, url, session, record, *args, **kwargs):
+        """
+        open HttpStream, retrying failed attempts
+
+        :param record: RequestRecord to update, or None
+        :return: HttpStream
+        """
+        long_lived = kwargs.pop('long_lived', False)
+        method = args[0] if args else kwargs['method']
+        policy = None
+        if kwargs.get('retries_enabled', True) and \
+                method.upper() in HTTP_RETRIES_METHODS_WHITELIST:
+            policy = self.retry_policy
+
+        started = time.time()
+        attempt = 0
+        while True:
+            if record is not None:
+                record.retries = attempt
+            try:
+                stream = HttpStream(url, *args, verbose=self.verbose, session=session, **kwargs)
+                if record is not None:
+                    record.response_received(stream.status_code)
+            except (ConnectionError, Timeout) as ex:
+                if policy is None:
+                    raise
+                delay = policy.next_delay(attempt, started)
+                if delay is None:
+                    raise
+                logger.debug("%s %s failed: %r", method.upper(), url, ex)
+            else:
+                if policy is None:
+                    return stream
+                if stream.status_code not in HTTP_RETRIES_STATUS_FORCELIST:
+                    policy.succeeded()
+                    return stream
+
+                stream.close()
+                delay = policy.next_delay(attempt, started)
+                if delay is None:
+                    raise OsbsNetworkException(url, "giving up after %d retries" % attempt,
+                                               stream.status_code)
+                logger.debug("%s %s returned %d", method.upper(), url, stream.status_code)
+
+            logger.info("retrying %s %s in %.1fs", method.upper(), url, delay)
+            time.sleep(delay)
+            attempt += 1
+            if self.throttle is not None:
+                self.throttle(url, long_lived)
+
+    @classmethod
+    def get_connection_stats(cls):
+        """
+        return counters of connections opened and requests sent over pooled sessions
+
+        :return: dict, with keys 'connections' (new connections opened),
+                 'requests' (requests sent) and 'reused' (requests sent
+                 over an already open connection)
+        """
+        connections = requests_sent = 0
+        with cls._sessions_lock:
+            sessions = list(cls._sessions.values())
+        for session in sessions:
+            for adapter in set(session.adapters.values()):
+                poolmanager = getattr(adapter, 'poolmanager', None)
+                if poolmanager is None:
+                    continue
+                for pool_key in poolmanager.pools.keys():
+                    pool = poolmanager.pools.get(pool_key)
+                    if pool is None:
+                        continue
+                    connections += pool.num_connections
+                    requests_sent += pool.num_requests
+
+        return {
+            'connections': connections,
+            'requests': requests_sent,
+            'reused': max(requests_sent - connections, 0),
+        }
+
+    @classmethod
+    def close_all(cls):
+        """
+        close all pooled sessions and their connections
+        """
+        with cls._sessions_lock:
+            sessions = list(cls._sessions.values())
+            cls._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+def make_session(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE):
+    """
+    create requests.Session with HTTP adapters mounted
+
+    Cookies are never stored in the session, as the same session may be used
+    by clients with different credentials. Requests are not retried by the
+    adapters, HttpSession retries them.
+
+    :param pool_connections: int, number of per-host pools to keep
+    :param pool_maxsize: int, max number of connections kept in one pool
+    :return: requests.Session
+    """
+    adapter_kwargs = {
+        'pool_connections': pool_connections,
+        'pool_maxsize': pool_maxsize,
+    }
+
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    session.mount('http://', HTTPAdapter(**adapter_kwargs))
+    session.mount('https://', HTTPAdapter(**adapter_kwargs))
+    return session
+
+
+def _body_size(data):
+    if isinstance(data, six.binary_type):
+        return len(data)
+    if isinstance(data, six.text_type):
+        return len(data.encode('utf-8'))
+    return 0
+
+
+class RequestRecord(object):
+    """
+    measurements of one request made by HttpSession, passed to request hooks
+
+    All times are in seconds. `ttfb` runs until headers of the response were
+    received, including failed attempts and delays between them when the
+    request was retried; `transfer` is the time spent reading the body after
+    that, for streams until they were closed. Time to resolve the host name,
+    connect and complete TLS handshake is not exposed by requests, it is part
+    of `ttfb` of requests which opened a new connection.
+
+    `bytes_sent` and `bytes_received` count bodies only, as sent and received
+    over the wire (before decompression).
+    """
+
+    def __init__(self, operation, method, url, stream=False, bytes_sent=0):
+        self.operation = operation
+        self.method = method.upper()
+        self.url = url
+        self.stream = stream
+        self.status_code = None  # of last attempt, None when it failed to connect
+        self.retries = 0
+        self.bytes_sent = bytes_sent
+        self.bytes_received = 0
+        self.started = time.time()
+        self.ttfb = None
+        self.transfer = None
+        self.duration = None
+        self.error = None  # exception which failed the request
+
+    def response_received(self, status_code):
+        self.status_code = status_code
+        self.ttfb = time.time() - self.started
+
+    def finish(self, error=None):
+        """
+        :param error: exception which failed the request
+        :return: self
+        """
+        self.duration = time.time() - self.started
+        if self.ttfb is not None:
+            self.transfer = self.duration - self.ttfb
+        self.error = error
+        return self
+
+    def as_dict(self):
+        return dict(self.__dict__, error=repr(self.error) if self.error else None)
+
+    def __repr__(self):
+        return "RequestRecord(%s %s %s -> %s, %.3fs)" % (self.operation, self.method, self.url,
+                                                         self.status_code, self.duration or 0)
+
+
+class RequestStats(object):
+    """
+    request hook which aggregates RequestRecords per operation in memory
+
+        stats = RequestStats()
+        osbs.os.add_request_hook(stats)
+        ...
+        print(stats.report())
+
+    Durations of the last `max_samples` requests of each operation are kept
+    to compute percentiles; counters cover all requests.
+    """
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, max_samples=10000):
+        """
+        :param max_samples: int, durations kept per operation
+        """
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._operations = {}
+
+    def __call__(self, record):
+        operation = record.operation or record.method
+        with self._lock:
+            stats = self._operations.get(operation)
+            if stats is None:
+                stats = self._operations[operation] = {
+                    'count': 0, 'errors': 0, 'retries': 0,
+                    'bytes_sent': 0, 'bytes_received': 0,
+                    'durations': deque(maxlen=self.max_samples),
+                    'ttfbs': deque(maxlen=self.max_samples),
+                }
+            stats['count'] += 1
+            if record.error is not None or not record.status_code or record.status_code >= 400:
+                stats['errors'] += 1
+            stats['retries'] += record.retries
+            stats['bytes_sent'] += record.bytes_sent
+            stats['bytes_received'] += record.bytes_received
+            stats['durations'].append(record.duration)
+            if record.ttfb is not None:
+                stats['ttfbs'].append(record.ttfb)
+
+    @staticmethod
+    def percentile(values, percent):
+        """
+        nearest-rank percentile
+
+        :param values: sorted list of numbers
+        :param percent: number, 0 to 100
+        :return: number, None for no values
+        """
+        if not values:
+            return None
+        rank = int(math.ceil(percent / 100.0 * len(values)))
+        return values[max(rank, 1) - 1]
+
+    def summary(self):
+        """
+        :return: dict, operation -> dict with 'count', 'errors' (failed
+                 requests and responses with status >= 400), 'retries',
+                 'bytes_sent', 'bytes_received', and 'p50', 'p95', 'p99' of
+                 duration and 'ttfb_p50', ... of ttfb, in seconds
+        """
+        with self._lock:
+            operations = dict((operation, dict(stats, durations=sorted(stats['durations']),
+                                               ttfbs=sorted(stats['ttfbs'])))
+                              for operation, stats in self._operations.items())
+
+        summary = {}
+        for operation, stats in operations.items():
+            durations = stats.pop('durations')
+            ttfbs = stats.pop('ttfbs')
+            for percent in self.PERCENTILES:
+                stats['p%d' % percent] = self.percentile(durations, percent)
+                stats['ttfb_p%d' % percent] = self.percentile(ttfbs, percent)
+            summary[operation] = stats
+        return summary
+
+    def report(self):
+        """
+        :return: str, table of operations with their counters and percentiles
+        """
+        lines = ["%-32s %6s %6s %7s %8s %8s %8s %10s" %
+                 ('operation', 'count', 'errors', 'retries', 'p50', 'p95', 'p99', 'received')]
+        for operation, stats in sorted(self.summary().items()):
+            lines.append("%-32s %6d %6d %7d %7.3fs %7.3fs %7.3fs %10d" %
+                         (operation, stats['count'], stats['errors'], stats['retries'],
+                          stats['p50'], stats['p95'], stats['p99'], stats['bytes_received']))
+        return '\n'.join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+
 
 class HttpStream(object):
     """
@@ -89,35 +498,29 @@ class HttpStream(object):
     def __init__(self, url, method, data=None, kerberos_auth=False,
                  allow_redirects=True, verify_ssl=True, ca=None, use_json=False,
                  headers=None, stream=False, username=None, password=None,
-                 client_cert=None, client_key=None, verbose=False, retries_enabled=True):
+                 client_cert=None, client_key=None, verbose=False, retries_enabled=True,
+                 session=None):
         self.finished = False  # have we read all data?
         self.closed = False    # have we destroyed curl resources?
+        self.on_close = None   # called with number of bytes received when closed
 
         self.status_code = 0
         self.headers = None
 
-        retry = Retry(
-            total=HTTP_MAX_RETRIES,
-            connect=HTTP_MAX_RETRIES,
-            backoff_factor=HTTP_BACKOFF_FACTOR,
-            status_forcelist=HTTP_RETRIES_STATUS_FORCELIST,
-            method_whitelist=HTTP_RETRIES_METHODS_WHITELIST
-        )
-        self.session = requests.Session()
-        if retries_enabled:
-            self.session.mount('http://', HTTPAdapter(max_retries=retry))
-            self.session.mount('https://', HTTPAdapter(max_retries=retry))
+        if session is None:
+            session = make_session()
+        self.session = session
 
         self.url = url
         headers = headers or {}
         method = method.lower()
 
-        if method not in ['post', 'get', 'put', 'delete']:
+        if method not in ['post', 'get', 'put', 'delete', 'patch']:
             raise RuntimeError("Unsupported method '%s' for curl call!" % method)
 
         args = {}
 
-        if method in ['post', 'put']:
+        if method in ['post', 'put', 'patch']:
             headers['Expect'] = ''
 
         if not verify_ssl:
@@ -161,8 +564,28 @@ class HttpStream(object):
     def _get_received_data(self):
         return self.req.text
 
-    def iter_chunks(self):
-        return self.req.iter_content(None)
+    def iter_chunks(self, chunk_size=None):
+        """
+        iterate over response body as it comes, without decoding it
+
+        :param chunk_size: int, largest piece to read at once, None to yield
+                           chunks as received; when the response is not
+                           chunked, None reads the whole body at once
+        """
+        return self.req.iter_content(chunk_size)
+
+    def iter_items(self, key='items', envelope=None):
+        """
+        parse JSON object from response as it comes, yielding elements of its
+        array member one by one, see osbs.codec.JsonItemsParser
+
+        :param key: str, name of the array member, e.g. 'items' of List objects
+        :param envelope: dict, updated with the rest of the object once it is
+                         read, e.g. to get metadata.continue
+        :return: iterator of parsed elements
+        """
+        return codec.iter_json_items(self.iter_chunks(JSON_STREAM_CHUNK_SIZE), key=key,
+                                     envelope=envelope)
 
     def iter_lines(self):
         kwargs = {
@@ -189,10 +612,27 @@ class HttpStream(object):
     def close(self):
         if not self.closed:
             logger.debug("cleaning up")
+            if self.on_close is not None:
+                on_close, self.on_close = self.on_close, None
+                on_close(self.bytes_received())
             if hasattr(self, 'req'):
+                # return the connection to the pool (or drop it when not fully read)
+                close = getattr(self.req, 'close', None)
+                if close is not None:
+                    close()
                 del self.req
         self.closed = True
 
+    def bytes_received(self):
+        """
+        :return: int, bytes of body read from the connection so far
+        """
+        try:
+            return self.req.raw.tell()
+        except Exception:
+            # connection failed or not urllib3 response
+            return 0
+
     def __del__(self):
         self.close()
 
@@ -204,21 +644,57 @@ class HttpStream(object):
 
 
 class HttpResponse(object):
+    """
+    response read whole
+
+    The body is parsed as JSON on the first call of json() and the result is
+    kept, so repeated calls return the same object. release() drops the raw
+    body, to keep only the parsed object in memory.
+    """
+
     def __init__(self, status_code, headers, content):
         self.status_code = status_code
         self.headers = headers
         self.content = content
-
-    def json(self, check=True):
-        encoding = guess_json_utf(self.content)
-        text = self.content.decode(encoding)
+        self.content_length = len(content) if content is not None else 0
+        self.decode_time = None  # seconds taken to parse body, once parsed
+        self._json = None
+        self._parsed = False
+
+    def json(self, check=True, release=False):
+        """
+        :param check: bool, raise OsbsResponseException for unsuccessful
+                      responses
+        :param release: bool, call release() once parsed
+        :return: parsed body
+        """
         if check and self.status_code not in (0, requests.codes.OK, requests.codes.CREATED):
+            text = self.content.decode(guess_json_utf(self.content))
             raise OsbsResponseException(text, self.status_code)
 
-        try:
-            return json.loads(text)
-        except ValueError:
-            msg = '{0}Headers {1}\nContent {2}'.format('HtttpResponse has corrupt json:\n',
-                                                       self.headers, self.content)
-            logger.exception(msg)
-            raise OsbsResponseException(msg, self.status_code)
+        if not self._parsed:
+            if self.content is None:
+                raise OsbsException("body of response was released before being parsed")
+            start = time.time()
+            try:
+                self._json = codec.loads(self.content)
+            except ValueError:
+                msg = '{0}Headers {1}\nContent {2}'.format('HtttpResponse has corrupt json:\n',
+                                                           self.headers, self.content)
+                logger.exception(msg)
+                raise OsbsResponseException(msg, self.status_code)
+            self.decode_time = time.time() - start
+            self._parsed = True
+            logger.debug("parsed %d bytes of JSON in %.3fs", self.content_length,
+                         self.decode_time)
+
+        if release:
+            self.release()
+        return self._json
+
+    def release(self):
+        """
+        drop raw body; json() keeps returning the parsed body if it was
+        called before
+        """
+        self.content = None
@@ -0,0 +1,225 @@
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+
+
+routing of orchestrator build log lines to per-platform sinks, and writing
+of build logs to files
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import bz2
+import logging
+import os
+import re
+import zlib
+
+import six
+
+from osbs.constants import LOG_COMPRESSIONS
+from osbs.exceptions import OsbsValidationException
+
+
+logger = logging.getLogger(__name__)
+
+
+# Lines are logged by atomic-reactor as
+#   <date> <time> platform:<platform> - <name> - <level> - <message>
+# where the message of a worker build line is the line logged by the worker,
+# in the same format, with platform "-".
+ORCHESTRATOR_LINE_RE = re.compile(br'\S+ \S+ platform:(\S+) (?:\S+ ){5}')
+WORKER_PLATFORM_RE = re.compile(br'(\S+ \S+ )platform:- ')
+ORCHESTRATOR_PLATFORM = b'-'
+
+
+def make_sink(sink):
+    """
+    return callable taking one line of bytes from sink
+
+    :param sink: file-like object opened for writing bytes (lines are
+                 written with newline), object with put() method such as
+                 queue.Queue, or callable
+    :return: callable
+    """
+    if hasattr(sink, 'write'):
+        write = sink.write
+        return lambda line: write(line + b'\n')
+    if hasattr(sink, 'put'):
+        return sink.put
+    if callable(sink):
+        return sink
+    raise OsbsValidationException("unsupported log sink: %r" % (sink,))
+
+
+class OrchestratorLogDemultiplexer(object):
+    """
+    split orchestrator build log by platform, working on bytes
+
+    Lines from the orchestrator itself go to the sink for platform None,
+    lines from worker builds to the sink for their platform, with the
+    orchestrator fields stripped as in OSBS.get_orchestrator_build_logs.
+    Lines for a platform without a sink go to the default sink, or are
+    dropped when there is none.
+    """
+
+    def __init__(self, sinks, default=None):
+        """
+        :param sinks: dict, platform name (str, or None for orchestrator
+                      lines) -> sink, see make_sink
+        :param default: sink for lines of other platforms
+        """
+        self._sinks = {}
+        for platform, sink in sinks.items():
+            if platform is not None:
+                platform = platform.encode('utf-8')
+            self._sinks[platform] = make_sink(sink)
+        self._default = make_sink(default) if default is not None else None
+        self._pending = b''
+        self.lines = 0
+        self.bytes = 0
+
+    def _sink_for(self, platform):
+        try:
+            return self._sinks[platform]
+        except KeyError:
+            # remember, to look up unknown platforms only once
+            self._sinks[platform] = self._default
+            return self._default
+
+    def feed_line(self, line):
+        """
+        route one line, without line separator
+
+        :param line: bytes
+        """
+        self.lines += 1
+        self.bytes += len(line)
+
+        match = ORCHESTRATOR_LINE_RE.match(line)
+        if match is None:
+            platform = None
+        else:
+            platform = match.group(1)
+            if platform == ORCHESTRATOR_PLATFORM:
+                platform = None
+            else:
+                line = line[match.end():]
+                worker = WORKER_PLATFORM_RE.match(line)
+                if worker is not None:
+                    line = worker.group(1) + line[worker.end():]
+
+        sink = self._sink_for(platform)
+        if sink is not None:
+            sink(line)
+
+    def feed(self, data):
+        """
+        route lines from a chunk of log, keeping an incomplete last line
+        until more data comes or close() is called
+
+        :param data: bytes
+        """
+        lines = (self._pending + data).split(b'\n')
+        self._pending = lines.pop()
+        feed_line = self.feed_line
+        for line in lines:
+            feed_line(line.rstrip(b'\r'))
+
+    def close(self):
+        """
+        route incomplete last line, if any
+        """
+        if self._pending:
+            self.feed_line(self._pending.rstrip(b'\r'))
+            self._pending = b''
+
+    def run(self, logs):
+        """
+        route whole log
+
+        :param logs: bytes, or iterable of chunks (bytes) of whole lines as
+                     returned by OSBS.get_build_logs(follow=True)
+        :return: int, number of lines routed
+        """
+        if isinstance(logs, six.binary_type):
+            self.feed(logs)
+        else:
+            feed_line = self.feed_line
+            for chunk in logs:
+                # a chunk may hold several lines
+                for line in chunk.splitlines():
+                    feed_line(line)
+        self.close()
+        logger.debug("demultiplexed %d lines, %d bytes", self.lines, self.bytes)
+        return self.lines
+
+
+def _write_to_fd(fd, data):
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+class LogFileWriter(object):
+    """
+    write raw build log to a file or file descriptor as it comes, optionally
+    compressing it on the fly, so memory use does not grow with log size
+
+    The file is not closed by close(), only the compressed stream is
+    finished.
+    """
+
+    def __init__(self, fileobj, compression=None):
+        """
+        :param fileobj: file-like object opened for writing bytes, or int,
+                        file descriptor
+        :param compression: str, one of LOG_COMPRESSIONS, or None
+        """
+        if isinstance(fileobj, six.integer_types):
+            self._write = lambda data: _write_to_fd(fileobj, data)
+        elif hasattr(fileobj, 'write'):
+            self._write = fileobj.write
+        else:
+            raise OsbsValidationException("unsupported log file: %r" % (fileobj,))
+
+        if compression is None:
+            self._compressor = None
+        elif compression == 'gzip':
+            self._compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED,
+                                                16 + zlib.MAX_WBITS)
+        elif compression == 'bz2':
+            self._compressor = bz2.BZ2Compressor()
+        else:
+            raise OsbsValidationException("unsupported log compression %r, use one of: %s" %
+                                          (compression, ", ".join(LOG_COMPRESSIONS)))
+        self.bytes = 0  # before compression
+
+    def write(self, data):
+        """
+        :param data: bytes
+        """
+        if not data:
+            return
+        self.bytes += len(data)
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+            if not data:
+                return
+        self._write(data)
+
+    def close(self):
+        if self._compressor is not None:
+            data = self._compressor.flush()
+            self._compressor = None
+            if data:
+                self._write(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
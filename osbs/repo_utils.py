@@ -7,14 +7,19 @@ of the BSD license. See the LICENSE file for details.
 """
 
 
-from osbs.constants import REPO_CONFIG_FILE, ADDITIONAL_TAGS_FILE, REPO_CONTAINER_CONFIG
+from osbs.constants import (REPO_CONFIG_FILE, ADDITIONAL_TAGS_FILE, REPO_CONTAINER_CONFIG,
+                            REPO_INFO_CACHE_SIZE)
+from hashlib import sha256
 from six import StringIO
 from six.moves.configparser import ConfigParser
 from textwrap import dedent
 
+import errno
 import logging
 import os
 import re
+import shutil
+import tempfile
 import yaml
 
 
@@ -113,3 +118,95 @@ class AdditionalTagsConfig(object):
     @property
     def from_container_yaml(self):
         return self._from_container_yaml
+
+
+class RepoInfoCache(object):
+    """
+    On-disk cache of repository files needed for RepoInfo
+
+    Files are stored per git URI and commit, which never change content.
+    When the total size of cached files exceeds max_size, the least
+    recently used entries are removed. The cache directory can be shared
+    by several processes.
+    """
+
+    def __init__(self, cache_dir, max_size=REPO_INFO_CACHE_SIZE):
+        """
+        :param cache_dir: str, directory to store files in
+        :param max_size: int, maximum total size of cached files in bytes
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def _entry_path(self, git_uri, commit):
+        key = sha256(('%s\n%s' % (git_uri, commit)).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, git_uri, commit):
+        """
+        :param git_uri: str, URI of git repository
+        :param commit: str, full commit hash
+        :return: dict, file name to bytes content, or None when not cached
+        """
+        path = self._entry_path(git_uri, commit)
+        try:
+            # mark as recently used
+            os.utime(path, None)
+            files = {}
+            for name in os.listdir(path):
+                with open(os.path.join(path, name), 'rb') as f:
+                    files[name] = f.read()
+        except (IOError, OSError) as ex:
+            if ex.errno != errno.ENOENT:
+                logger.warning("failed to read repo info cache %s: %r", path, ex)
+            return None
+
+        logger.debug("repo info for %s at %s found in cache", git_uri, commit)
+        return files
+
+    def put(self, git_uri, commit, files):
+        """
+        :param git_uri: str, URI of git repository
+        :param commit: str, full commit hash
+        :param files: dict, file name to bytes content
+        """
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            # write files aside and move them in place at once, so readers
+            # never see an incomplete entry
+            tmpdir = tempfile.mkdtemp(prefix='.tmp-', dir=self.cache_dir)
+            for name, content in files.items():
+                with open(os.path.join(tmpdir, name), 'wb') as f:
+                    f.write(content)
+            try:
+                os.rename(tmpdir, self._entry_path(git_uri, commit))
+            except OSError:
+                # already stored by someone else
+                shutil.rmtree(tmpdir, ignore_errors=True)
+            self.evict()
+        except (IOError, OSError) as ex:
+            logger.warning("failed to store repo info in cache %s: %r", self.cache_dir, ex)
+
+    def evict(self):
+        """
+        remove least recently used entries until the cache fits max_size
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith('.'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                entries.append((os.path.getmtime(path), size, path))
+            except OSError:
+                # removed meanwhile
+                continue
+
+        total = 0
+        for _, size, path in sorted(entries, reverse=True):
+            total += size
+            if total > self.max_size:
+                logger.debug("removing %s from repo info cache", path)
+                shutil.rmtree(path, ignore_errors=True)
@@ -9,9 +9,12 @@ from __future__ import print_function, absolute_import, unicode_literals
 from functools import wraps
 import contextlib
 import copy
+import itertools
 import logging
+import math
 import os
 import os.path
+import random
 import re
 import shutil
 import string
@@ -19,6 +22,7 @@ import subprocess
 import sys
 import tempfile
 import tarfile
+import threading
 import time
 import requests
 from collections import namedtuple
@@ -26,7 +30,10 @@ from datetime import datetime
 from io import BytesIO
 from hashlib import sha256
 from osbs.repo_utils import RepoConfiguration, RepoInfo, AdditionalTagsConfig
-from osbs.constants import OS_CONFLICT_MAX_RETRIES, OS_CONFLICT_WAIT
+from osbs.constants import (OS_CONFLICT_MAX_RETRIES, OS_CONFLICT_WAIT, REPO_INFO_FILES,
+                            HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR, RETRY_MAX_DELAY,
+                            RETRY_DEADLINE, RETRY_BUDGET_TOKENS, RETRY_BUDGET_RATIO)
+import six
 from six.moves import http_client
 from six.moves.urllib.parse import urlparse
 
@@ -92,6 +99,22 @@ class TarWriter(object):
         ti.size = len(content)
         self.tarfile.addfile(ti, fileobj=buf)
 
+    def write_fileobj(self, name, fileobj):
+        """
+        add content of seekable file object, from the beginning to its end
+
+        :param name: str, name of the file in the archive
+        :param fileobj: file-like object opened for reading bytes
+        """
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell()
+        fileobj.seek(0)
+        arcname = os.path.join(self.directory, name)
+
+        ti = tarfile.TarInfo(arcname)
+        ti.size = size
+        self.tarfile.addfile(ti, fileobj=fileobj)
+
 
 class TarReader(object):
     TarFile = namedtuple('TarFile', ['filename', 'fileobj'])
@@ -123,9 +146,19 @@ class TarReader(object):
 
 
 def graceful_chain_get(d, *args):
+    """
+    walk path of keys/indexes in nested dicts and lists
+
+    The returned value is not copied, it's part of `d`; use
+    graceful_chain_get_copy() when the result is going to be modified.
+
+    :param d: dict or list to look into
+    :param args: keys/indexes to follow
+    :return: value at the path, or None if any part of the path is missing
+    """
     if not d:
         return None
-    t = copy.deepcopy(d)
+    t = d
     for arg in args:
         try:
             t = t[arg]
@@ -134,6 +167,15 @@ def graceful_chain_get(d, *args):
     return t
 
 
+def graceful_chain_get_copy(d, *args):
+    """
+    same as graceful_chain_get() but return deep copy of the value
+
+    Only the value found is copied, not the whole `d`.
+    """
+    return copy.deepcopy(graceful_chain_get(d, *args))
+
+
 def graceful_chain_del(d, *args):
     if not d:
         return
@@ -244,12 +286,118 @@ def looks_like_git_hash(git_ref):
     return all(ch in string.hexdigits for ch in git_ref) and len(git_ref) == 40
 
 
-def get_repo_info(git_uri, git_ref, git_branch=None):
-    with checkout_git_repo(git_uri, git_ref, git_branch) as code_dir:
+def read_git_files(repo_path, rev, paths):
+    """
+    read content of files at given revision, without checking them out
+
+    Symbolic links within the repository are followed, so a linked file
+    gives the content of its target.
+
+    :param repo_path: str, path to git repository
+    :param rev: str, git revision
+    :param paths: list of str, paths of files in the repository
+    :return: dict, path to bytes content; missing files, and links which
+             point outside of the repository or nowhere, are left out
+    """
+    process = subprocess.Popen(['git', 'cat-file', '--batch', '--follow-symlinks'],
+                               cwd=repo_path,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    query = ''.join('%s:%s\n' % (rev, path) for path in paths)
+    output, err = process.communicate(query.encode('utf-8'))
+    if process.returncode:
+        raise OsbsException("Unable to read files from git repo: %s" % err)
+
+    files = {}
+    stream = BytesIO(output)
+    for path in paths:
+        header = stream.readline().split()
+        if len(header) == 3:
+            _, object_type, size = header
+        elif len(header) == 2 and header[1].isdigit():
+            # link which can't be followed: "symlink", "dangling", "loop" or
+            # "notdir", followed by the link target or path
+            object_type, size = header
+        else:
+            # "<rev>:<path> missing"
+            continue
+        content = stream.read(int(size))
+        stream.readline()
+        if object_type == b'blob':
+            files[path] = content
+    return files
+
+
+def fetch_git_files(git_uri, git_ref, paths, git_branch=None):
+    """
+    fetch single commit without history and read some files from it
+
+    :param git_uri: str, URI of git repository
+    :param git_ref: str, commit hash, branch or tag
+    :param paths: list of str, paths of files to read
+    :param git_branch: str, branch with git_ref, used when git_ref can't be
+                       fetched directly, e.g. when the git server doesn't allow
+                       fetching commits by hash
+    :return: tuple, (full commit hash, dict of path to bytes content)
+    """
+    tmpdir = tempfile.mkdtemp()
+    try:
+        run_command(['git', 'init', '-q', tmpdir])
+        try:
+            run_command(['git', 'fetch', '-q', '--depth', '1', git_uri, git_ref], cwd=tmpdir)
+            rev = 'FETCH_HEAD'
+        except OsbsException as ex:
+            logger.debug("shallow fetch of %s failed, fetching history: %s", git_ref, ex)
+            if git_branch:
+                refspec = git_branch
+            else:
+                refspec = '+refs/heads/*:refs/remotes/origin/*'
+            run_command(['git', 'fetch', '-q', git_uri, refspec], cwd=tmpdir)
+            rev = git_ref
+
+        commit = run_command(['git', 'rev-parse', '--verify', '%s^{commit}' % rev],
+                             cwd=tmpdir).decode('ascii').strip()
+        return commit, read_git_files(tmpdir, commit, paths)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def get_repo_info(git_uri, git_ref, git_branch=None, cache=None):
+    """
+    read repository files needed for the build
+
+    Only git_ref itself is fetched, not the whole repository. When cache is
+    given, files are taken from it for commits which were seen before.
+
+    :param cache: osbs.repo_utils.RepoInfoCache instance or None
+    :return: RepoInfo instance
+    """
+    files = None
+    if cache is not None and looks_like_git_hash(git_ref):
+        files = cache.get(git_uri, git_ref)
+
+    if files is None:
+        try:
+            commit, files = fetch_git_files(git_uri, git_ref, REPO_INFO_FILES,
+                                            git_branch=git_branch)
+        except OsbsException as ex:
+            raise OsbsException("Unable to fetch '%s' from git repo '%s' "
+                                "branch '%s'" % (git_ref, git_uri, git_branch),
+                                cause=ex, traceback=sys.exc_info()[2])
+        if cache is not None:
+            cache.put(git_uri, commit, files)
+
+    code_dir = tempfile.mkdtemp()
+    try:
+        for name, content in files.items():
+            with open(os.path.join(code_dir, name), 'wb') as f:
+                f.write(content)
         dfp = DockerfileParser(os.path.join(code_dir), cache_content=True)
         config = RepoConfiguration(dir_path=code_dir)
         tags_config = AdditionalTagsConfig(dir_path=code_dir,
                                            tags=config.container.get('tags', set()))
+    finally:
+        shutil.rmtree(code_dir)
     return RepoInfo(dfp, config, tags_config)
 
 
@@ -578,46 +726,323 @@ class Labels(object):
             return (label_type, self._df_labels[label_type])
 
 
-def retry_on_conflict(func):
+def run_in_parallel(stages):
+    """
+    call functions in separate threads and wait for all of them
+
+    The first function runs in the calling thread. When some of the
+    functions fail, exception of the first failed one (in order of
+    `stages`) is raised after all of them finished.
+
+    :param stages: list of (name, callable) tuples
+    :return: tuple, (dict of name to result, dict of name to seconds taken)
+    """
+    results = {}
+    timings = {}
+    errors = {}
+
+    def run(name, func):
+        start = time.time()
+        try:
+            results[name] = func()
+        except Exception:
+            errors[name] = sys.exc_info()
+        finally:
+            timings[name] = time.time() - start
+
+    threads = []
+    for name, func in stages[1:]:
+        thread = threading.Thread(target=run, args=(name, func), name='osbs-%s' % name)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    if stages:
+        run(*stages[0])
+    for thread in threads:
+        thread.join()
+
+    for name, _ in stages:
+        if name in errors:
+            six.reraise(*errors[name])
+    return results, timings
+
+
+def format_timings(timings):
+    return ', '.join('%s %.3fs' % (name, seconds) for name, seconds in sorted(timings.items()))
+
+
+class RateLimiter(object):
+    """
+    token bucket: allow bursts of up to `burst` calls, refilled at `qps` per second
+    """
+
+    def __init__(self, qps, burst=None):
+        """
+        :param qps: float, number of tokens added per second
+        :param burst: int, max number of tokens in bucket, defaults to qps
+                      rounded up
+        """
+        if qps <= 0:
+            raise OsbsValidationException("qps must be positive: %s" % qps)
+        if burst is None:
+            burst = max(1, int(math.ceil(qps)))
+        if burst < 1:
+            raise OsbsValidationException("burst must be positive: %s" % burst)
+        self.qps = float(qps)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        take one token, block until it's available
+
+        :return: float, seconds spent waiting
+        """
+        with self._lock:
+            now = time.time()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.qps)
+            self._last = now
+            # tokens may go negative: waiting callers reserve future tokens
+            # and wake up in order
+            self._tokens -= 1
+            delay = -self._tokens / self.qps if self._tokens < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+def run_concurrently(func, items, max_workers, rate_limiter=None):
+    """
+    call func for every item from a pool of threads
+
+    Results are yielded as the calls complete. When the generator is closed
+    before all items were processed, the remaining items are skipped.
+
+    :param func: callable, called with one item
+    :param items: list of items
+    :param max_workers: int, max number of concurrent calls
+    :param rate_limiter: RateLimiter instance to pace the calls, or None
+    :return: generator of (index, result, exc_info) tuples, exc_info is
+             None for successful calls and result is None for failed ones
+    """
+    pending = six.moves.queue.Queue()
+    done = six.moves.queue.Queue()
+    stopped = threading.Event()
+    for index, item in enumerate(items):
+        pending.put((index, item))
+
+    def worker():
+        while not stopped.is_set():
+            try:
+                index, item = pending.get_nowait()
+            except six.moves.queue.Empty:
+                return
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            try:
+                done.put((index, func(item), None))
+            except Exception:
+                done.put((index, None, sys.exc_info()))
+
+    for i in range(max(1, min(max_workers, len(items)))):
+        thread = threading.Thread(target=worker, name='osbs-worker-%d' % i)
+        thread.daemon = True
+        thread.start()
+
+    try:
+        for _ in range(len(items)):
+            yield done.get()
+    finally:
+        stopped.set()
+
+
+class RetryBudget(object):
+    """
+    limit retries across many calls
+
+    Every retry takes one token and every successful call gives back `ratio`
+    of a token. Retries are allowed only while more than half of `max_tokens`
+    is left, so when most calls are failing, clients stop multiplying the
+    load by retrying them.
+    """
+
+    def __init__(self, max_tokens=RETRY_BUDGET_TOKENS, ratio=RETRY_BUDGET_RATIO):
+        """
+        :param max_tokens: int, size of the budget
+        :param ratio: float, tokens returned for every successful call
+        """
+        self.max_tokens = max_tokens
+        self.ratio = ratio
+        self._tokens = float(max_tokens)
+        self._lock = threading.Lock()
+
+    def withdraw(self):
+        """
+        take a token for one retry
+
+        :return: bool, whether the retry is allowed
+        """
+        with self._lock:
+            if self._tokens <= self.max_tokens / 2.0:
+                return False
+            self._tokens -= 1
+            return True
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def reset(self):
+        with self._lock:
+            self._tokens = float(self.max_tokens)
+
+
+# shared by all retry policies which aren't given a budget of their own
+RETRY_BUDGET = RetryBudget()
+
+
+class RetryPolicy(object):
+    """
+    when and how long to wait before calling again
+
+    Delays grow exponentially from `base_delay`, capped at `max_delay`, and
+    each one is picked at random between zero and that value ("full jitter"),
+    so clients failing at the same time don't retry at the same time.
+    No retry is made once it would end after `deadline` seconds since the
+    first attempt, or when the retry budget is used up.
+    """
+
+    def __init__(self, max_retries, base_delay, max_delay=RETRY_MAX_DELAY,
+                 deadline=RETRY_DEADLINE, budget=None):
+        """
+        :param max_retries: int, max number of retries after the first attempt
+        :param base_delay: float, seconds, upper bound of the first delay
+        :param max_delay: float, seconds, upper bound of any delay
+        :param deadline: float, seconds, time limit for all attempts
+                         of one call, None for no limit
+        :param budget: RetryBudget, defaults to the process-wide one
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.budget = budget or RETRY_BUDGET
+
+    def copy(self, **kwargs):
+        """
+        return policy with some parameters changed, sharing the retry budget
+        """
+        params = {
+            'max_retries': self.max_retries,
+            'base_delay': self.base_delay,
+            'max_delay': self.max_delay,
+            'deadline': self.deadline,
+            'budget': self.budget,
+        }
+        params.update(kwargs)
+        return RetryPolicy(**params)
+
+    def next_delay(self, attempt, started):
+        """
+        decide whether to retry after failed attempt
+
+        :param attempt: int, number of the failed attempt, starting at 0
+        :param started: float, time of the first attempt
+        :return: float, seconds to wait before retrying, or None to give up
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if self.deadline is not None and time.time() + delay - started > self.deadline:
+            logger.debug("not retrying, deadline of %ss would be exceeded", self.deadline)
+            return None
+
+        if not self.budget.withdraw():
+            logger.warning("not retrying, retry budget exhausted")
+            return None
+
+        return delay
+
+    def succeeded(self):
+        self.budget.deposit()
+
+    def call(self, func, args, kwargs, exception_type=Exception, should_retry_cb=None):
+        """
+        call func(*args, **kwargs), retrying when it raises exception_type
+
+        :param should_retry_cb: callable, called with the exception, returns
+                                whether it should be retried
+        :return: what func returned
+        """
+        started = time.time()
+        for attempt in itertools.count():
+            try:
+                result = func(*args, **kwargs)
+            except exception_type as ex:
+                if should_retry_cb is not None and not should_retry_cb(ex):
+                    raise
+                delay = self.next_delay(attempt, started)
+                if delay is None:
+                    raise
+                logger.info("retrying on exception: %s", getattr(ex, 'message', ex))
+                logger.debug("attempt %d to call %s, waiting %.1fs",
+                             attempt + 1, func.__name__, delay)
+                time.sleep(delay)
+            else:
+                self.succeeded()
+                return result
+
+
+def _resolve_policy(policy):
+    # looked up at call time, so the module defaults can be replaced
+    return policy or CONFLICT_RETRY_POLICY
+
+
+def retry_on_conflict(func=None, policy=None):
+    """
+    retry func while it fails with conflict
+
+    Use as @retry_on_conflict or @retry_on_conflict(policy=...).
+
+    :param policy: RetryPolicy, defaults to CONFLICT_RETRY_POLICY
+    """
+    if func is None:
+        return lambda f: retry_on_conflict(f, policy=policy)
+
+    # Only retry when OsbsResponseException was raised due to a conflict
+    def should_retry_cb(ex):
+        return ex.status_code == http_client.CONFLICT
+
     @wraps(func)
     def retry(*args, **kwargs):
-        # Only retry when OsbsResponseException was raised due to a conflict
-        def should_retry_cb(ex):
-            return ex.status_code == http_client.CONFLICT
-
-        retry_func = RetryFunc(OsbsResponseException, should_retry_cb=should_retry_cb)
-        return retry_func.go(func, *args, **kwargs)
+        return _resolve_policy(policy).call(func, args, kwargs,
+                                            exception_type=OsbsResponseException,
+                                            should_retry_cb=should_retry_cb)
 
     return retry
 
 
-def retry_on_exception(exception_type):
+def retry_on_exception(exception_type, policy=None):
+    """
+    retry func while it raises exception_type
+
+    :param policy: RetryPolicy, defaults to CONFLICT_RETRY_POLICY
+    """
     def do_retry_on_exception(func):
         @wraps(func)
         def retry(*args, **kwargs):
-            return RetryFunc(exception_type).go(func, *args, **kwargs)
+            return _resolve_policy(policy).call(func, args, kwargs,
+                                                exception_type=exception_type)
 
         return retry
 
     return do_retry_on_exception
 
 
-class RetryFunc(object):
-    def __init__(self, exception_type, should_retry_cb=None):
-        self.exception_type = exception_type
-        self.should_retry_cb = should_retry_cb or (lambda ex: True)
-
-        self.retry_times = OS_CONFLICT_MAX_RETRIES
-        self.retry_delay = OS_CONFLICT_WAIT
-
-    def go(self, func, *args, **kwargs):
-        for counter in range(self.retry_times + 1):
-            try:
-                return func(*args, **kwargs)
-            except self.exception_type as ex:
-                if self.should_retry_cb(ex) and counter != self.retry_times:
-                    logger.info("retrying on exception: %s", ex.message)
-                    logger.debug("attempt %d to call %s", counter + 1, func.__name__)
-                    time.sleep(self.retry_delay * (2 ** counter))
-                else:
-                    raise
+# OpenShift API calls decorated with retry_on_conflict or retry_on_exception
+CONFLICT_RETRY_POLICY = RetryPolicy(OS_CONFLICT_MAX_RETRIES, OS_CONFLICT_WAIT)
+# HTTP requests which failed to connect or got a retryable status
+HTTP_RETRY_POLICY = RetryPolicy(HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR)
@@ -12,6 +12,12 @@ import sys
 import glob
 
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
+
+# asyncio support (osbs.aio) uses async generators, which older Pythons
+# can't even byte-compile, so it is only installed on Python 3.6+
+ASYNCIO_MODULES = [('osbs', 'aio')]
+HAS_ASYNCIO = sys.version_info >= (3, 6)
 
 data_files = {
     "share/osbs": glob.glob("inputs/*.json"),
@@ -31,6 +37,14 @@ def _install_requirements():
         requirements += _get_requirements('requirements-py3.txt')
     return requirements
 
+class BuildPy(build_py):
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+        if HAS_ASYNCIO:
+            return modules
+        return [(pkg, module, path) for pkg, module, path in modules
+                if (pkg, module) not in ASYNCIO_MODULES]
+
 setup(
     name="osbs-client",
     description='Python module and command line client for OpenShift Build Service',
@@ -44,6 +58,8 @@ setup(
           'console_scripts': ['osbs=osbs.cli.main:main'],
     },
     install_requires=_install_requirements(),
+    extras_require={'aio': ['aiohttp>=3.3'] if HAS_ASYNCIO else []},
+    cmdclass={'build_py': BuildPy},
     data_files=data_files.items(),
     setup_requires=[],
     tests_require=_get_requirements('tests/requirements.txt'),
@@ -0,0 +1,49 @@
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import json
+import os
+
+from flexmock import flexmock
+import pytest
+
+from osbs.build.build_json_store import BuildJsonStore
+
+
+@pytest.fixture
+def store(tmpdir):
+    BuildJsonStore.clear()
+    tmpdir.join('template.json').write(json.dumps({'spec': {'triggers': []}}))
+    yield BuildJsonStore(str(tmpdir))
+    BuildJsonStore.clear()
+
+
+class TestBuildJsonStore(object):
+    def test_parsed_once(self, store):
+        flexmock(json).should_call('load').once()
+        first = store.load('template.json')
+        second = store.load('template.json')
+        assert first == second == {'spec': {'triggers': []}}
+
+    def test_returns_copies(self, store):
+        store.load('template.json')['spec']['triggers'].append('x')
+        assert store.load('template.json') == {'spec': {'triggers': []}}
+
+    def test_file_changed(self, store, tmpdir):
+        path = tmpdir.join('template.json')
+        assert store.load('template.json') == {'spec': {'triggers': []}}
+
+        path.write(json.dumps({'spec': {}}))
+        st = os.stat(str(path))
+        os.utime(str(path), (st.st_atime, st.st_mtime + 10))
+        assert store.load('template.json') == {'spec': {}}
+
+    def test_missing_file(self, store):
+        with pytest.raises(IOError):
+            store.load('missing.json')
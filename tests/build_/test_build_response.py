@@ -7,6 +7,8 @@ of the BSD license. See the LICENSE file for details.
 """
 import json
 import pytest
+from flexmock import flexmock
+from osbs import codec
 from osbs.build.build_response import BuildResponse
 from osbs.exceptions import OsbsException
 
@@ -23,6 +25,91 @@ class TestBuildResponse(object):
         })
         assert build_response.get_koji_build_id() == koji_build_id
 
+    def test_get_labels_and_annotations_are_copies(self):
+        build_response = BuildResponse({
+            'metadata': {
+                'labels': {'koji-build-id': '123'},
+                'annotations': {'image-id': 'abc'},
+            },
+        })
+        build_response.get_labels()['koji-build-id'] = '456'
+        build_response.get_annotations()['image-id'] = 'def'
+        build_response.get_annotations_or_labels()['image-id'] = 'def'
+        assert build_response.get_koji_build_id() == '123'
+        assert build_response.get_image_id() == 'abc'
+
+    def test_fields(self):
+        tar_metadata = {'size': 10, 'md5sum': 'a', 'sha256sum': 'b', 'filename': 'c'}
+        build_response = BuildResponse({
+            'metadata': {
+                'name': 'build-1',
+                'creationTimestamp': '2015-08-20T16:41:05Z',
+                'labels': {'koji-build-id': '123'},
+                'annotations': {'tar_metadata': json.dumps(tar_metadata)},
+            },
+            'spec': {'output': {'to': {'name': 'registry/image:tag'}}},
+            'status': {'phase': 'Running'},
+        })
+        assert not hasattr(build_response, '__dict__')
+        assert build_response.get_build_name() == 'build-1'
+        assert build_response.get_image_tag() == 'registry/image:tag'
+        assert build_response.get_time_created_in_seconds() == 1440088865.0
+        assert build_response.status == 'running'
+
+        # parse the Build itself before counting
+        build_response.json
+
+        # annotation JSON is decoded only once
+        decoded = []
+        loads = codec.loads
+        (flexmock(codec)
+            .should_receive('loads')
+            .replace_with(lambda data: decoded.append(data) or loads(data)))
+        assert build_response.get_tar_metadata() == tar_metadata
+        assert build_response.get_tar_metadata_size() == 10
+        assert build_response.get_tar_metadata_md5sum() == 'a'
+        assert len(decoded) == 1
+        build_response.json['metadata']['annotations']['tar_metadata'] = '{"size": 20}'
+        assert build_response.get_tar_metadata_size() == 20
+        assert len(decoded) == 2
+
+        build_response.json = {'metadata': {'name': 'build-2'}}
+        assert build_response.get_build_name() == 'build-2'
+        assert build_response.get_tar_metadata() is None
+
+    def test_json_kept_serialized(self):
+        build_json = {
+            'metadata': {'name': 'build-1', 'labels': {'koji-build-id': '123'}},
+            'status': {'phase': 'Running', 'cancelled': False},
+        }
+        build_response = BuildResponse(build_json)
+        # no reference to the Build dict is kept until json is needed
+        assert build_response._json is None
+        assert build_response.cancelled is False
+        assert build_response.get_koji_build_id() == '123'
+
+        assert build_response.json == build_json
+        assert build_response.json is not build_json
+        build_response.json['metadata']['labels']['koji-build-id'] = '456'
+        build_response.status = 'complete'
+        assert build_response.get_koji_build_id() == '456'
+        assert build_response.json['status']['phase'] == 'Complete'
+
+    @pytest.mark.parametrize(('key', 'getter'), [
+        ('repositories', BuildResponse.get_repositories),
+        ('digests', BuildResponse.get_digests),
+        ('tar_metadata', BuildResponse.get_tar_metadata),
+    ])
+    def test_decoded_annotations_are_copies(self, key, getter):
+        value = {'primary': ['registry/image:tag'], 'size': 10}
+        build_response = BuildResponse({
+            'metadata': {'annotations': {key: json.dumps(value)}},
+        })
+        getter(build_response)['primary'].append('registry/image:other')
+        getter(build_response)['size'] = 20
+        assert getter(build_response) == value
+        assert getter(build_response) is not getter(build_response)
+
     def test_build_cancel(self):
         build_response = BuildResponse({
             'status': {
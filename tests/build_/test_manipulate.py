@@ -10,7 +10,7 @@ import json
 
 import pytest
 
-from osbs.build.manipulate import DockJsonManipulator
+from osbs.build.manipulate import DockJsonManipulator, PluginIndex
 
 from tests.constants import TEST_BUILD_JSON, TEST_INNER_DOCK_JSON
 
@@ -58,3 +58,61 @@ class TestDockJsonManipulator(object):
         assert plugin['args']['key1']['a'] == '3'
         assert plugin['args']['key1']['b'] == '2'
         assert plugin['args']['key1']['z'] == '9'
+
+
+class TestPluginIndex(object):
+    def make_conf(self):
+        return {
+            'client_version': '1',
+            'prebuild_plugins': [
+                {'name': 'a', 'args': {'x': 1}},
+                {'name': 'b'},
+                {'name': 'c'},
+                {'name': 'b', 'args': {'second': True}},
+            ],
+        }
+
+    def test_get(self):
+        conf = self.make_conf()
+        index = PluginIndex(conf)
+        assert index.get('prebuild_plugins', 'a') is conf['prebuild_plugins'][0]
+        assert index.get('prebuild_plugins', 'b') is conf['prebuild_plugins'][1]
+        with pytest.raises(IndexError):
+            index.get('prebuild_plugins', 'missing')
+        with pytest.raises(KeyError):
+            index.get('exit_plugins', 'a')
+
+    def test_add_and_remove_keep_order(self):
+        conf = self.make_conf()
+        index = PluginIndex(conf)
+        assert index.add('prebuild_plugins', 'd', {'y': 2})
+        assert not index.add('prebuild_plugins', 'b', {'z': 3})
+        assert index.remove('prebuild_plugins', 'a')
+        assert not index.remove('prebuild_plugins', 'missing')
+        assert index.remove('prebuild_plugins', 'b')
+
+        assert conf['prebuild_plugins'] == [
+            {'name': 'c'},
+            {'name': 'b', 'args': {'z': 3}},
+            {'name': 'd', 'args': {'y': 2}},
+        ]
+        assert index.get('prebuild_plugins', 'b') is conf['prebuild_plugins'][1]
+
+    def test_remove_by_identity(self):
+        conf = {'prebuild_plugins': [{'name': 'a'}, {'name': 'b'}]}
+        index = PluginIndex(conf)
+        index.get('prebuild_plugins', 'b')
+        # equal to the indexed 'b' but not the same dict
+        conf['prebuild_plugins'].insert(0, {'name': 'b'})
+        first = conf['prebuild_plugins'][0]
+        assert index.remove('prebuild_plugins', 'b')
+        assert conf['prebuild_plugins'] == [{'name': 'b'}, {'name': 'a'}]
+        assert conf['prebuild_plugins'][0] is first
+
+    def test_reset(self):
+        conf = self.make_conf()
+        index = PluginIndex(conf)
+        index.get('prebuild_plugins', 'a')
+        conf['prebuild_plugins'] = [{'name': 'e'}]
+        index.reset('prebuild_plugins')
+        assert index.get('prebuild_plugins', 'e') == {'name': 'e'}
@@ -94,7 +94,7 @@ class TestPluginsConfiguration(object):
     def mock_repo_info(self, additional_tags=None):
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(RepoInfo(additional_tags=additional_tags)))
 
     def assert_import_image_plugin(self, plugins, name_label):
@@ -409,12 +409,12 @@ class TestPluginsConfiguration(object):
                 expected_primary -= exclude_for_override
             (flexmock(utils)
                 .should_receive('get_repo_info')
-                .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+                .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
                 .and_return(RepoInfo(additional_tags=AdditionalTagsConfig(tags=extra_tags))))
         else:
             (flexmock(utils)
                 .should_receive('get_repo_info')
-                .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+                .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
                 .and_return(RepoInfo(additional_tags=AdditionalTagsConfig(dir_path=str(tmpdir)))))
 
         user_params = BuildUserParams(INPUTS_PATH)
@@ -0,0 +1,23 @@
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+"""
+import sys
+
+import pytest
+
+from osbs.utils import RETRY_BUDGET
+
+collect_ignore = []
+if sys.version_info < (3, 6):
+    # asyncio support uses async generators
+    collect_ignore.append('test_aio.py')
+
+
+@pytest.fixture(autouse=True)
+def reset_retry_budget():
+    # tests exhausting retries must not affect retries in other tests
+    RETRY_BUDGET.reset()
@@ -14,6 +14,7 @@ import inspect
 import json
 import logging
 import fnmatch
+from osbs import codec
 from osbs.core import Openshift
 from osbs.http import HttpResponse
 from osbs.conf import Configuration
@@ -45,6 +46,14 @@ class StreamingResponse(object):
     def iter_lines(self):
         yield self.content
 
+    def iter_chunks(self, chunk_size=None):
+        chunk_size = chunk_size or len(self.content) or 1
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def iter_items(self, key='items', envelope=None):
+        return codec.iter_json_items(self.iter_chunks(), key=key, envelope=envelope)
+
     def __enter__(self):
         return self
 
@@ -147,6 +156,9 @@ class Connection(object):
                  },
                  "put": {
                      "file": "build_test-build-123.json",
+                 },
+                 "patch": {
+                     "file": "build_test-build-123.json",
                  }
             },
 
@@ -160,6 +172,9 @@ class Connection(object):
                  },
                  "put": {
                      "file": "build_test-orchestrator-build-123.json",
+                 },
+                 "patch": {
+                     "file": "build_test-orchestrator-build-123.json",
                  }
             },
 
@@ -173,13 +188,18 @@ class Connection(object):
                  },
                  "put": {
                      "file": "build_test-build-cancel-123_put.json",
+                 },
+                 "patch": {
+                     "file": "build_test-build-cancel-123_put.json",
                  }
             },
 
 
             (OAPI_PREFIX + "namespaces/default/builds/%s/log/" % TEST_BUILD,
              OAPI_PREFIX + "namespaces/default/builds/%s/log/?follow=0" % TEST_BUILD,
-             OAPI_PREFIX + "namespaces/default/builds/%s/log/?follow=1" % TEST_BUILD): {
+             OAPI_PREFIX + "namespaces/default/builds/%s/log/?follow=1" % TEST_BUILD,
+             OAPI_PREFIX + "namespaces/default/builds/%s/log/?follow=1&timestamps=true" %
+             TEST_BUILD): {
                  "get": {
                      # Lines of text
                      "file": "build_test-build-123_logs.txt",
@@ -189,6 +209,8 @@ class Connection(object):
             (OAPI_PREFIX + "namespaces/default/builds/%s/log/" % TEST_ORCHESTRATOR_BUILD,
              OAPI_PREFIX + "namespaces/default/builds/%s/log/?follow=0" % TEST_ORCHESTRATOR_BUILD,
              OAPI_PREFIX + "namespaces/default/builds/%s/log/?follow=1"
+             % TEST_ORCHESTRATOR_BUILD,
+             OAPI_PREFIX + "namespaces/default/builds/%s/log/?follow=1&timestamps=true"
              % TEST_ORCHESTRATOR_BUILD): {
                  "get": {
                      # Lines of text
@@ -472,6 +494,9 @@ class Connection(object):
     def delete(self, url, *args, **kwargs):
         return self.request(url, "delete", *args, **kwargs)
 
+    def patch(self, url, *args, **kwargs):
+        return self.request(url, "patch", *args, **kwargs)
+
 
 @pytest.fixture(params=["1.0.4"])
 def openshift(request):
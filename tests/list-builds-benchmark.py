@@ -0,0 +1,126 @@
+#!/usr/bin/python
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+
+
+Measure how long `osbs list-builds` takes to render a large listing.
+
+The "before" run uses the old graceful_chain_get, which deep-copied the whole
+Build JSON on every lookup; the "after" run uses the current one.
+
+    $ python tests/list-builds-benchmark.py --builds 10000
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import argparse
+import contextlib
+import copy
+import json
+import logging
+import os
+import sys
+import time
+
+from six import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import osbs.build.build_response  # noqa:E402
+from osbs.build.build_response import BuildResponse  # noqa:E402
+from osbs.cli.main import cmd_list_builds  # noqa:E402
+from tests.constants import TEST_BUILD  # noqa:E402
+
+BUILD_JSON = os.path.join(os.path.dirname(__file__), 'mock_jsons', '1.0.4',
+                          'build_%s.json' % TEST_BUILD)
+
+
+def deepcopy_chain_get(d, *args):
+    # graceful_chain_get as it was before it stopped copying
+    if not d:
+        return None
+    t = copy.deepcopy(d)
+    for arg in args:
+        try:
+            t = t[arg]
+        except (IndexError, KeyError):
+            return None
+    return t
+
+
+def make_builds(count):
+    with open(BUILD_JSON) as fp:
+        template = json.load(fp)
+
+    builds = []
+    for i in range(count):
+        build = copy.deepcopy(template)
+        build['metadata']['name'] = 'test-build-%d' % i
+        timestamp = '2015-08-20T16:%02d:%02dZ' % (i // 60 % 60, i % 60)
+        build['metadata']['creationTimestamp'] = timestamp
+        builds.append(build)
+    return builds
+
+
+class FakeOSBS(object):
+    def __init__(self, builds):
+        self.builds = builds
+
+    def list_builds(self, **kwargs):
+        return [BuildResponse(build) for build in self.builds]
+
+
+@contextlib.contextmanager
+def chain_get(func):
+    module = osbs.build.build_response
+    orig = module.graceful_chain_get
+    module.graceful_chain_get = func
+    try:
+        yield
+    finally:
+        module.graceful_chain_get = orig
+
+
+def run(builds, repeat):
+    args = argparse.Namespace(running=False, from_json=None, output='text',
+                              columns=None, FILTER=None)
+    best = None
+    for _ in range(repeat):
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = StringIO(), StringIO()
+        start = time.time()
+        try:
+            cmd_list_builds(args, FakeOSBS(builds))
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+        took = time.time() - start
+        best = took if best is None else min(best, took)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark list-builds rendering")
+    parser.add_argument("--builds", type=int, default=10000,
+                        help="number of builds to list")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="take the best of this many runs")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    builds = make_builds(args.builds)
+
+    with chain_get(deepcopy_chain_get):
+        before = run(builds, args.repeat)
+    after = run(builds, args.repeat)
+
+    print("list-builds, %d builds (best of %d)" % (args.builds, args.repeat))
+    print("  before (deepcopy): %8.3fs" % before)
+    print("  after  (no copy):  %8.3fs" % after)
+    print("  speedup:           %8.1fx" % (before / after))
+
+
+if __name__ == '__main__':
+    main()
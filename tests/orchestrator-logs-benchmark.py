@@ -0,0 +1,101 @@
+#!/usr/bin/python
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+
+
+Measure throughput of splitting orchestrator build logs by platform.
+
+The "before" run decodes every line and parses it with
+OSBS._parse_build_log_entry into a LogEntry, as get_orchestrator_build_logs
+does; the "after" run routes bytes with OrchestratorLogDemultiplexer.
+
+    $ python tests/orchestrator-logs-benchmark.py --megabytes 100
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from osbs.api import OSBS, LogEntry  # noqa:E402
+from osbs.logs import OrchestratorLogDemultiplexer  # noqa:E402
+
+PLATFORMS = ('-', 'x86_64', 'ppc64le', 'aarch64', 's390x')
+
+
+def make_lines(megabytes):
+    lines = []
+    size = 0
+    i = 0
+    while size < megabytes * 1024 * 1024:
+        platform = PLATFORMS[i % len(PLATFORMS)]
+        if platform == '-':
+            line = ('2018-03-01 12:00:%02d,%03d platform:- - atomic_reactor.plugin - DEBUG - '
+                    'orchestrator line %d' % (i % 60, i % 1000, i))
+        else:
+            line = ('2018-03-01 12:00:%02d,%03d platform:%s - atomic_reactor.plugins.'
+                    'orchestrate_build - INFO - 2018-03-01 12:00:%02d,%03d platform:- - '
+                    'atomic_reactor.plugins.build - DEBUG - worker line %d with some output'
+                    % (i % 60, i % 1000, platform, i % 60, i % 1000, i))
+        line = line.encode('utf-8')
+        lines.append(line)
+        size += len(line) + 1
+        i += 1
+    return lines, size
+
+
+def parse_entries(lines):
+    # get_orchestrator_build_logs(follow=True) with decode=True
+    for line in lines:
+        entry = line.decode('utf-8').rstrip()
+        LogEntry(*OSBS._parse_build_log_entry(entry))
+
+
+def demux(lines):
+    sinks = dict((platform, lambda line: None) for platform in PLATFORMS[1:])
+    sinks[None] = lambda line: None
+    OrchestratorLogDemultiplexer(sinks).run(lines)
+
+
+def run(func, lines, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        func(lines)
+        took = time.time() - start
+        best = took if best is None else min(best, took)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark orchestrator log splitting")
+    parser.add_argument("--megabytes", type=int, default=100,
+                        help="size of generated log")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="take the best of this many runs")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    lines, size = make_lines(args.megabytes)
+    megabytes = size / (1024.0 * 1024)
+
+    before = run(parse_entries, lines, args.repeat)
+    after = run(demux, lines, args.repeat)
+
+    print("orchestrator logs, %.1f MB, %d lines (best of %d)" % (megabytes, len(lines),
+                                                                 args.repeat))
+    print("  before (LogEntry per line): %8.1f MB/s" % (megabytes / before))
+    print("  after  (demultiplexer):     %8.1f MB/s" % (megabytes / after))
+    print("  speedup:                    %8.1fx" % (before / after))
+
+
+if __name__ == '__main__':
+    main()
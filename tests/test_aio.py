@@ -0,0 +1,259 @@
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+"""
+import asyncio
+import json
+
+import pytest
+
+from osbs.exceptions import OsbsResponseException, OsbsWatchBuildNotFound
+from osbs.constants import DEFAULT_NAMESPACE
+
+aiohttp = pytest.importorskip('aiohttp')
+web = pytest.importorskip('aiohttp.web')
+
+from osbs import aio  # noqa:E402
+from osbs.aio import AsyncOpenshift  # noqa:E402
+from osbs.utils import RetryPolicy  # noqa:E402
+
+
+def build_json(name, phase):
+    return {
+        "kind": "Build",
+        "metadata": {"name": name, "labels": {}, "annotations": {}},
+        "status": {"phase": phase},
+    }
+
+
+class FakeOpenshift(object):
+    """
+    minimal OpenShift API served by aiohttp
+    """
+
+    def __init__(self):
+        self.builds = {
+            'build-1': build_json('build-1', 'Running'),
+            'build-2': build_json('build-2', 'Complete'),
+        }
+        self.requests = []
+        self.failures = 0
+        self.stall = False
+
+    def app(self):
+        prefix = '/oapi/v1/'
+        ns = 'namespaces/%s/' % DEFAULT_NAMESPACE
+        app = web.Application()
+        app.router.add_get(prefix + ns + 'builds/', self.list_builds)
+        app.router.add_post(prefix + ns + 'builds/', self.create_build)
+        app.router.add_get(prefix + ns + 'builds/{name}/', self.get_build)
+        app.router.add_put(prefix + ns + 'builds/{name}/', self.put_build)
+        app.router.add_patch(prefix + ns + 'builds/{name}/', self.patch_build)
+        app.router.add_get(prefix + ns + 'builds/{name}/log/', self.logs)
+        app.router.add_get(prefix + 'watch/' + ns + 'builds/{name}/', self.watch)
+        return app
+
+    def record(self, request):
+        self.requests.append((request.method, request.path_qs,
+                              request.headers.get('Authorization')))
+
+    async def list_builds(self, request):
+        self.record(request)
+        return web.json_response({"items": list(self.builds.values())})
+
+    async def create_build(self, request):
+        self.record(request)
+        build = await request.json()
+        self.builds[build['metadata']['name']] = build
+        return web.json_response(build, status=201)
+
+    async def get_build(self, request):
+        self.record(request)
+        if self.failures:
+            self.failures -= 1
+            return web.Response(status=503)
+        try:
+            return web.json_response(self.builds[request.match_info['name']])
+        except KeyError:
+            return web.json_response({"kind": "Status", "code": 404}, status=404)
+
+    async def put_build(self, request):
+        self.record(request)
+        build = await request.json()
+        self.builds[request.match_info['name']] = build
+        return web.json_response(build)
+
+    async def patch_build(self, request):
+        self.record(request)
+        patch = await request.json()
+        build = self.builds[request.match_info['name']]
+        build['status'].update(patch.get('status', {}))
+        return web.json_response(build)
+
+    async def logs(self, request):
+        self.record(request)
+        response = web.StreamResponse()
+        await response.prepare(request)
+        if self.stall:
+            await response.write(b'line 1\n')
+            await asyncio.sleep(10)
+        await response.write(b'line 1\nline')
+        await asyncio.sleep(0.01)
+        await response.write(b' 2\nline 3')
+        await response.write_eof()
+        return response
+
+    async def watch(self, request):
+        self.record(request)
+        name = request.match_info['name']
+        response = web.StreamResponse()
+        await response.prepare(request)
+        if 'resourceVersion' in request.query:
+            # no changes since the last event
+            await response.write_eof()
+            return response
+
+        await response.write(b'not json\n')
+        for version, phase in enumerate(('Pending', 'Running', 'Complete'), 1):
+            obj = build_json(name, phase)
+            obj['metadata']['resourceVersion'] = str(version)
+            event = {"type": "MODIFIED", "object": obj}
+            await response.write(json.dumps(event).encode('utf-8') + b'\n')
+            await asyncio.sleep(0.01)
+        await response.write_eof()
+        return response
+
+
+def run(coro_func):
+    """
+    start fake server, run coroutine function with (openshift, fake) and return result
+    """
+    async def main():
+        fake = FakeOpenshift()
+        runner = web.AppRunner(fake.app())
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        url = 'http://127.0.0.1:%d/' % port
+        try:
+            async with AsyncOpenshift(openshift_api_url=url + 'oapi/v1/',
+                                      openshift_api_version='v1',
+                                      openshift_oauth_url=url + 'oauth/authorize',
+                                      token='secret',
+                                      retry_policy=RetryPolicy(max_retries=2,
+                                                               base_delay=0)) as openshift:
+                return await coro_func(openshift, fake)
+        finally:
+            await runner.cleanup()
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(main())
+    finally:
+        loop.close()
+
+
+class TestAsyncOpenshift(object):
+    def test_get_build(self):
+        async def check(openshift, fake):
+            response = await openshift.get_build('build-1')
+            assert response.json()['status']['phase'] == 'Running'
+            assert fake.requests == [
+                ('GET', '/oapi/v1/namespaces/default/builds/build-1/', 'Bearer secret'),
+            ]
+
+            with pytest.raises(OsbsResponseException) as exc:
+                await openshift.get_build('missing')
+            assert exc.value.status_code == 404
+
+        run(check)
+
+    def test_get_build_retries(self):
+        async def check(openshift, fake):
+            fake.failures = 1
+            response = await openshift.get_build('build-2')
+            assert response.json()['status']['phase'] == 'Complete'
+            assert len(fake.requests) == 2
+
+        run(check)
+
+    def test_list_builds(self):
+        async def check(openshift, fake):
+            response = await openshift.list_builds(build_config_id='bc',
+                                                   field_selector='status=Running')
+            assert len(response.json()['items']) == 2
+            path = fake.requests[0][1]
+            assert 'labelSelector=buildconfig%3Dbc' in path
+            assert 'fieldSelector=status%3DRunning' in path
+
+        run(check)
+
+    def test_create_and_cancel_build(self):
+        async def check(openshift, fake):
+            response = await openshift.create_build(build_json('build-3', 'New'))
+            assert response.status_code == 201
+            response = await openshift.cancel_build('build-3')
+            assert response.json()['status']['cancelled'] is True
+            assert fake.builds['build-3']['status']['cancelled'] is True
+
+        run(check)
+
+    def test_stream_logs(self):
+        async def check(openshift, fake):
+            return [line async for line in openshift.stream_logs('build-1')]
+
+        assert run(check) == [b'line 1', b'line 2', b'line 3']
+
+    def test_stream_read_timeout(self):
+        async def check(openshift, fake):
+            fake.stall = True
+            url = openshift._build_url("builds/build-1/log/")
+            return [line async for line in openshift._iter_lines(url, timeout=0.1)]
+
+        assert run(check) == [b'line 1']
+
+    def test_watch_resource(self, monkeypatch):
+        monkeypatch.setattr(aio, 'WATCH_RETRY', 1)
+
+        async def check(openshift, fake):
+            events = [event async for event in openshift.watch_resource('builds', 'build-1')]
+            return ([(changetype, obj['status']['phase']) for changetype, obj in events],
+                    [path for _, path, _ in fake.requests])
+
+        events, paths = run(check)
+        assert events == [('modified', 'Pending'),
+                          ('modified', 'Running'),
+                          ('modified', 'Complete')]
+        # resumed from the last event
+        assert paths == ['/oapi/v1/watch/namespaces/default/builds/build-1/',
+                         '/oapi/v1/watch/namespaces/default/builds/build-1/?resourceVersion=3']
+
+    def test_wait_for_build_to_finish(self):
+        async def check(openshift, fake):
+            return await openshift.wait_for_build_to_finish('build-1')
+
+        assert run(check)['status']['phase'] == 'Complete'
+
+    def test_wait_not_found(self, monkeypatch):
+        monkeypatch.setattr(aio, 'WATCH_RETRY', 1)
+
+        async def check(openshift, fake):
+            with pytest.raises(OsbsWatchBuildNotFound):
+                await openshift.wait('build-1', ['failed'])
+
+        run(check)
+
+    def test_follow_many_builds(self):
+        async def check(openshift, fake):
+            names = ['build-%d' % i for i in range(50)]
+            builds = await asyncio.gather(*[openshift.wait_for_build_to_finish(name)
+                                            for name in names])
+            return [build['metadata']['name'] for build in builds], len(fake.requests)
+
+        names, requests = run(check)
+        assert names == ['build-%d' % i for i in range(50)]
+        assert requests == 50
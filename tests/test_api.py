@@ -10,6 +10,7 @@ from types import GeneratorType
 
 from flexmock import flexmock, MethodCallError
 from textwrap import dedent
+import gzip
 import json
 from pkg_resources import parse_version
 import os
@@ -152,7 +153,7 @@ class TestOSBS(object):
     def test_create_build_with_deprecated_params(self, osbs):  # noqa
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         kwargs = {
@@ -187,7 +188,7 @@ class TestOSBS(object):
             baseimage = 'fedora23/python'
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
         response = osbs.create_prod_build(TEST_GIT_URI, TEST_GIT_REF,
                                           TEST_GIT_BRANCH, TEST_USER,
@@ -206,7 +207,7 @@ class TestOSBS(object):
                                              outer_template, customize_conf, version):
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         (flexmock(osbs)
@@ -276,7 +277,7 @@ class TestOSBS(object):
 
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         (flexmock(osbs_obj.os)
@@ -319,7 +320,7 @@ class TestOSBS(object):
                                                raises_exception):
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         kwargs = {
@@ -403,7 +404,7 @@ class TestOSBS(object):
         branch = TEST_GIT_BRANCH
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=branch)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=branch, cache=None)
             .and_return(self.mock_repo_info()))
 
         kwargs = {
@@ -462,7 +463,7 @@ class TestOSBS(object):
         """
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         invalid_version = INVALID_ARRANGEMENT_VERSION
@@ -502,7 +503,7 @@ class TestOSBS(object):
         """
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_raise(IOError))
 
         with pytest.raises(OsbsException) as ex:
@@ -541,7 +542,7 @@ class TestOSBS(object):
         branch = TEST_GIT_BRANCH
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=branch)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=branch, cache=None)
             .and_return(self.mock_repo_info()))
 
         kwargs = {
@@ -601,7 +602,7 @@ class TestOSBS(object):
         """
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         with pytest.raises(OsbsOrchestratorNotEnabled) as ex:
@@ -623,7 +624,7 @@ class TestOSBS(object):
         """
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         invalid_version = INVALID_ARRANGEMENT_VERSION
@@ -662,7 +663,7 @@ class TestOSBS(object):
             baseimage = 'fedora23/python'
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info(MockParser())))
         with pytest.raises(OsbsValidationException):
             osbs.create_prod_build(TEST_GIT_URI, TEST_GIT_REF,
@@ -682,7 +683,7 @@ class TestOSBS(object):
             baseimage = 'fedora23/python'
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info(MockParser())))
         with pytest.raises(OsbsValidationException):
             osbs.create_prod_build(TEST_GIT_URI, TEST_GIT_REF,
@@ -708,7 +709,7 @@ class TestOSBS(object):
             baseimage = 'fedora:25'
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info(MockParser())))
         create_build_args = {
             'git_uri': TEST_GIT_URI,
@@ -750,7 +751,7 @@ class TestOSBS(object):
             baseimage = 'fedora23/python'
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
         flexmock(OSBS, _create_build_config_and_build=request_as_response)
         req = osbs.create_prod_build(TEST_GIT_URI, TEST_GIT_REF,
@@ -763,7 +764,7 @@ class TestOSBS(object):
     def test_missing_component_argument_doesnt_break_build(self, osbs):  # noqa
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
         response = osbs.create_prod_build(TEST_GIT_URI, TEST_GIT_REF,
                                           TEST_GIT_BRANCH, TEST_USER)
@@ -773,7 +774,7 @@ class TestOSBS(object):
     def test_create_prod_build_set_required_version(self, osbs106):  # noqa
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
         (flexmock(BuildRequest)
             .should_receive('set_openshift_required_version')
@@ -789,6 +790,23 @@ class TestOSBS(object):
         build_response = osbs.wait_for_build_to_finish(TEST_BUILD)
         assert isinstance(build_response, BuildResponse)
 
+    # osbs is a fixture here
+    def test_wait_for_builds(self, osbs):  # noqa
+        builds = [{'metadata': {'name': name}, 'status': {'phase': 'Complete'}}
+                  for name in ('build-2', 'build-1')]
+        (flexmock(osbs.os)
+            .should_receive('wait_for_builds')
+            .with_args(['build-1', 'build-2'], states=['complete'], timeout=30)
+            .and_return(iter(builds))
+            .once())
+
+        finished = []
+        responses = list(osbs.wait_for_builds(['build-1', 'build-2'], states=['complete'],
+                                              timeout=30, callback=finished.append))
+        assert all(isinstance(response, BuildResponse) for response in responses)
+        assert [response.get_build_name() for response in responses] == ['build-2', 'build-1']
+        assert finished == responses
+
     # osbs is a fixture here
     def test_get_build_api(self, osbs):  # noqa
         response = osbs.get_build(TEST_BUILD)
@@ -1033,6 +1051,37 @@ class TestOSBS(object):
         assert isinstance(content, six.string_types)
         assert content == u"   líne 1"
 
+    @pytest.mark.parametrize('follow', [True, False])  # noqa:F811
+    def test_demux_orchestrator_build_logs(self, osbs, follow):
+        orchestrator_logs = []
+        worker_logs = six.BytesIO()
+        lines = osbs.demux_orchestrator_build_logs(TEST_ORCHESTRATOR_BUILD,
+                                                   {None: orchestrator_logs.append,
+                                                    'x86_64': worker_logs},
+                                                   follow=follow)
+        assert lines == len(ORCHESTRATOR_LOGS) + len(WORKER_LOGS)
+        assert [line.decode('utf-8') for line in orchestrator_logs] == ORCHESTRATOR_LOGS
+        assert worker_logs.getvalue().decode('utf-8').splitlines() == WORKER_LOGS
+
+    @pytest.mark.parametrize(('follow', 'compression'), [  # noqa:F811
+        (False, None),
+        (True, None),
+        (False, 'gzip'),
+    ])
+    def test_download_build_logs(self, osbs, follow, compression):
+        output = six.BytesIO()
+        written = osbs.download_build_logs(TEST_BUILD, output, follow=follow,
+                                           compression=compression)
+        data = output.getvalue()
+        if compression:
+            data = gzip.GzipFile(fileobj=six.BytesIO(data)).read()
+        assert data == u"   líne 1   \n".encode('utf-8') + (b'\n' if follow else b'')
+        assert written == len(data)
+
+    def test_download_build_logs_pending(self, osbs):  # noqa:F811
+        flexmock(osbs.os).should_receive('logs').and_return(None)
+        assert osbs.download_build_logs(TEST_BUILD, six.BytesIO()) == 0
+
     def test_orchestrator_build_logs_no_logs(self, osbs):  # noqa:F811
         flexmock(osbs).should_receive('get_build_logs').and_return(None)
         logs = osbs.get_orchestrator_build_logs(TEST_BUILD)
@@ -1043,6 +1092,22 @@ class TestOSBS(object):
     def test_pause_builds(self, osbs):  # noqa
         osbs.pause_builds()
 
+    # osbs is a fixture here
+    def test_pause_builds_waits_for_running(self, osbs):  # noqa
+        running = [BuildResponse({'metadata': {'name': name}, 'status': {'phase': 'Running'}})
+                   for name in ('build-1', 'build-2')]
+        flexmock(osbs.os).should_receive('create_resource_quota').once()
+        (flexmock(osbs)
+            .should_receive('list_builds')
+            .and_return(running)
+            .and_return([]))
+        (flexmock(osbs)
+            .should_receive('wait_for_builds')
+            .with_args(['build-1', 'build-2'])
+            .and_return(iter(running))
+            .once())
+        osbs.pause_builds()
+
     # osbs is a fixture here
     def test_resume_builds(self, osbs):  # noqa
         osbs.resume_builds()
@@ -1051,6 +1116,57 @@ class TestOSBS(object):
     def test_backup(self, osbs):  # noqa
         osbs.dump_resource("builds")
 
+    # osbs is a fixture here
+    @pytest.mark.parametrize('pages', [
+        [{'kind': 'BuildList', 'metadata': {'resourceVersion': '1', 'continue': 'x'},
+          'items': [{'n': 1}, {'n': 2}]},
+         {'kind': 'BuildList', 'metadata': {'resourceVersion': '1'}, 'items': [{'n': 3}]}],
+        [{'kind': 'BuildList', 'metadata': {'continue': 'x'}, 'items': []},
+         {'kind': 'BuildList', 'metadata': {}, 'items': [{'n': 1}]}],
+        [{'items': []}],
+    ])
+    def test_dump_resource_to_file(self, osbs, pages):  # noqa
+        (flexmock(osbs.os)
+            .should_receive('iter_resource_pages')
+            .with_args('builds', page_size=2)
+            .and_return(iter(pages))
+            .once())
+        fileobj = six.BytesIO()
+        count = osbs.dump_resource_to_file('builds', fileobj, page_size=2)
+
+        expected = dict(pages[0])
+        expected['items'] = [item for page in pages for item in page['items']]
+        if 'metadata' in expected:
+            expected['metadata'] = dict(expected['metadata'])
+            expected['metadata'].pop('continue', None)
+        assert json.loads(fileobj.getvalue().decode('ascii')) == expected
+        assert count == len(expected['items'])
+
+    # osbs is a fixture here
+    def test_dump_resource_to_file_no_pages(self, osbs):  # noqa
+        (flexmock(osbs.os)
+            .should_receive('iter_resource_pages')
+            .and_return(iter([]))
+            .once())
+        fileobj = six.BytesIO()
+        assert osbs.dump_resource_to_file('builds', fileobj) == 0
+        assert json.loads(fileobj.getvalue().decode('ascii')) == {'items': []}
+
+    # osbs is a fixture here
+    def test_list_builds_paginated(self, osbs):  # noqa
+        builds = [{'metadata': {'name': 'build-%d' % n}} for n in range(3)]
+        (flexmock(osbs.os)
+            .should_receive('iter_builds')
+            .with_args(field_selector='status=Running', koji_task_id=None, labels=None,
+                       page_size=2)
+            .replace_with(lambda **kwargs: iter(builds))
+            .twice())
+        flexmock(osbs.os).should_receive('list_builds').never()
+
+        for result in (osbs.list_builds(field_selector='status=Running', page_size=2),
+                       osbs.iter_builds(field_selector='status=Running', page_size=2)):
+            assert [b.get_build_name() for b in result] == ['build-0', 'build-1', 'build-2']
+
     # osbs is a fixture here
     def test_restore(self, osbs):  # noqa
         build = {
@@ -1164,7 +1280,7 @@ class TestOSBS(object):
 
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         flexmock(OSBS, _create_build_config_and_build=request_as_response)
@@ -1232,7 +1348,7 @@ class TestOSBS(object):
 
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         flexmock(OSBS, _create_build_config_and_build=request_as_response)
@@ -1309,6 +1425,128 @@ class TestOSBS(object):
         assert actual_build_config == existing_build_config
         assert actual_build_config['_from'] == 'from-name'
 
+    def test_get_existing_build_config_concurrent(self):
+        build_config = {
+            'metadata': {
+                'name': 'name',
+                'labels': {
+                    'git-repo-name': 'reponame',
+                    'git-branch': 'branch',
+                    'git-full-repo': 'full-name',
+                }
+            },
+        }
+        config = Configuration(conf_name=None)
+        osbs_obj = OSBS(config, config)
+
+        # all queries are sent, the first one in order of priority wins
+        (flexmock(osbs_obj.os)
+            .should_receive('get_build_config_by_labels')
+            .once()
+            .and_raise(OsbsException))
+        (flexmock(osbs_obj.os)
+            .should_receive('get_build_config_by_labels_filtered')
+            .once()
+            .and_return({'_from': 'from-old-labels'}))
+        (flexmock(osbs_obj.os)
+            .should_receive('get_build_config')
+            .with_args('name')
+            .once()
+            .and_return({'_from': 'from-name'}))
+
+        actual_build_config = osbs_obj._get_existing_build_config(build_config,
+                                                                  concurrent=True)
+        assert actual_build_config == {'_from': 'from-old-labels'}
+
+    def test_create_builds(self, osbs):
+        build_requests = [
+            {'git_uri': 'uri-1', 'platforms': ['x86_64']},
+            {'git_uri': 'uri-2', 'platform': 'x86_64', 'build_type': BUILD_TYPE_WORKER},
+            {'git_uri': 'uri-3', 'platforms': ['x86_64']},
+        ]
+        (flexmock(osbs)
+            .should_receive('create_orchestrator_build')
+            .with_args(git_uri='uri-1', platforms=['x86_64'])
+            .once()
+            .and_return('build-1'))
+        (flexmock(osbs)
+            .should_receive('create_worker_build')
+            .with_args(git_uri='uri-2', platform='x86_64')
+            .once()
+            .and_return('build-2'))
+        (flexmock(osbs)
+            .should_receive('create_orchestrator_build')
+            .with_args(git_uri='uri-3', platforms=['x86_64'])
+            .once()
+            .and_raise(OsbsException('failed')))
+
+        results = sorted(osbs.create_builds(build_requests, max_workers=2, qps=100))
+        expected = [(0, 'build-1'), (1, 'build-2'), (2, None)]
+        assert [(r.index, r.response) for r in results] == expected
+        assert [r.request for r in results] == build_requests
+        assert results[0].error is None
+        assert isinstance(results[2].error, OsbsException)
+
+    def test_create_builds_invalid_workers(self, osbs):
+        with pytest.raises(OsbsValidationException):
+            osbs.create_builds([{}], max_workers=0)
+
+    def test_cancel_builds_by_name(self, osbs):
+        (flexmock(osbs)
+            .should_receive('cancel_build')
+            .with_args('build-1')
+            .once()
+            .and_return('cancelled-1'))
+        (flexmock(osbs)
+            .should_receive('cancel_build')
+            .with_args('build-2')
+            .once()
+            .and_raise(OsbsResponseException('not found', 404)))
+
+        results = sorted(osbs.cancel_builds(['build-1', 'build-2'], max_workers=2))
+        assert [(r.request, r.response) for r in results] == [('build-1', 'cancelled-1'),
+                                                              ('build-2', None)]
+        assert results[0].error is None
+        assert results[1].error.status_code == 404
+
+    def test_cancel_builds_by_selector(self, osbs):
+        builds = [BuildResponse({'metadata': {'name': name}}) for name in ('build-1', 'build-2')]
+        (flexmock(osbs)
+            .should_receive('iter_builds')
+            .with_args(koji_task_id='123', labels={'scratch': 'true'}, running=True)
+            .once()
+            .and_return(iter(builds)))
+        flexmock(osbs).should_receive('cancel_build').twice().replace_with(lambda name: name)
+
+        results = osbs.cancel_builds(selector={'scratch': 'true'}, koji_task_id='123')
+        assert sorted(r.response for r in results) == ['build-1', 'build-2']
+
+    @pytest.mark.parametrize('kwargs', [
+        {},
+        {'build_ids': ['build-1'], 'koji_task_id': '123'},
+        {'build_ids': ['build-1'], 'selector': {'scratch': 'true'}},
+    ])
+    def test_cancel_builds_invalid(self, osbs, kwargs):
+        with pytest.raises(OsbsValidationException):
+            osbs.cancel_builds(**kwargs)
+
+    @pytest.mark.parametrize(('method', 'single_method'), [
+        ('update_labels_on_builds', 'update_labels_on_build'),
+        ('update_annotations_on_builds', 'update_annotations_on_build'),
+    ])
+    def test_update_metadata_on_builds(self, osbs, method, single_method):
+        values = {'key': 'value'}
+        for name in ('build-1', 'build-2'):
+            (flexmock(osbs)
+                .should_receive(single_method)
+                .with_args(name, values)
+                .once()
+                .and_return(name))
+
+        results = getattr(osbs, method)(values, build_ids=['build-1', 'build-2'], qps=100)
+        assert sorted((r.request, r.response, r.error) for r in results) == [
+            ('build-1', 'build-1', None), ('build-2', 'build-2', None)]
+
     def test_get_existing_build_config_missing(self):
         build_config = {
             'metadata': {
@@ -1773,7 +2011,7 @@ class TestOSBS(object):
 
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info(mock_config=MockConfiguration())))
 
         kwargs = {
@@ -1945,7 +2183,7 @@ class TestOSBS(object):
 
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         (flexmock(osbs_obj)
@@ -1964,6 +2202,33 @@ class TestOSBS(object):
         build_response = osbs_obj.create_build(**kwargs)
         assert build_response.json() == {'spam': 'maps'}
 
+    def test_create_build_repo_info_cache(self, tmpdir):
+        osbs_objs = []
+        for name in ('one', 'two'):
+            config = Configuration(conf_file=None, build_from='image:buildroot:latest',
+                                   repo_info_cache_dir=str(tmpdir.join(name)))
+            osbs_objs.append(OSBS(config, config))
+        osbs_obj, other = osbs_objs
+        assert osbs_obj._repo_info_cache is not other._repo_info_cache
+
+        (flexmock(utils)
+            .should_receive('get_repo_info')
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH,
+                       cache=osbs_obj._repo_info_cache)
+            .once()
+            .and_return(self.mock_repo_info()))
+
+        (flexmock(osbs_obj)
+            .should_receive('_create_scratch_build')
+            .once()
+            .and_return(flexmock(json=lambda: {'spam': 'maps'})))
+
+        osbs_obj.create_build(git_uri=TEST_GIT_URI, git_ref=TEST_GIT_REF,
+                              git_branch=TEST_GIT_BRANCH, user=TEST_USER,
+                              component=TEST_COMPONENT, target=TEST_TARGET,
+                              architecture=TEST_ARCH, yum_repourls=None,
+                              koji_task_id=None, scratch=True)
+
     @pytest.mark.parametrize(('variation', 'delegate_method'), (  # noqa:F811
         ('isolated', '_create_isolated_build'),
         ('scratch', '_create_scratch_build'),
@@ -1997,7 +2262,7 @@ class TestOSBS(object):
 
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         if use_build:
@@ -2150,7 +2415,7 @@ class TestOSBS(object):
 
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info()))
 
         flexmock(OSBS, _create_build_config_and_build=request_as_response)
@@ -2325,7 +2590,7 @@ class TestOSBS(object):
 
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info(mock_config=MockConfiguration())))
 
         args = MockArgs(isolated)
@@ -2359,7 +2624,7 @@ class TestOSBS(object):
     def test_do_create_prod_build_branch_required(self, osbs, branch_name):
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=branch_name)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=branch_name, cache=None)
             .and_return(self.mock_repo_info()))
 
         inner_template = DEFAULT_INNER_TEMPLATE
@@ -2434,7 +2699,7 @@ class TestOSBS(object):
         (flexmock(osbs.os._con)
             .should_call('get')
             .with_args("/oapi/v1/namespaces/default/builds/", headers={},
-                       verify_ssl=True, retries_enabled=False))
+                       verify_ssl=True, retries_enabled=False, operation='list_builds'))
         with osbs.retries_disabled():
             response_list = osbs.list_builds()
             assert response_list is not None
@@ -2442,7 +2707,7 @@ class TestOSBS(object):
         (flexmock(osbs.os._con)
             .should_call('get')
             .with_args("/api/v1/namespaces/default/configmaps/test", headers={},
-                       verify_ssl=True, retries_enabled=True))
+                       verify_ssl=True, retries_enabled=True, operation='get_config_map'))
         # Verify that retries are re-enabled after contextmanager exits
         with pytest.raises(OsbsException):
             osbs.get_config_map('test')
@@ -2743,7 +3008,7 @@ class TestOSBS(object):
 
         (flexmock(utils)
             .should_receive('get_repo_info')
-            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH)
+            .with_args(TEST_GIT_URI, TEST_GIT_REF, git_branch=TEST_GIT_BRANCH, cache=None)
             .and_return(self.mock_repo_info(mock_df_parser=mocked_df_parser)))
 
         flexmock(OSBS, _create_build_config_and_build=request_as_response)
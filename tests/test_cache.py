@@ -0,0 +1,244 @@
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+"""
+from __future__ import absolute_import, unicode_literals
+
+from flexmock import flexmock
+import pytest
+
+from osbs.cache import BuildCache, parse_field_selector
+from osbs.exceptions import OsbsException, OsbsResponseException
+from osbs.http import HttpResponse
+from tests.fake_api import openshift, osbs, OAPI_PREFIX, StreamingResponse  # noqa
+
+import json
+import threading
+
+
+def make_build(name, phase='Running', build_config='bc', koji_task_id=None,
+               resource_version='1', **labels):
+    labels['buildconfig'] = build_config
+    if koji_task_id is not None:
+        labels['koji-task-id'] = koji_task_id
+    return {
+        'metadata': {
+            'name': name,
+            'labels': labels,
+            'resourceVersion': resource_version,
+        },
+        'status': {'phase': phase},
+    }
+
+
+def list_response(builds, resource_version='10'):
+    content = json.dumps({
+        'metadata': {'resourceVersion': resource_version},
+        'items': builds,
+    }).encode('utf-8')
+    return HttpResponse(200, {}, content)
+
+
+@pytest.fixture
+def cache():
+    fake_os = flexmock(list_builds=lambda: list_response([
+        make_build('bc-1', 'Complete', koji_task_id='123'),
+        make_build('bc-2', 'Running', koji_task_id='456', is_autorebuild='false'),
+        make_build('other-1', 'Pending', build_config='other'),
+    ]))
+    build_cache = BuildCache(fake_os)
+    build_cache.relist()
+    return build_cache
+
+
+def names(builds):
+    return [build['metadata']['name'] for build in builds]
+
+
+@pytest.mark.parametrize(('field_selector', 'expected'), [
+    (None, []),
+    ('status=Running', [(('status', 'phase'), True, 'Running')]),
+    ('status!=Failed,metadata.name==x', [(('status', 'phase'), False, 'Failed'),
+                                         (('metadata', 'name'), True, 'x')]),
+    ('spec.output=x', None),
+    ('status', None),
+])
+def test_parse_field_selector(field_selector, expected):
+    assert parse_field_selector(field_selector) == expected
+
+
+class TestBuildCache(object):
+    def test_relist(self, cache):
+        assert cache.synced
+        assert cache.resource_version == '10'
+        assert cache.get('bc-1')['status']['phase'] == 'Complete'
+        assert cache.get('missing') is None
+
+    @pytest.mark.parametrize(('kwargs', 'expected'), [
+        ({}, ['bc-1', 'bc-2', 'other-1']),
+        ({'build_config_id': 'bc'}, ['bc-1', 'bc-2']),
+        ({'koji_task_id': 456}, ['bc-2']),
+        ({'phases': ['running', 'pending']}, ['bc-2', 'other-1']),
+        ({'build_config_id': 'bc', 'phases': ['pending']}, []),
+        ({'labels': {'is_autorebuild': 'false'}}, ['bc-2']),
+        ({'field_selector': 'status!=Complete,status!=Failed'}, ['bc-2', 'other-1']),
+        ({'field_selector': 'metadata.name=bc-1'}, ['bc-1']),
+    ])
+    def test_list(self, cache, kwargs, expected):
+        assert names(cache.list(**kwargs)) == expected
+
+    def test_list_unsupported_selector(self, cache):
+        assert cache.list(field_selector='spec.source=x') is None
+
+    def test_results_are_copies(self, cache):
+        cache.get('bc-1')['status']['phase'] = 'Failed'
+        cache.list()[0]['status']['phase'] = 'Failed'
+        assert cache.get('bc-1')['status']['phase'] == 'Complete'
+
+    def test_apply_event(self, cache):
+        cache.apply_event('modified', make_build('bc-2', 'Complete', resource_version='11'))
+        cache.apply_event('added', make_build('bc-3', 'New', resource_version='12'))
+        cache.apply_event('deleted', make_build('bc-1', 'Complete', resource_version='13'))
+        # replayed, older event is ignored
+        cache.apply_event('modified', make_build('bc-2', 'Running', resource_version='5'))
+
+        assert cache.resource_version == '13'
+        assert names(cache.list(build_config_id='bc')) == ['bc-2', 'bc-3']
+        assert names(cache.list(phases=['complete'])) == ['bc-2']
+        assert names(cache.list(phases=['running'])) == []
+        assert cache.list(koji_task_id='123') == []
+
+    def test_watch_resumes_from_resource_version(self, cache):
+        (flexmock(cache.os)
+            .should_receive('watch_resource')
+            .with_args('builds', on_relist=object, resourceVersion='10')
+            .and_return(iter([
+                ('modified', make_build('bc-2', 'Complete', resource_version='11')),
+            ]))
+            .once())
+        cache.watch()
+        assert cache.resource_version == '11'
+        assert cache.get('bc-2')['status']['phase'] == 'Complete'
+
+    def test_watch_expired(self, openshift):  # noqa:F811
+        (flexmock(openshift)
+            .should_receive('list_builds')
+            .and_return(list_response([make_build('bc-1'), make_build('bc-2')])))
+        cache = BuildCache(openshift)
+        cache.relist()
+
+        watch_url = OAPI_PREFIX + "watch/namespaces/default/builds/"
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(watch_url + "?resourceVersion=10", stream=True, long_lived=True,
+                       headers=object, operation='watch_resource')
+            .and_return(StreamingResponse(content=json.dumps({
+                'type': 'ERROR', 'object': {'kind': 'Status', 'code': 410}}).encode('utf-8')))
+            .once()
+            .ordered())
+        # bc-1 was deleted while the watch was down
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(OAPI_PREFIX + "namespaces/default/builds/", operation='watch_resource')
+            .and_return(list_response([make_build('bc-2', 'Complete', resource_version='15')],
+                                      resource_version='20'))
+            .once()
+            .ordered())
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(watch_url + "?resourceVersion=20", stream=True, long_lived=True,
+                       headers=object, operation='watch_resource')
+            .and_raise(OsbsResponseException('forbidden', 403))
+            .once()
+            .ordered())
+
+        with pytest.raises(OsbsResponseException):
+            cache.watch()
+        assert cache.resource_version == '20'
+        assert cache.get('bc-1') is None
+        assert names(cache.list()) == ['bc-2']
+        assert names(cache.list(phases=['complete'])) == ['bc-2']
+
+    def test_restart_after_stop(self, cache):
+        watching = threading.Event()
+        release = [threading.Event(), threading.Event()]
+        calls = []
+
+        def watch_resource(*args, **kwargs):
+            run = len(calls)
+            calls.append(run)
+            watching.set()
+            release[run].wait(10)
+            yield ('modified', make_build('bc-2', 'Run %d' % run, resource_version='2%d' % run))
+            release[run].wait(10)
+
+        flexmock(cache.os).should_receive('watch_resource').replace_with(watch_resource)
+
+        assert cache.start(timeout=10)
+        assert watching.wait(10)
+        first = cache._thread
+        # the first watch thread is still waiting for an event
+        assert not cache.stop(timeout=0.1)
+
+        watching.clear()
+        assert cache.start(timeout=10)
+        assert watching.wait(10)
+
+        # event received by the stopped thread is not applied
+        release[0].set()
+        first.join(10)
+        assert not first.is_alive()
+        assert cache.get('bc-2')['status']['phase'] == 'Running'
+
+        second = cache._thread
+        cache.stop(timeout=0.1)
+        release[1].set()
+        second.join(10)
+        assert calls == [0, 1]
+
+    def test_watch_error(self, cache):
+        (flexmock(cache.os)
+            .should_receive('watch_resource')
+            .and_return(iter([('error', {'kind': 'Status', 'code': 500})])))
+        with pytest.raises(OsbsException):
+            cache.watch()
+
+
+class TestOSBSBuildCache(object):
+    def test_queries_use_cache(self, osbs):  # noqa
+        (flexmock(osbs.os)
+            .should_receive('list_builds')
+            .with_args()
+            .and_return(list_response([
+                make_build('bc-1', 'Complete', koji_task_id='123', is_autorebuild='false'),
+                make_build('bc-2', 'Running', koji_task_id='123', is_autorebuild='false'),
+            ]))
+            .once())
+        watching = threading.Event()
+        stopped = threading.Event()
+
+        def watch_resource(*args, **kwargs):
+            watching.set()
+            stopped.wait()
+            return iter([])
+
+        flexmock(osbs.os).should_receive('watch_resource').replace_with(watch_resource)
+        flexmock(osbs.os).should_receive('get_build').never()
+
+        cache = osbs.enable_build_cache(timeout=10)
+        assert cache.synced
+
+        assert [b.get_build_name() for b in osbs.list_builds(running=True)] == ['bc-2']
+        assert osbs.get_build('bc-1').status == 'complete'
+        assert [b.get_build_name() for b in
+                osbs._get_running_builds_for_build_config('bc')] == ['bc-2']
+        assert [b.get_build_name() for b in
+                osbs._get_not_cancelled_builds_for_koji_task('123')] == ['bc-1', 'bc-2']
+
+        assert watching.wait(10)
+        stopped.set()
+        osbs.disable_build_cache()
+        assert not cache.synced
@@ -5,12 +5,20 @@ All rights reserved.
 This software may be modified and distributed under the terms
 of the BSD license. See the LICENSE file for details.
 """
+import argparse
+import json
 import pytest
 import sys
 
+from flexmock import flexmock
 from textwrap import dedent
+from osbs.api import BuildResult
 from osbs.cli.main import (str_on_2_unicode_on_3, make_worker_builds_str,
-                           make_digests_str)
+                           make_digests_str, cmd_backup, cmd_cancel_build, parse_selector,
+                           cmd_build_logs)
+from osbs.constants import BACKUP_RESOURCES
+from osbs.exceptions import OsbsException
+from osbs.utils import TarReader
 
 
 class TestStrOn2UnicodeOn3(object):
@@ -113,3 +121,83 @@ class TestGetBuild(object):
     ))
     def test_make_digests_str(self, digests, expected_str):
         assert make_digests_str(digests) == expected_str
+
+
+def test_cmd_backup(tmpdir):
+    def dump_resource_to_file(resource_type, fileobj, page_size):
+        fileobj.write(json.dumps({'kind': resource_type, 'items': []}).encode('ascii'))
+
+    osbs = flexmock(pause_builds=lambda quota_name: None,
+                    resume_builds=lambda quota_name: None,
+                    dump_resource_to_file=dump_resource_to_file)
+    filename = str(tmpdir.join('backup.tar.bz2'))
+    args = argparse.Namespace(instance='default', filename=filename, page_size=10,
+                              ignore_quota_errors=False, continue_on_error=False)
+    cmd_backup(args, osbs)
+
+    dumped = {}
+    for f in TarReader(filename):
+        dumped[f.filename.split('/')[-1]] = json.loads(f.fileobj.read().decode('ascii'))
+    assert sorted(dumped) == sorted(r + '.json' for r in BACKUP_RESOURCES)
+    assert dumped['buildconfigs.json'] == {'kind': 'buildconfigs', 'items': []}
+
+
+@pytest.mark.parametrize(('selector', 'expected'), [
+    (None, {}),
+    (['koji-task-id=123', 'scratch=true'], {'koji-task-id': '123', 'scratch': 'true'}),
+    (['key='], {'key': ''}),
+])
+def test_parse_selector(selector, expected):
+    assert parse_selector(selector) == expected
+
+
+@pytest.mark.parametrize('selector', [['no-value'], ['=value']])
+def test_parse_selector_invalid(selector):
+    with pytest.raises(OsbsException):
+        parse_selector(selector)
+
+
+@pytest.mark.parametrize('failed', [False, True])
+def test_cmd_cancel_builds(capsys, failed):
+    results = [BuildResult(0, 'build-1', 'response', None),
+               BuildResult(1, 'build-2', None, OsbsException('failed') if failed else None)]
+    osbs = flexmock()
+    (osbs
+        .should_receive('cancel_builds')
+        .with_args(build_ids=None, selector={'scratch': 'true'}, koji_task_id=None)
+        .once()
+        .and_return(iter(results)))
+    args = argparse.Namespace(BUILD_ID=[], selector=['scratch=true'], koji_task_id=None)
+
+    if failed:
+        with pytest.raises(OsbsException):
+            cmd_cancel_build(args, osbs)
+    else:
+        cmd_cancel_build(args, osbs)
+    out = capsys.readouterr()[0]
+    assert 'cancelled build-1' in out
+    assert ('cancelled build-2' in out) is not failed
+
+
+@pytest.mark.parametrize('compress', [None, 'gzip'])
+def test_cmd_build_logs_output(tmpdir, compress):
+    output = str(tmpdir.join('build.log'))
+    osbs = flexmock()
+    (osbs
+        .should_receive('download_build_logs')
+        .with_args('build-1', object, follow=False, wait_if_missing=False,
+                   compression=compress)
+        .once()
+        .replace_with(lambda build_id, fp, **kwargs: fp.write(b'logs')))
+    osbs.should_receive('get_build_logs').never()
+    args = argparse.Namespace(BUILD_ID=['build-1'], follow=False, wait_if_missing=False,
+                              output_file=output, compress=compress)
+    cmd_build_logs(args, osbs)
+    assert tmpdir.join('build.log').read_binary() == b'logs'
+
+
+def test_cmd_build_logs_compress_without_output():
+    args = argparse.Namespace(BUILD_ID=['build-1'], follow=False, wait_if_missing=False,
+                              output_file=None, compress='gzip')
+    with pytest.raises(OsbsException):
+        cmd_build_logs(args, flexmock())
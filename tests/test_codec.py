@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+"""
+from __future__ import unicode_literals
+
+import json
+
+import pytest
+
+from osbs import codec
+from osbs.exceptions import OsbsValidationException
+
+OBJ = {'metadata': {'name': 'bůild', 'labels': {'b': '1', 'a': '2'}},
+       'spec': {'items': [1, 2.5, None, True], 'url': 'http://example.com/'}}
+
+
+@pytest.fixture(params=codec.BACKENDS)
+def backend(request):
+    default = codec.BACKEND
+    try:
+        codec.use_backend(request.param)
+    except OsbsValidationException:
+        pytest.skip("%s is not installed" % request.param)
+    yield request.param
+    codec.use_backend(default)
+
+
+@pytest.mark.parametrize('data', [
+    json.dumps(OBJ),
+    json.dumps(OBJ).encode('utf-8'),
+    json.dumps(OBJ, ensure_ascii=False).encode('utf-8'),
+])
+def test_loads(backend, data):
+    assert codec.loads(data) == OBJ
+
+
+def test_loads_invalid(backend):
+    with pytest.raises(ValueError):
+        codec.loads(b'{"metadata": ')
+
+
+def test_dumpb(backend):
+    data = codec.dumpb(OBJ)
+    assert isinstance(data, bytes)
+    assert json.loads(data.decode('utf-8')) == OBJ
+
+    data = codec.dumpb(OBJ, sort_keys=True).decode('utf-8')
+    assert data.index('"a"') < data.index('"b"')
+
+
+def test_dumpb_fallback(backend):
+    assert json.loads(codec.dumpb({1: 2**70}).decode('utf-8')) == {'1': 2**70}
+
+
+def test_dumps(backend):
+    assert codec.dumps(OBJ) == json.dumps(OBJ)
+    assert codec.dumps(OBJ, sort_keys=True) == json.dumps(OBJ, sort_keys=True)
+
+
+def test_use_backend_invalid():
+    with pytest.raises(OsbsValidationException):
+        codec.use_backend('yaml')
+
+
+LIST = {'kind': 'BuildList', 'apiVersion': 'v1',
+        'metadata': {'resourceVersion': '42', 'continue': 'to]ken"{'},
+        'items': [OBJ, {'n': -2.5e3}, 'a"]b', [], 0, None, True, {'items': [1]}]}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 1000])
+@pytest.mark.parametrize('dump', [
+    lambda obj: json.dumps(obj).encode('utf-8'),
+    lambda obj: json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8'),
+    lambda obj: json.dumps(obj, separators=(',', ':')).encode('utf-8'),
+])
+def test_iter_json_items(chunk_size, dump):
+    data = dump(LIST)
+    chunks = [data[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+    envelope = {}
+    assert list(codec.iter_json_items(chunks, envelope=envelope)) == LIST['items']
+    assert envelope == dict(LIST, items=[])
+
+
+def test_json_items_parser_incremental():
+    parser = codec.JsonItemsParser()
+    assert parser.feed(b'{"metadata": {"items": [1]}, "items": [{"n": 1}, {"n"') == [{'n': 1}]
+    assert parser.feed(b': 2}, 1') == [{'n': 2}]
+    assert parser.feed(b'2]}') == [12]
+    assert parser.close() == {'metadata': {'items': [1]}, 'items': []}
+    assert parser.items == 3
+
+
+def test_json_items_parser_other_key():
+    data = b'{"items": {"n": 1}, "objects": [1, 2]}'
+    assert list(codec.iter_json_items([data], key='objects')) == [1, 2]
+
+
+@pytest.mark.parametrize('data', [
+    b'{"items": [{"n": 1}',
+    b'{"items": [{"n": 1}, {"n"',
+    b'{"items": [], "metadata": {',
+    b'{"items": [{"n": 1}]} x',
+])
+def test_iter_json_items_invalid(data):
+    with pytest.raises(ValueError):
+        list(codec.iter_json_items([data]))
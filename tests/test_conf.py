@@ -13,7 +13,8 @@ from copy import deepcopy
 from osbs.conf import Configuration
 from osbs import utils
 from osbs.exceptions import OsbsValidationException
-from osbs.constants import DEFAULT_ARRANGEMENT_VERSION
+from osbs.constants import (DEFAULT_ARRANGEMENT_VERSION, HTTP_POOL_MAXSIZE, REPO_INFO_CACHE_SIZE,
+                            API_QPS, API_BURST, API_STREAM_QPS, API_STREAM_BURST)
 import pytest
 from tempfile import NamedTemporaryFile
 import logging
@@ -299,6 +300,59 @@ class TestConfiguration(object):
         else:
             assert conf.get_arrangement_version() == expected
 
+    @pytest.mark.parametrize(('config', 'expected'), [
+        ({'default': {}}, HTTP_POOL_MAXSIZE),
+        ({'default': {'http_pool_maxsize': 50}}, 50),
+        ({'default': {'http_pool_maxsize': 'many'}}, OsbsValidationException),
+    ])
+    def test_http_pool_maxsize(self, config, expected):
+        with self.config_file(config) as config_file:
+            conf = Configuration(conf_file=config_file)
+
+        if isinstance(expected, type):
+            with pytest.raises(expected):
+                conf.get_http_pool_maxsize()
+        else:
+            assert conf.get_http_pool_maxsize() == expected
+
+    @pytest.mark.parametrize(('config', 'expected'), [
+        ({'default': {}}, (API_QPS, API_BURST, API_STREAM_QPS, API_STREAM_BURST)),
+        ({'default': {'api_qps': 2.5, 'api_burst': 20,
+                      'api_stream_qps': 1, 'api_stream_burst': 3}}, (2.5, 20, 1, 3)),
+        ({'default': {'api_qps': 'fast'}}, OsbsValidationException),
+        ({'default': {'api_stream_burst': -1}}, OsbsValidationException),
+    ])
+    def test_api_rate_limits(self, config, expected):
+        with self.config_file(config) as config_file:
+            conf = Configuration(conf_file=config_file)
+
+        def get_limits():
+            return (conf.get_api_qps(), conf.get_api_burst(),
+                    conf.get_api_stream_qps(), conf.get_api_stream_burst())
+
+        if isinstance(expected, type):
+            with pytest.raises(expected):
+                get_limits()
+        else:
+            assert get_limits() == expected
+
+    @pytest.mark.parametrize(('config', 'expected_dir', 'expected_size'), [
+        ({'default': {}}, None, REPO_INFO_CACHE_SIZE),
+        ({'default': {'repo_info_cache_dir': '/var/cache/osbs',
+                      'repo_info_cache_size': 1024}}, '/var/cache/osbs', 1024),
+        ({'default': {'repo_info_cache_size': 'big'}}, None, OsbsValidationException),
+    ])
+    def test_repo_info_cache(self, config, expected_dir, expected_size):
+        with self.config_file(config) as config_file:
+            conf = Configuration(conf_file=config_file)
+
+        assert conf.get_repo_info_cache_dir() == expected_dir
+        if isinstance(expected_size, type):
+            with pytest.raises(expected_size):
+                conf.get_repo_info_cache_size()
+        else:
+            assert conf.get_repo_info_cache_size() == expected_size
+
     @pytest.mark.parametrize(('config', 'expected'), [
         ({'default': {'smtp_additional_addresses': 'user@example.com'}},
          ['user@example.com']),
@@ -21,19 +21,23 @@ from osbs.constants import (BUILD_FINISHED_STATES, BUILD_CANCELLED_STATE,
                             OS_CONFLICT_MAX_RETRIES,
                             ANNOTATION_SOURCE_REPO, ANNOTATION_INSECURE_REPO)
 from osbs.exceptions import (OsbsResponseException, OsbsException,
-                             OsbsNetworkException, OsbsWatchBuildNotFound,
+                             OsbsNetworkException, OsbsWatchBuildNotFound, OsbsWatchTimeout,
                              ImportImageFailed)
-from osbs.core import check_response, Openshift
+from osbs.core import (check_response, Openshift, WatchEventDecoder, WATCH_RETRY,
+                       WATCH_RETRY_SECS)
+from osbs.utils import RetryPolicy
 
 from tests.constants import (TEST_BUILD, TEST_CANCELLED_BUILD, TEST_LABEL,
                              TEST_LABEL_VALUE, TEST_IMAGESTREAM, TEST_IMAGESTREAM_NO_TAGS,
                              TEST_IMAGESTREAM_WITH_ANNOTATION)
-from tests.fake_api import openshift, OAPI_PREFIX, API_VER  # noqa
+from tests.fake_api import (openshift, OAPI_PREFIX, API_PREFIX, API_VER,  # noqa
+                            StreamingResponse)
 from tests.test_utils import JsonMatcher
 from requests.exceptions import ConnectionError
 import pytest
 
 from six.moves import http_client
+from six.moves.urllib.parse import urlparse, parse_qs
 
 
 class Response(object):
@@ -48,6 +52,21 @@ class Response(object):
             yield line
 
 
+class UrlMatcher(object):
+    """Match URL regardless of order of query parameters"""
+
+    def __init__(self, expected):
+        self.expected = urlparse(expected)
+
+    def __eq__(self, url):
+        parsed = urlparse(url)
+        return (parsed.path == self.expected.path and
+                parse_qs(parsed.query) == parse_qs(self.expected.query))
+
+    def __repr__(self):
+        return 'UrlMatcher(%s)' % self.expected.geturl()
+
+
 def make_json_response(obj):
     return HttpResponse(200,
                         headers={"Content-Type": "application/json"},
@@ -152,11 +171,97 @@ class TestOpenshift(object):
         logs = openshift.stream_logs(TEST_BUILD)
         assert len([log for log in logs]) == 1
 
+    def test_stream_logs_resume(self, openshift):  # noqa:F811
+        now = [0]
+
+        def first_lines():
+            for line in (b'2018-01-01T10:00:00.5Z line 1',
+                         b'2018-01-01T10:00:01Z line 2',
+                         b'2018-01-01T10:00:01Z line 3'):
+                yield line
+            # connection is closed after being idle
+            now[0] = 100
+
+        first = flexmock(status_code=http_client.OK)
+        first.should_receive('iter_lines').replace_with(first_lines)
+        # server resends lines from the second of sinceTime
+        second = flexmock(status_code=http_client.OK)
+        second.should_receive('iter_lines').and_return([
+            b'2018-01-01T10:00:00.999Z line 1',
+            b'2018-01-01T10:00:01Z line 2',
+            b'2018-01-01T10:00:01Z line 3',
+            b'2018-01-01T10:00:01Z line 4',
+            b'2018-01-01T10:00:01.1Z line 5',
+            b'not timestamped',
+        ])
+        urls = []
+
+        def get(url, **kwargs):
+            urls.append(url)
+            return first if len(urls) == 1 else second
+
+        flexmock(openshift).should_receive('_get').replace_with(get)
+        flexmock(time).should_receive('time').replace_with(lambda: now[0])
+
+        stats = {}
+        logs = list(openshift.stream_logs(TEST_BUILD, stats=stats))
+        assert logs == [b'line 1', b'line 2', b'line 3', b'line 4', b'line 5',
+                        b'not timestamped']
+        assert [parse_qs(urlparse(url).query) for url in urls] == [
+            {'follow': ['1'], 'timestamps': ['true']},
+            {'follow': ['1'], 'timestamps': ['true'], 'sinceTime': ['2018-01-01T10:00:01Z']},
+        ]
+        assert stats == {'lines': 6, 'bytes': 45, 'reconnects': 1, 'duplicates': 3}
+
     def test_list_builds(self, openshift):  # noqa
         list_builds = openshift.list_builds()
         assert list_builds is not None
         assert bool(list_builds.json())  # is there at least something
 
+    def test_rate_limits(self):
+        os_inst = Openshift(OAPI_PREFIX, API_VER, "/oauth/authorize",
+                            api_qps=5, api_burst=10, api_stream_qps=1, api_stream_burst=2)
+        (flexmock(os_inst._con)
+            .should_receive('get')
+            .and_return(None))
+        flexmock(os_inst._rate_limiter).should_receive('acquire').times(3).and_return(0)
+        flexmock(os_inst._stream_rate_limiter).should_receive('acquire').once().and_return(0)
+
+        os_inst._get('http://example.com/builds/')
+        os_inst._get('http://example.com/builds/')
+        # pages of lists are streamed, but they aren't long-lived
+        os_inst._get('http://example.com/builds/?limit=10', stream=True)
+        os_inst._get('http://example.com/builds/?watch=true', stream=True, long_lived=True)
+
+    def test_rate_limits_retries(self):
+        os_inst = Openshift(OAPI_PREFIX, API_VER, "/oauth/authorize", use_auth=False,
+                            api_qps=5, api_burst=10,
+                            retry_policy=RetryPolicy(max_retries=1, base_delay=0))
+        (flexmock(os_inst._con._get_session('http://example.com/builds/'))
+            .should_receive('request')
+            .and_return(flexmock(status_code=http_client.SERVICE_UNAVAILABLE, headers={},
+                                 content=b'{}', close=lambda: None))
+            .and_return(flexmock(status_code=http_client.OK, headers={}, content=b'{}'))
+            .twice())
+        flexmock(os_inst._rate_limiter).should_receive('acquire').twice().and_return(0)
+
+        os_inst._get('http://example.com/builds/')
+
+    def test_request_hooks(self):
+        os_inst = Openshift(OAPI_PREFIX, API_VER, "/oauth/authorize", use_auth=False)
+        os_inst.add_request_hook(lambda record: None)
+        (flexmock(os_inst._con)
+            .should_receive('get')
+            .with_args(object, headers={}, verify_ssl=True, retries_enabled=True,
+                       operation='get_build')
+            .and_return(make_json_response({}))
+            .once())
+        os_inst.get_build(TEST_BUILD)
+
+    def test_no_rate_limits(self, openshift):  # noqa:F811
+        assert openshift._rate_limiter is None
+        assert openshift._stream_rate_limiter is None
+
     def test_list_pods(self, openshift):  # noqa
         response = openshift.list_pods(label="openshift.io/build.name=%s" %
                                        TEST_BUILD)
@@ -196,6 +301,329 @@ class TestOpenshift(object):
                 break
         assert 'Retry #143' in log.getMessage()
 
+    @staticmethod
+    def watch_event(changetype, name, resource_version, **kwargs):
+        obj = {'metadata': {'name': name, 'resourceVersion': resource_version}}
+        obj.update(kwargs)
+        # "type" first, as servers send it
+        return ('{"type": "%s", "object": %s}' % (changetype, json.dumps(obj))).encode('utf-8')
+
+    def test_watch_resource_resumes(self, openshift):  # noqa:F811
+        url = OAPI_PREFIX + "watch/namespaces/default/builds/"
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(url + "?timeoutSeconds=60", stream=True, long_lived=True,
+                       headers=object, operation='watch_resource')
+            .and_return(Response(200, iterable=[
+                self.watch_event('ADDED', 'build-1', '10'),
+                self.watch_event('BOOKMARK', '', '12'),
+            ]))
+            .once()
+            .ordered())
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(UrlMatcher(url + "?resourceVersion=12&timeoutSeconds=60"),
+                       stream=True, long_lived=True, headers=object, operation='watch_resource')
+            .and_return(Response(200, iterable=[
+                self.watch_event('MODIFIED', 'build-1', '13'),
+            ]))
+            .once()
+            .ordered())
+        # resumed right away, no sleep after streams with events
+        flexmock(time).should_receive('sleep').never()
+
+        watch = openshift.watch_resource("builds", timeoutSeconds=60)
+        assert [(changetype, obj['metadata']['resourceVersion'])
+                for changetype, obj in [next(watch), next(watch)]] == [
+            ('added', '10'), ('modified', '13')]
+
+    @pytest.mark.parametrize('expire_event', [True, False])
+    def test_watch_resource_expired(self, openshift, expire_event):  # noqa:F811
+        url = OAPI_PREFIX + "watch/namespaces/default/builds/%s/" % TEST_BUILD
+        if expire_event:
+            expired = Response(200, iterable=[
+                json.dumps({'type': 'ERROR',
+                            'object': {'kind': 'Status', 'code': 410}}).encode('utf-8')
+            ])
+        else:
+            expired = Response(410, content=b'{"kind": "Status", "code": 410}')
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(url + "?resourceVersion=5", stream=True, long_lived=True,
+                       headers=object, operation='watch_resource')
+            .and_return(expired)
+            .once()
+            .ordered())
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(OAPI_PREFIX + "namespaces/default/builds/%s/" % TEST_BUILD,
+                       operation='watch_resource')
+            .and_return(make_json_response({
+                'metadata': {'name': TEST_BUILD, 'resourceVersion': '20'},
+                'status': {'phase': 'Complete'},
+            }))
+            .once()
+            .ordered())
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(url + "?resourceVersion=20", stream=True, long_lived=True,
+                       headers=object, operation='watch_resource')
+            .and_return(Response(200, iterable=[
+                self.watch_event('DELETED', TEST_BUILD, '21'),
+            ]))
+            .once()
+            .ordered())
+
+        watch = openshift.watch_resource("builds", TEST_BUILD, resourceVersion=5)
+        changetype, obj = next(watch)
+        assert changetype == 'modified'
+        assert obj['status']['phase'] == 'Complete'
+        assert next(watch)[0] == 'deleted'
+
+    def test_watch_resource_expired_deleted(self, openshift):  # noqa:F811
+        url = OAPI_PREFIX + "watch/namespaces/default/builds/"
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(url, stream=True, long_lived=True,
+                       headers=object, operation='watch_resource')
+            .and_return(Response(200, iterable=[
+                self.watch_event('ADDED', 'build-1', '1'),
+                self.watch_event('ADDED', 'build-2', '2'),
+                self.watch_event('DELETED', 'build-3', '3'),
+                json.dumps({'type': 'ERROR',
+                            'object': {'kind': 'Status', 'code': 410}}).encode('utf-8'),
+            ]))
+            .once()
+            .ordered())
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(OAPI_PREFIX + "namespaces/default/builds/", operation='watch_resource')
+            .and_return(make_json_response({
+                'metadata': {'resourceVersion': '20'},
+                'items': [{'metadata': {'name': 'build-2', 'resourceVersion': '15'}}],
+            }))
+            .once()
+            .ordered())
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(url + "?resourceVersion=20", stream=True, long_lived=True,
+                       headers=object, operation='watch_resource')
+            .and_raise(OsbsResponseException('forbidden', 403))
+            .once()
+            .ordered())
+
+        events = []
+        with pytest.raises(OsbsResponseException):
+            for changetype, obj in openshift.watch_resource("builds"):
+                events.append((changetype, obj['metadata']['name']))
+        # build-1 was deleted while the watch was down
+        assert events == [('added', 'build-1'), ('added', 'build-2'), ('deleted', 'build-3'),
+                          ('deleted', 'build-1'), ('modified', 'build-2')]
+
+    @pytest.mark.parametrize(('error', 'retried'), [
+        (OsbsResponseException('error', 503), True),
+        (OsbsNetworkException('url', 'error', ''), True),
+        (OsbsException(cause=ConnectionError()), True),
+        (OsbsResponseException('forbidden', 403), False),
+        (OsbsException(cause=ValueError()), False),
+    ])
+    def test_watch_resource_errors(self, openshift, error, retried):  # noqa:F811
+        delays = []
+        flexmock(time).should_receive('sleep').replace_with(delays.append)
+        flexmock(openshift).should_receive('_get').and_raise(error)
+
+        with pytest.raises(type(error)):
+            list(openshift.watch_resource("builds"))
+
+        if retried:
+            assert len(delays) == WATCH_RETRY - 1
+            for failures, delay in enumerate(delays, 1):
+                assert 0 <= delay <= min(WATCH_RETRY_SECS, 2 ** (failures - 1))
+        else:
+            assert delays == []
+
+    def test_wait_for_builds(self, openshift):  # noqa:F811
+        events = [
+            self.watch_event('ADDED', 'build-1', '1', status={'phase': 'Running'}),
+            self.watch_event('ADDED', 'build-2', '2', status={'phase': 'Complete'}),
+            self.watch_event('ADDED', 'other', '3', status={'phase': 'Failed'}),
+            self.watch_event('MODIFIED', 'build-3', '4', status={'phase': 'Failed'}),
+            self.watch_event('MODIFIED', 'build-1', '5', status={'phase': 'Complete'}),
+        ]
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(OAPI_PREFIX + "watch/namespaces/default/builds/?timeoutSeconds=60",
+                       stream=True, long_lived=True, headers=object, operation='watch_resource')
+            .and_return(Response(200, iterable=events))
+            .once())
+        flexmock(time).should_receive('time').and_return(1000)
+
+        finished = []
+        builds = openshift.wait_for_builds(['build-1', 'build-2', 'build-3'], timeout=60,
+                                           callback=finished.append)
+        names = [build['metadata']['name'] for build in builds]
+        assert names == ['build-2', 'build-3', 'build-1']
+        assert [build['metadata']['name'] for build in finished] == names
+
+    @pytest.mark.parametrize(('line', 'skipped'), [
+        (b'{"type":"MODIFIED","object":{"metadata":{"name":"other"}}}', True),
+        (b'{"type": "ADDED", "object": {"metadata": {"name": "other"}}}', True),
+        (b'{"type":"MODIFIED","object":{"metadata":{"name":"build-1"}}}', False),
+        (b'{"type": "DELETED", "object": {"metadata": {"name": "build-1"}}}', False),
+        # name of the build is not first
+        (b'{"type":"MODIFIED","object":{"metadata":{"ownerReferences":[{"name":"bc"}],'
+         b'"name":"build-1"}}}', False),
+        # type is not first
+        (b'{"object":{"metadata":{"name":"other"}},"type":"MODIFIED"}', True),
+        (b'{"object":{"kind":"Status","code":410},"type":"ERROR"}', False),
+        # object has a "type" field which looks like an event type
+        (b'{"type":"MODIFIED","object":{"metadata":{"name":"other"},"type":"ERROR"}}', False),
+        (b'{"type":"UNKNOWN","object":{"metadata":{"name":"other"}}}', False),
+        (b'{"type":"BOOKMARK","object":{"metadata":{"resourceVersion":"12"}}}', False),
+        (b'{"type":"ERROR","object":{"kind":"Status","code":410}}', False),
+    ])
+    def test_watch_event_decoder_skip(self, line, skipped):
+        decoder = WatchEventDecoder(names={'build-1'})
+        assert decoder.skip(line) is skipped
+        assert decoder.stats['skipped'] == int(skipped)
+        assert WatchEventDecoder().skip(line) is False
+
+    def test_watch_event_decoder_decode(self):
+        stats = {}
+        decoder = WatchEventDecoder(loads=json.loads, stats=stats)
+        line = u'{"type":"ADDED","object":{"metadata":{"name":"bůild"}}}'.encode('utf-8')
+        assert decoder.decode(line) == ('added', {'metadata': {'name': u'bůild'}})
+        assert decoder.decode(b'{"type":"ADDED"') is None
+        assert decoder.decode(b'{"type":"ADDED"}') is None
+        assert stats == {'decoded': 1, 'skipped': 0, 'invalid': 2}
+
+    def test_watch_resource_names(self, openshift):  # noqa:F811
+        events = [
+            b'{"type":"ADDED","object":{"metadata":{"name":"other","resourceVersion":"1"}}}',
+            self.watch_event('ADDED', 'build-1', '2'),
+        ]
+        (flexmock(openshift)
+            .should_receive('_get')
+            .and_return(Response(200, iterable=events))
+            .once())
+        watch = openshift.watch_resource("builds", names={'build-1'})
+        changetype, obj = next(watch)
+        assert obj['metadata']['name'] == 'build-1'
+
+    def test_watch_event_decoder_skipped_resource_version(self):
+        decoder = WatchEventDecoder(names={'build-1'})
+        assert decoder.skip(self.watch_event('ADDED', 'other', '7'))
+        assert decoder.skipped_resource_version == '7'
+        assert decoder.skip(b'{"type":"ADDED","object":{"metadata":{"name":"other"}}}')
+        assert decoder.skipped_resource_version is None
+
+    def test_watch_resource_names_resumes(self, openshift):  # noqa:F811
+        url = OAPI_PREFIX + "watch/namespaces/default/builds/"
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(url, stream=True, long_lived=True,
+                       headers=object, operation='watch_resource')
+            .and_return(Response(200, iterable=[
+                self.watch_event('ADDED', 'other', '1'),
+                self.watch_event('ADDED', 'build-1', '2'),
+                self.watch_event('ADDED', 'other', '3'),
+            ]))
+            .once()
+            .ordered())
+        # resumed after the last skipped event
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(url + "?resourceVersion=3", stream=True, long_lived=True,
+                       headers=object, operation='watch_resource')
+            .and_raise(OsbsResponseException('gone', 410))
+            .once()
+            .ordered())
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(OAPI_PREFIX + "namespaces/default/builds/", operation='watch_resource')
+            .and_return(make_json_response({
+                'metadata': {'resourceVersion': '20'},
+                'items': [{'metadata': {'name': 'other', 'resourceVersion': '4'}},
+                          {'metadata': {'name': 'build-1', 'resourceVersion': '5'}}],
+            }))
+            .once()
+            .ordered())
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(url + "?resourceVersion=20", stream=True, long_lived=True,
+                       headers=object, operation='watch_resource')
+            .and_raise(OsbsResponseException('forbidden', 403))
+            .once()
+            .ordered())
+
+        events = []
+        with pytest.raises(OsbsResponseException):
+            for changetype, obj in openshift.watch_resource("builds", names={'build-1'}):
+                events.append((changetype, obj['metadata']['name']))
+        # relisted objects are filtered by name too
+        assert events == [('added', 'build-1'), ('modified', 'build-1')]
+
+    def test_wait_for_builds_timeout(self, openshift):  # noqa:F811
+        flexmock(openshift).should_receive('_get').never()
+        with pytest.raises(OsbsWatchTimeout) as exc:
+            list(openshift.wait_for_builds(['build-1'], timeout=0))
+        assert 'build-1' in str(exc.value)
+
+    def test_wait_for_builds_deleted(self, openshift):  # noqa:F811
+        (flexmock(openshift)
+            .should_receive('watch_resource')
+            .and_return(iter([
+                ('added', {'metadata': {'name': 'build-1'}, 'status': {'phase': 'Running'}}),
+                ('deleted', {'metadata': {'name': 'build-1'}, 'status': {'phase': 'Running'}}),
+            ])))
+        with pytest.raises(OsbsWatchBuildNotFound):
+            list(openshift.wait_for_builds(['build-1']))
+
+    def test_iter_builds_pages(self, openshift):  # noqa:F811
+        url = OAPI_PREFIX + "namespaces/default/builds/"
+        pages = [
+            ("?labelSelector=buildconfig%3Dbc&limit=2",
+             {'metadata': {'continue': 'token1'}, 'items': [{'n': 1}, {'n': 2}]}),
+            ("?labelSelector=buildconfig%3Dbc&limit=2&continue=token1",
+             {'metadata': {'continue': 'token2'}, 'items': [{'n': 3}, {'n': 4}]}),
+            ("?labelSelector=buildconfig%3Dbc&limit=2&continue=token2",
+             {'metadata': {}, 'items': [{'n': 5}]}),
+        ]
+        for query, page in pages:
+            (flexmock(openshift)
+                .should_receive('_get')
+                .with_args(UrlMatcher(url + query), stream=True, operation='iter_builds')
+                .and_return(StreamingResponse(content=json.dumps(page).encode('utf-8')))
+                .once()
+                .ordered())
+
+        builds = openshift.iter_builds(build_config_id='bc', page_size=2)
+        assert [build['n'] for build in builds] == [1, 2, 3, 4, 5]
+
+    def test_iter_resource_without_pagination(self, openshift):  # noqa:F811
+        # servers without pagination support return everything
+        url = OAPI_PREFIX + "namespaces/default/buildconfigs/?labelSelector=a%3Db&limit=5"
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(url, stream=True, operation='iter_buildconfigs')
+            .and_return(StreamingResponse(content=json.dumps({
+                'items': [{'n': n} for n in range(10)]}).encode('utf-8')))
+            .once())
+        build_configs = openshift.iter_build_configs_by_labels([('a', 'b')], page_size=5)
+        assert len(list(build_configs)) == 10
+
+    def test_iter_pods(self, openshift):  # noqa:F811
+        page = {'kind': 'PodList', 'metadata': {'resourceVersion': '1'},
+                'items': [{'metadata': {'name': 'pod-%d' % n}} for n in range(3)]}
+        url = API_PREFIX + "namespaces/default/pods/?labelSelector=a%3Db&limit=2"
+        (flexmock(openshift)
+            .should_receive('_get')
+            .with_args(UrlMatcher(url), stream=True, operation='iter_pods')
+            .and_return(StreamingResponse(content=json.dumps(page).encode('utf-8')))
+            .once())
+        pods = openshift.iter_pods(label='a=b', page_size=2)
+        assert [pod['metadata']['name'] for pod in pods] == ['pod-0', 'pod-1', 'pod-2']
+
     def test_watch_build(self, openshift):  # noqa
         response = openshift.wait_for_build_to_finish(TEST_BUILD)
         status_lower = response["status"]["phase"].lower()
@@ -216,13 +644,46 @@ class TestOpenshift(object):
         assert response.json()["metadata"]["name"] == TEST_CANCELLED_BUILD
         assert response.json()["status"]["phase"].lower() in BUILD_CANCELLED_STATE
 
+    def test_cancel_build_without_patch(self, openshift):  # noqa:F811
+        (flexmock(openshift)
+            .should_receive('_patch')
+            .with_args(object, data=object, headers=object, operation='cancel_build')
+            .once()
+            .and_return(HttpResponse(http_client.METHOD_NOT_ALLOWED, headers={}, content=b'')))
+        flexmock(openshift).should_call('_put').once()
+
+        response = openshift.cancel_build(TEST_CANCELLED_BUILD)
+        assert response.json()["status"]["phase"].lower() in BUILD_CANCELLED_STATE
+        assert not openshift.use_patch
+
+    @pytest.mark.parametrize(('method', 'content_type', 'patch'), [
+        ('update_labels_on_build', 'application/merge-patch+json',
+         {'metadata': {'labels': {'key': 'value'}}}),
+        ('set_labels_on_build', 'application/json-patch+json',
+         [{'op': 'add', 'path': '/metadata/labels', 'value': {'key': 'value'}}]),
+        ('update_annotations_on_build', 'application/merge-patch+json',
+         {'metadata': {'annotations': {'key': 'value'}}}),
+    ])
+    def test_patch_attributes(self, openshift, method, content_type, patch):  # noqa:F811
+        url = openshift._build_url('builds/%s' % TEST_BUILD)
+        (flexmock(openshift)
+            .should_call('_patch')
+            .with_args(url, data=JsonMatcher(patch), headers={'Content-Type': content_type},
+                       operation=method)
+            .once())
+        flexmock(openshift).should_receive('_get').never()
+        flexmock(openshift).should_receive('_put').never()
+
+        response = getattr(openshift, method)(TEST_BUILD, {'key': 'value'})
+        assert response.json()['metadata']['name'] == TEST_BUILD
+
     def test_get_build_config(self, openshift):  # noqa
         mock_response = {"spam": "maps"}
         build_config_name = 'some-build-config-name'
         expected_url = openshift._build_url("buildconfigs/%s/" % build_config_name)
         (flexmock(openshift)
             .should_receive("_get")
-            .with_args(expected_url)
+            .with_args(expected_url, operation='get_build_config')
             .once()
             .and_return(make_json_response(mock_response)))
         response = openshift.get_build_config(build_config_name)
@@ -233,7 +694,7 @@ class TestOpenshift(object):
         expected_url = openshift._build_url("buildconfigs/%s/" % build_config_name)
         (flexmock(openshift)
             .should_receive("_get")
-            .with_args(expected_url)
+            .with_args(expected_url, operation='get_build_config')
             .once()
             .and_return(HttpResponse(404, {}, b'')))
         with pytest.raises(OsbsResponseException):
@@ -249,7 +710,7 @@ class TestOpenshift(object):
             "buildconfigs/?labelSelector=label-1%3Dvalue-1%2Clabel-2%3Dvalue-2")
         (flexmock(openshift)
             .should_receive("_get")
-            .with_args(expected_url)
+            .with_args(expected_url, operation='get_all_build_configs_by_labels')
             .once()
             .and_return(make_json_response(mock_response)))
         response = openshift.get_build_config_by_labels(label_selectors)
@@ -273,7 +734,7 @@ class TestOpenshift(object):
             "buildconfigs/?labelSelector=label-1%3Dvalue-1%2Clabel-2%3Dvalue-2")
         (flexmock(openshift)
             .should_receive("_get")
-            .with_args(expected_url)
+            .with_args(expected_url, operation='get_all_build_configs_by_labels')
             .once()
             .and_return(make_json_response(mock_response)))
         response = openshift.get_build_config_by_labels_filtered(label_selectors, "maps.spam",
@@ -290,7 +751,7 @@ class TestOpenshift(object):
             "buildconfigs/?labelSelector=label-1%3Dvalue-1%2Clabel-2%3Dvalue-2")
         (flexmock(openshift)
             .should_receive("_get")
-            .with_args(expected_url)
+            .with_args(expected_url, operation='get_all_build_configs_by_labels')
             .once()
             .and_return(make_json_response(mock_response)))
 
@@ -308,7 +769,7 @@ class TestOpenshift(object):
             "buildconfigs/?labelSelector=label-1%3Dvalue-1%2Clabel-2%3Dvalue-2")
         (flexmock(openshift)
             .should_receive("_get")
-            .with_args(expected_url)
+            .with_args(expected_url, operation='get_all_build_configs_by_labels')
             .once()
             .and_return(make_json_response(mock_response)))
 
@@ -341,7 +802,7 @@ class TestOpenshift(object):
             "buildconfigs/?labelSelector=label-1%3Dvalue-1%2Clabel-2%3Dvalue-2")
         (flexmock(openshift)
             .should_receive("_get")
-            .with_args(expected_url)
+            .with_args(expected_url, operation='get_all_build_configs_by_labels')
             .once()
             .and_return(make_json_response(mock_response)))
 
@@ -360,7 +821,7 @@ class TestOpenshift(object):
             "buildconfigs/?labelSelector=label-1%3Dvalue-1%2Clabel-2%3Dvalue-2")
         (flexmock(openshift)
             .should_receive("_get")
-            .with_args(expected_url)
+            .with_args(expected_url, operation='get_all_build_configs_by_labels')
             .once()
             .and_return(make_json_response(mock_response)))
 
@@ -392,6 +853,11 @@ class TestOpenshift(object):
         except AttributeError:
             return  # not every combination is implemented
 
+        # server without PATCH support, objects are updated with GET + PUT
+        (flexmock(openshift)
+            .should_receive('_patch')
+            .once()
+            .and_return(HttpResponse(http_client.METHOD_NOT_ALLOWED, headers={}, content=b'')))
         get_expectation = (flexmock(openshift)
                            .should_receive('_get')
                            .times(len(status_codes)))
@@ -432,7 +898,8 @@ class TestOpenshift(object):
         (flexmock(openshift)
             .should_receive("_put")
             .with_args(expected_url, data=json.dumps(mock_data),
-                       headers={"Content-Type": "application/json"})
+                       headers={"Content-Type": "application/json"},
+                       operation='put_image_stream_tag')
             .once()
             .and_return(make_json_response(mock_data)))
 
@@ -515,7 +982,7 @@ class TestOpenshift(object):
 
         expectation = (flexmock(openshift)
                        .should_receive("_get")
-                       .with_args(expected_url)
+                       .with_args(expected_url, operation='get_image_stream_tag')
                        .once())
 
         if status_code == 200:
@@ -549,7 +1016,8 @@ class TestOpenshift(object):
             (flexmock(openshift)
                 .should_receive("_put")
                 .with_args(expected_url, data=str,
-                           headers={"Content-Type": "application/json"})
+                           headers={"Content-Type": "application/json"},
+                           operation='put_image_stream_tag')
                 .replace_with(verify_image_stream_tag)
                 .once())
 
@@ -709,11 +1177,13 @@ class TestOpenshift(object):
         (flexmock(openshift)
             .should_call('_put')
             .times(1 if expect_update else 0)
-            .with_args(put_url, data=JsonMatcher(modified_resource_json), use_json=True))
+            .with_args(put_url, data=JsonMatcher(modified_resource_json), use_json=True,
+                       operation='update_image_stream'))
         (flexmock(openshift)
             .should_call('_post')
             .times(1 if expect_import else 0)
-            .with_args(post_url, data=JsonMatcher(stream_import_json), use_json=True))
+            .with_args(post_url, data=JsonMatcher(stream_import_json), use_json=True,
+                       operation='import_image'))
 
         assert openshift.import_image(imagestream_name, stream_import, tags=tags) is expect_import
 
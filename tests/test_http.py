@@ -12,17 +12,19 @@ from flexmock import flexmock
 import pytest
 import requests
 
-from requests.packages.urllib3.util import Retry
-from osbs.http import HttpSession, HttpStream, http_client, HttpResponse
+from osbs import codec
+from osbs.http import (HttpSession, HttpStream, http_client, HttpResponse, RequestRecord,
+                       RequestStats)
 from osbs.exceptions import OsbsNetworkException, OsbsException, OsbsResponseException
 from osbs.constants import HTTP_RETRIES_STATUS_FORCELIST, HTTP_REQUEST_TIMEOUT
+from osbs.utils import RetryPolicy
 
 logger = logging.getLogger(__file__)
 
 
 @pytest.fixture
 def s():
-    return HttpSession(verbose=True)
+    return HttpSession(verbose=True, retry_policy=RetryPolicy(max_retries=1, base_delay=0))
 
 
 def has_connection():
@@ -42,12 +44,6 @@ def has_connection():
 @pytest.mark.skipif(not has_connection(),
                     reason="requires internet connection")
 class TestHttpSession(object):
-    major, minor, patch = requests.__version__.split('.')
-    if int(minor) < 11:
-        retry_method_name = 'is_forced_retry'
-    else:
-        retry_method_name = 'is_retry'
-
     def test_single_multi_secure_without_redirs(self, s):
         response_single = s.get("https://httpbin.org/get")
         logger.debug(response_single.headers)
@@ -178,26 +174,6 @@ class TestHttpSession(object):
 
         assert isinstance(exc_info.value.cause, raise_exc)
 
-    @pytest.mark.parametrize('status_code', HTTP_RETRIES_STATUS_FORCELIST)
-    def test_fail_on_first_retry(self, s, status_code):
-        (flexmock(Retry)
-            .should_receive(self.retry_method_name)
-            .and_return(True)
-            .and_return(False))
-        s.get('http://httpbin.org/status/%s' % status_code)
-
-    @pytest.mark.parametrize('status_code', (404, 409))
-    def test_fail_without_retries(self, s, status_code):
-        (flexmock(Retry)
-            .should_receive(self.retry_method_name)
-            .and_return(False))
-        (flexmock(Retry)
-            .should_receive('increment')
-            .never())
-        with pytest.raises(OsbsResponseException) as exc_info:
-            s.get('http://httpbin.org/drip?numbytes=5&code=%s' % status_code).json()
-        assert exc_info.value.status_code == status_code
-
     def test_set_timeout(self):
         url = "http://httpbin.org/get"
         method = "get"
@@ -291,3 +267,306 @@ class TestHttpResponse(object):
         with pytest.raises(OsbsResponseException) as exc_info:
             response.json()
         assert 'HtttpResponse has corrupt json' in exc_info.value.message
+
+    def test_json_parsed_once(self):
+        content = b'{"items": [1, 2]}'
+        response = HttpResponse(status_code=http_client.OK, headers={}, content=content)
+        assert response.content_length == len(content)
+        assert response.decode_time is None
+
+        flexmock(codec).should_receive('loads').once().and_return({'items': [1, 2]})
+        parsed = response.json()
+        assert response.json() is parsed
+        assert response.decode_time >= 0
+
+    def test_release(self):
+        response = HttpResponse(status_code=http_client.OK, headers={}, content=b'{"a": 1}')
+        assert response.json(release=True) == {'a': 1}
+        assert response.content is None
+        assert response.json() == {'a': 1}
+
+        response = HttpResponse(status_code=http_client.OK, headers={}, content=b'{"a": 1}')
+        response.release()
+        with pytest.raises(OsbsException):
+            response.json()
+
+
+class TestHttpSessionPool(object):
+    @pytest.fixture(autouse=True)
+    def clean_pool(self):
+        HttpSession.close_all()
+        yield
+        HttpSession.close_all()
+
+    def test_session_shared(self):
+        first = HttpSession()._get_session('https://openshift.example.com/oapi/v1/builds')
+        second = HttpSession()._get_session('https://openshift.example.com/api/v1/pods')
+        assert first is second
+
+    @pytest.mark.parametrize('kwargs', [
+        {'verify_ssl': False},
+        {'ca': '/etc/ca.crt'},
+        {'client_cert': 'cert', 'client_key': 'key'},
+    ])
+    def test_session_keyed_by_settings(self, kwargs):
+        url = 'https://openshift.example.com/oapi/v1/builds'
+        default = HttpSession()._get_session(url)
+        assert HttpSession()._get_session(url, **kwargs) is not default
+        assert HttpSession()._get_session('http://openshift.example.com/') is not default
+        assert HttpSession(pool_maxsize=20)._get_session(url) is not default
+
+    def test_session_used_for_request(self):
+        fake_response = flexmock(status_code=http_client.OK, headers={}, content=b'{}')
+        url = 'https://openshift.example.com/oapi/v1/builds'
+        session = HttpSession()
+        (flexmock(session._get_session(url))
+            .should_receive('request')
+            .and_return(fake_response)
+            .twice())
+        session.get(url)
+        session.get(url)
+
+    @pytest.mark.parametrize(('keepalive', 'expected'), [
+        (True, {}),
+        (False, {'Connection': 'close'}),
+    ])
+    def test_keepalive(self, keepalive, expected):
+        fake_response = flexmock(status_code=http_client.OK, headers={}, content=b'{}')
+        url = 'https://openshift.example.com/oapi/v1/builds'
+        (flexmock(requests.Session)
+            .should_receive('request')
+            .with_args('get', url, timeout=HTTP_REQUEST_TIMEOUT, verify=True,
+                       allow_redirects=True, headers=expected)
+            .and_return(fake_response)
+            .once())
+        HttpSession(keepalive=keepalive).get(url)
+
+    def test_connection_reused(self):
+        from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+        import threading
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                body = b'{}'
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Set-Cookie', 'spam=maps')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            url = 'http://127.0.0.1:%d/' % server.server_port
+            for _ in range(3):
+                assert HttpSession().get(url).json() == {}
+
+            stats = HttpSession.get_connection_stats()
+            # cookies must not leak between clients sharing the pool
+            assert not list(HttpSession()._get_session(url).cookies)
+        finally:
+            # the server handles one keep-alive connection at a time,
+            # close it before shutting down
+            HttpSession.close_all()
+            server.shutdown()
+            server.server_close()
+
+        assert stats == {'connections': 1, 'requests': 3, 'reused': 2}
+
+
+class TestHttpSessionRetries(object):
+    url = 'https://openshift.example.com/oapi/v1/builds'
+
+    @pytest.fixture(autouse=True)
+    def clean_pool(self):
+        HttpSession.close_all()
+        yield
+        HttpSession.close_all()
+
+    def make_session(self, max_retries=2):
+        return HttpSession(retry_policy=RetryPolicy(max_retries=max_retries, base_delay=0))
+
+    def mock_responses(self, session, *status_codes):
+        expectation = (flexmock(session._get_session(self.url))
+                       .should_receive('request')
+                       .times(len(status_codes)))
+        for status_code in status_codes:
+            expectation.and_return(flexmock(status_code=status_code, headers={},
+                                            content=b'{}', close=lambda: None))
+
+    @pytest.mark.parametrize('status_code', HTTP_RETRIES_STATUS_FORCELIST)
+    def test_succeed_on_retry(self, status_code):
+        session = self.make_session()
+        self.mock_responses(session, status_code, http_client.OK)
+        assert session.get(self.url).status_code == http_client.OK
+
+    @pytest.mark.parametrize('status_code', HTTP_RETRIES_STATUS_FORCELIST)
+    def test_fail_after_retries(self, status_code):
+        session = self.make_session()
+        self.mock_responses(session, status_code, status_code, status_code)
+        with pytest.raises(OsbsNetworkException) as exc_info:
+            session.get(self.url)
+        assert exc_info.value.status_code == status_code
+
+    @pytest.mark.parametrize('status_code', (404, 409))
+    def test_fail_without_retries(self, status_code):
+        session = self.make_session()
+        self.mock_responses(session, status_code)
+        with pytest.raises(OsbsResponseException) as exc_info:
+            session.get(self.url).json()
+        assert exc_info.value.status_code == status_code
+
+    def test_retries_disabled(self):
+        session = self.make_session()
+        self.mock_responses(session, http_client.SERVICE_UNAVAILABLE)
+        response = session.get(self.url, retries_enabled=False)
+        assert response.status_code == http_client.SERVICE_UNAVAILABLE
+
+    def test_retry_connection_error(self):
+        session = self.make_session()
+        (flexmock(session._get_session(self.url))
+            .should_receive('request')
+            .and_raise(requests.exceptions.ConnectionError(''))
+            .and_return(flexmock(status_code=http_client.OK, headers={}, content=b'{}'))
+            .twice())
+        assert session.get(self.url).status_code == http_client.OK
+
+    def test_retries_throttled(self):
+        throttled = []
+        session = self.make_session()
+        session.throttle = lambda url, long_lived: throttled.append((url, long_lived))
+        self.mock_responses(session, http_client.SERVICE_UNAVAILABLE,
+                            http_client.SERVICE_UNAVAILABLE, http_client.OK)
+        assert session.get(self.url).status_code == http_client.OK
+        # the first attempt is throttled by the caller
+        assert throttled == [(self.url, False), (self.url, False)]
+
+
+class TestRequestHooks(object):
+    url = 'https://openshift.example.com/oapi/v1/builds'
+
+    @pytest.fixture(autouse=True)
+    def clean_pool(self):
+        HttpSession.close_all()
+        yield
+        HttpSession.close_all()
+
+    def make_session(self, records):
+        return HttpSession(retry_policy=RetryPolicy(max_retries=1, base_delay=0),
+                           request_hooks=[records.append])
+
+    def mock_responses(self, session, *status_codes):
+        expectation = (flexmock(session._get_session(self.url))
+                       .should_receive('request')
+                       .times(len(status_codes)))
+        for status_code in status_codes:
+            expectation.and_return(flexmock(status_code=status_code, headers={},
+                                            content=b'{"a": 1}', close=lambda: None))
+
+    def test_record(self):
+        records = []
+        session = self.make_session(records)
+        self.mock_responses(session, http_client.SERVICE_UNAVAILABLE, http_client.CREATED)
+        session.post(self.url, data=b'{"kind": "Build"}', operation='create_build')
+
+        record, = records
+        assert record.operation == 'create_build'
+        assert record.method == 'POST'
+        assert record.status_code == http_client.CREATED
+        assert record.retries == 1
+        assert record.bytes_sent == len(b'{"kind": "Build"}')
+        assert record.bytes_received == len(b'{"a": 1}')
+        assert 0 <= record.ttfb <= record.duration
+        assert record.transfer == record.duration - record.ttfb
+        assert record.error is None
+
+    def test_record_failed(self):
+        records = []
+        session = self.make_session(records)
+        self.mock_responses(session, http_client.BAD_GATEWAY, http_client.BAD_GATEWAY)
+        with pytest.raises(OsbsNetworkException):
+            session.get(self.url, operation='get_build')
+
+        record, = records
+        assert record.status_code == http_client.BAD_GATEWAY
+        assert record.retries == 1
+        assert isinstance(record.error, OsbsNetworkException)
+
+    def test_record_stream(self):
+        records = []
+        session = self.make_session(records)
+        self.mock_responses(session, http_client.OK)
+        stream = session.get(self.url, stream=True, operation='watch_resource')
+        assert not records
+
+        with stream:
+            pass
+        record, = records
+        assert record.operation == 'watch_resource'
+        assert record.stream
+
+    def test_hook_failure_ignored(self):
+        def hook(record):
+            raise RuntimeError('hook failed')
+
+        session = HttpSession(request_hooks=[hook])
+        self.mock_responses(session, http_client.OK)
+        assert session.get(self.url).json() == {'a': 1}
+
+        session.remove_request_hook(hook)
+        assert not session.request_hooks
+
+
+def make_record(operation, duration, status_code=http_client.OK, retries=0):
+    record = RequestRecord(operation, 'get', 'https://openshift.example.com/')
+    record.response_received(status_code)
+    record.retries = retries
+    record.bytes_received = 10
+    record.finish()
+    record.ttfb = record.duration = duration
+    return record
+
+
+class TestRequestStats(object):
+    def test_percentiles(self):
+        stats = RequestStats()
+        for n in range(1, 101):
+            stats(make_record('get_build', n / 100.0))
+        stats(make_record('create_build', 2.0, status_code=http_client.CONFLICT, retries=2))
+
+        summary = stats.summary()
+        assert summary['get_build']['count'] == 100
+        assert summary['get_build']['errors'] == 0
+        assert summary['get_build']['bytes_received'] == 1000
+        assert (summary['get_build']['p50'], summary['get_build']['p95'],
+                summary['get_build']['p99']) == (0.5, 0.95, 0.99)
+        assert summary['get_build']['ttfb_p50'] == 0.5
+        assert summary['create_build']['errors'] == 1
+        assert summary['create_build']['retries'] == 2
+        assert summary['create_build']['p99'] == 2.0
+
+        report = stats.report().splitlines()
+        assert len(report) == 3
+        assert report[1].startswith('create_build')
+
+        stats.reset()
+        assert stats.summary() == {}
+
+    def test_max_samples(self):
+        stats = RequestStats(max_samples=2)
+        for duration in (10.0, 1.0, 2.0):
+            stats(make_record('get_build', duration))
+        summary = stats.summary()['get_build']
+        assert summary['count'] == 3
+        assert summary['p99'] == 2.0
+
+    def test_percentile_empty(self):
+        assert RequestStats.percentile([], 50) is None
@@ -0,0 +1,103 @@
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+"""
+import bz2
+import gzip
+
+import pytest
+import six
+from six.moves import queue
+
+from osbs.exceptions import OsbsValidationException
+from osbs.logs import OrchestratorLogDemultiplexer, LogFileWriter, make_sink
+
+ORCHESTRATOR_LINE = b'2017-06-23 17:18:41,791 platform:- - atomic_reactor.foo - DEBUG - orch'
+WORKER_LINE = (b'2017-06-23 17:18:41,791 platform:x86_64 - atomic_reactor.foo - INFO - '
+               b'2017-06-23 17:18:41,400 platform:- atomic_reactor.bar - DEBUG - worker')
+WORKER_LINE_STRIPPED = b'2017-06-23 17:18:41,400 atomic_reactor.bar - DEBUG - worker'
+PPC_LINE = b'2017-06-23 17:18:42,000 platform:ppc64le - atomic_reactor.foo - INFO - ppc'
+PLAIN_LINE = b'2017-06-23 17:18:41,791 - I really like bacon'
+
+
+def test_demux_routes_lines():
+    orchestrator = []
+    worker = []
+    demux = OrchestratorLogDemultiplexer({None: orchestrator.append, 'x86_64': worker.append})
+    assert demux.run([ORCHESTRATOR_LINE, WORKER_LINE, PLAIN_LINE, PPC_LINE]) == 4
+    assert orchestrator == [ORCHESTRATOR_LINE, PLAIN_LINE]
+    assert worker == [WORKER_LINE_STRIPPED]
+    assert demux.bytes == sum(len(line) for line in (ORCHESTRATOR_LINE, WORKER_LINE,
+                                                     PLAIN_LINE, PPC_LINE))
+
+
+def test_demux_default_sink():
+    other = []
+    demux = OrchestratorLogDemultiplexer({}, default=other.append)
+    demux.run([WORKER_LINE, PPC_LINE])
+    assert other == [WORKER_LINE_STRIPPED, b'ppc']
+
+
+def test_demux_multiline_items():
+    orchestrator = []
+    worker = []
+    demux = OrchestratorLogDemultiplexer({None: orchestrator.append, 'x86_64': worker.append})
+    logs = [b'\n'.join([ORCHESTRATOR_LINE, WORKER_LINE]) + b'\n', PLAIN_LINE]
+    assert demux.run(logs) == 3
+    assert orchestrator == [ORCHESTRATOR_LINE, PLAIN_LINE]
+    assert worker == [WORKER_LINE_STRIPPED]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1000])
+def test_demux_chunks(chunk_size):
+    data = b'\n'.join([ORCHESTRATOR_LINE, WORKER_LINE, PPC_LINE + b'\r'])
+    orchestrator = queue.Queue()
+    ppc = six.BytesIO()
+    demux = OrchestratorLogDemultiplexer({None: orchestrator, 'ppc64le': ppc})
+    for start in range(0, len(data), chunk_size):
+        demux.feed(data[start:start + chunk_size])
+    demux.close()
+
+    assert orchestrator.get_nowait() == ORCHESTRATOR_LINE
+    assert orchestrator.empty()
+    assert ppc.getvalue() == b'ppc\n'
+    assert demux.lines == 3
+
+
+def test_make_sink_invalid():
+    with pytest.raises(OsbsValidationException):
+        make_sink(42)
+
+
+@pytest.mark.parametrize(('compression', 'decompress'), [
+    (None, lambda data: data),
+    ('gzip', lambda data: gzip.GzipFile(fileobj=six.BytesIO(data)).read()),
+    ('bz2', bz2.decompress),
+])
+def test_log_file_writer(compression, decompress):
+    output = six.BytesIO()
+    with LogFileWriter(output, compression=compression) as writer:
+        for line in (ORCHESTRATOR_LINE, WORKER_LINE, b''):
+            writer.write(line + b'\n')
+    assert decompress(output.getvalue()) == ORCHESTRATOR_LINE + b'\n' + WORKER_LINE + b'\n\n'
+    assert writer.bytes == len(ORCHESTRATOR_LINE) + len(WORKER_LINE) + 3
+
+
+def test_log_file_writer_fd(tmpdir):
+    path = str(tmpdir.join('build.log'))
+    with open(path, 'wb') as fp:
+        with LogFileWriter(fp.fileno()) as writer:
+            writer.write(ORCHESTRATOR_LINE)
+    assert tmpdir.join('build.log').read_binary() == ORCHESTRATOR_LINE
+
+
+@pytest.mark.parametrize(('fileobj', 'compression'), [
+    (42.0, None),
+    (six.BytesIO(), 'zip'),
+])
+def test_log_file_writer_invalid(fileobj, compression):
+    with pytest.raises(OsbsValidationException):
+        LogFileWriter(fileobj, compression=compression)
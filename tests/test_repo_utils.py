@@ -8,7 +8,7 @@ of the BSD license. See the LICENSE file for details.
 
 from flexmock import flexmock
 from osbs.constants import REPO_CONFIG_FILE, ADDITIONAL_TAGS_FILE, REPO_CONTAINER_CONFIG
-from osbs.repo_utils import RepoInfo, RepoConfiguration, AdditionalTagsConfig
+from osbs.repo_utils import RepoInfo, RepoConfiguration, AdditionalTagsConfig, RepoInfoCache
 from textwrap import dedent
 
 import os
@@ -94,3 +94,29 @@ class TestAdditionalTagsConfig(object):
             contents = '\n'.join(tags)
         with open(os.path.join(dir_path, ADDITIONAL_TAGS_FILE), 'w') as f:
             f.write(contents)
+
+
+class TestRepoInfoCache(object):
+
+    def test_get_put(self, tmpdir):
+        cache = RepoInfoCache(str(tmpdir.join('cache')))
+        assert cache.get('uri', 'a' * 40) is None
+
+        files = {'Dockerfile': b'FROM fedora\n', REPO_CONFIG_FILE: b'[autorebuild]\n'}
+        cache.put('uri', 'a' * 40, files)
+        assert cache.get('uri', 'a' * 40) == files
+        assert cache.get('uri', 'b' * 40) is None
+        assert cache.get('other-uri', 'a' * 40) is None
+
+    def test_evict_least_recently_used(self, tmpdir):
+        cache = RepoInfoCache(str(tmpdir), max_size=20)
+        cache.put('uri', '1', {'Dockerfile': b'x' * 8})
+        cache.put('uri', '2', {'Dockerfile': b'x' * 8})
+        for commit, mtime in (('1', 100), ('2', 50)):
+            os.utime(cache._entry_path('uri', commit), (mtime, mtime))
+        cache.get('uri', '2')
+
+        cache.put('uri', '3', {'Dockerfile': b'x' * 8})
+        assert cache.get('uri', '1') is None
+        assert cache.get('uri', '2') is not None
+        assert cache.get('uri', '3') is not None
@@ -16,18 +16,21 @@ import pytest
 
 import requests
 import six
-from requests.packages.urllib3.util import Retry
 from osbs.http import HttpSession, HttpStream
 from osbs.exceptions import OsbsNetworkException, OsbsResponseException
 from osbs.constants import HTTP_RETRIES_STATUS_FORCELIST, HTTP_RETRIES_METHODS_WHITELIST
 from osbs.core import Openshift
 from osbs.http import http_client
+from osbs.utils import RetryPolicy
 logger = logging.getLogger(__file__)
 
+# Replace real retry policy with fast version to speed up testing
+fake_retry = RetryPolicy(max_retries=1, base_delay=1)
+
 
 @pytest.fixture
 def s():
-    return HttpSession(verbose=True)
+    return HttpSession(verbose=True, retry_policy=fake_retry)
 
 
 def has_connection():
@@ -44,19 +47,12 @@ def has_connection():
         return False
 
 
-# Replace real retry with fake version to speed up testing
-fake_retry = Retry(total=1,
-                   backoff_factor=1,
-                   status_forcelist=HTTP_RETRIES_STATUS_FORCELIST)
-
-
 @pytest.mark.skipif(not has_connection(),
                     reason="requires internet connection")
 class TestHttpRetries(object):
     @pytest.mark.parametrize('status_code', HTTP_RETRIES_STATUS_FORCELIST)
     @pytest.mark.parametrize('method', HTTP_RETRIES_METHODS_WHITELIST)
     def test_fail_after_retries(self, s, status_code, method):
-        flexmock(Retry).new_instances(fake_retry)
         # latest python-requests throws OsbsResponseException, 2.6.x - OsbsNetworkException
         with pytest.raises((OsbsNetworkException, OsbsResponseException)) as exc_info:
             s.request(method=method, url='http://httpbin.org/status/%s' % status_code).json()
@@ -64,9 +60,8 @@ class TestHttpRetries(object):
             assert exc_info.value.status_code == status_code
 
     def test_stream_logs_not_decoded(self, caplog):
-        flexmock(Retry).new_instances(fake_retry)
         server = Openshift('http://oapi/v1/', 'v1', 'http://oauth/authorize',
-                           k8s_api_url='http://api/v1/')
+                           k8s_api_url='http://api/v1/', retry_policy=fake_retry)
 
         logs = (
             u'Lógs'.encode('utf-8'),
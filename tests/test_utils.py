@@ -11,8 +11,11 @@ import os.path
 import pytest
 import datetime
 import json
+import random
 import re
 import sys
+import threading
+import time
 from time import tzset
 from pkg_resources import parse_version
 
@@ -22,9 +25,15 @@ from osbs.utils import (buildconfig_update,
                         get_time_from_rfc3339, strip_registry_from_image,
                         TarWriter, TarReader, make_name_from_git, wrap_name_from_git,
                         get_instance_token_file_name, Labels, sanitize_version,
-                        has_triggers, split_module_spec)
-from osbs.exceptions import OsbsException, OsbsValidationException
+                        has_triggers, split_module_spec, graceful_chain_get,
+                        graceful_chain_get_copy, get_repo_info,
+                        fetch_git_files, read_git_files, run_in_parallel, run_concurrently,
+                        RateLimiter, RetryPolicy, RetryBudget, retry_on_conflict,
+                        retry_on_exception)
+from osbs.exceptions import OsbsException, OsbsValidationException, OsbsResponseException
 import osbs.kerberos_ccache
+from osbs.repo_utils import RepoInfoCache
+import subprocess
 
 
 BC_NAME_REGEX = r'^[a-z0-9]([-a-z0-9]*[a-z0-9])?(\.[a-z0-9]([-a-z0-9]*[a-z0-9])?)*$'
@@ -104,6 +113,29 @@ def test_trigger_removals(orig_ist, orig_other):
     assert not has_trigger(orig, 'ImageChange')
 
 
+@pytest.mark.parametrize(('path', 'expected'), [
+    (('a', 'b', 0), 'c'),
+    (('a', 'b', 1), None),
+    (('a', 'x'), None),
+    ((), {'a': {'b': ['c']}}),
+])
+def test_graceful_chain_get(path, expected):
+    d = {'a': {'b': ['c']}}
+    assert graceful_chain_get(d, *path) == expected
+    assert graceful_chain_get_copy(d, *path) == expected
+    assert graceful_chain_get(None, *path) is None
+
+
+def test_graceful_chain_get_copy():
+    d = {'a': {'b': ['c']}}
+    assert graceful_chain_get(d, 'a', 'b') is d['a']['b']
+
+    copied = graceful_chain_get_copy(d, 'a', 'b')
+    assert copied == ['c']
+    copied.append('d')
+    assert d == {'a': {'b': ['c']}}
+
+
 @pytest.mark.parametrize(('uri', 'humanish'), [
     ('http://git.example.com/git/repo.git/', 'repo'),
     ('http://git.example.com/git/repo.git', 'repo'),
@@ -523,3 +555,250 @@ class JsonMatcher(object):
         # Assert to provide a more meaningful error
         assert self.expected == json.loads(json_str)
         return self.expected == json.loads(json_str)
+
+
+@pytest.fixture
+def git_repo(tmpdir):
+    """
+    bare git repository with two commits, return (URI, [commits])
+    """
+    bare = str(tmpdir.join('repo.git'))
+    work = str(tmpdir.join('work'))
+
+    def git(*args):
+        cmd = ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+        return subprocess.check_output(cmd + list(args), cwd=work).decode('ascii').strip()
+
+    subprocess.check_call(['git', 'init', '-q', '--bare', bare])
+    subprocess.check_call(['git', 'init', '-q', work])
+    commits = []
+    for version in ('1', '2'):
+        tmpdir.join('work', 'Dockerfile').write('FROM fedora\nLABEL version=%s\n' % version)
+        tmpdir.join('work', 'additional-tags').write('tag%s\n' % version)
+        tmpdir.join('work', 'big-file').write('x' * 1000)
+        git('add', '.')
+        git('commit', '-q', '-m', version)
+        commits.append(git('rev-parse', 'HEAD'))
+    git('push', '-q', bare, 'HEAD:refs/heads/master')
+    return bare, commits
+
+
+def test_fetch_git_files(git_repo):
+    uri, commits = git_repo
+    commit, files = fetch_git_files(uri, 'master', ['Dockerfile', 'container.yaml'])
+    assert commit == commits[1]
+    assert files == {'Dockerfile': b'FROM fedora\nLABEL version=2\n'}
+
+    # abbreviated hash can't be fetched directly, history of branch is used
+    commit, files = fetch_git_files(uri, commits[0][:10], ['Dockerfile'], git_branch='master')
+    assert commit == commits[0]
+    assert files == {'Dockerfile': b'FROM fedora\nLABEL version=1\n'}
+
+    with pytest.raises(OsbsException):
+        fetch_git_files(uri, 'missing', ['Dockerfile'])
+
+
+def test_read_git_files_symlinks(tmpdir):
+    work = str(tmpdir)
+    tmpdir.mkdir('docker').join('Dockerfile').write('FROM fedora\n')
+    os.symlink('docker/Dockerfile', os.path.join(work, 'Dockerfile'))
+    os.symlink('/etc/passwd', os.path.join(work, 'outside'))
+    os.symlink('missing', os.path.join(work, 'dangling'))
+    subprocess.check_call(['git', 'init', '-q', work])
+    subprocess.check_call(['git', 'add', '.'], cwd=work)
+    subprocess.check_call(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com',
+                           'commit', '-q', '-m', 'links'], cwd=work)
+
+    files = read_git_files(work, 'HEAD', ['outside', 'dangling', 'Dockerfile', 'missing',
+                                          'docker/Dockerfile'])
+    assert files == {'Dockerfile': b'FROM fedora\n', 'docker/Dockerfile': b'FROM fedora\n'}
+
+
+@pytest.mark.parametrize('cached', [True, False])
+def test_get_repo_info(git_repo, tmpdir, cached):
+    uri, commits = git_repo
+    cache = RepoInfoCache(str(tmpdir.join('cache'))) if cached else None
+    repo_info = get_repo_info(uri, commits[0], git_branch='master', cache=cache)
+    assert repo_info.dockerfile_parser.labels == {'version': '1'}
+    assert repo_info.additional_tags.tags == ['tag1']
+
+    if cached:
+        (flexmock(osbs.utils)
+            .should_receive('fetch_git_files')
+            .never())
+    repo_info = get_repo_info(uri, commits[0], git_branch='master', cache=cache)
+    assert repo_info.dockerfile_parser.labels == {'version': '1'}
+
+
+def test_run_in_parallel():
+    started = []
+
+    def stage(name):
+        started.append(name)
+        return name.upper()
+
+    results, timings = run_in_parallel([('a', lambda: stage('a')), ('b', lambda: stage('b'))])
+    assert results == {'a': 'A', 'b': 'B'}
+    assert sorted(started) == ['a', 'b']
+    assert sorted(timings) == ['a', 'b']
+
+
+def test_run_in_parallel_error():
+    def fail(message):
+        raise ValueError(message)
+
+    finished = []
+    with pytest.raises(ValueError) as exc:
+        run_in_parallel([('a', lambda: finished.append('a')),
+                         ('b', lambda: fail('b')),
+                         ('c', lambda: fail('c'))])
+    # all stages ran, error of the first failed stage is raised
+    assert finished == ['a']
+    assert str(exc.value) == 'b'
+
+
+def test_run_concurrently():
+    def square(x):
+        if x == 3:
+            raise ValueError(x)
+        return x * x
+
+    results = sorted(run_concurrently(square, [1, 2, 3, 4], max_workers=2))
+    assert [(index, result) for index, result, _ in results] == [(0, 1), (1, 4), (2, None),
+                                                                 (3, 16)]
+    assert [exc_info is None for _, _, exc_info in results] == [True, True, False, True]
+    assert isinstance(results[2][2][1], ValueError)
+
+
+def test_run_concurrently_closed():
+    called = []
+    started = threading.Event()
+    closed = threading.Event()
+
+    def call(x):
+        called.append(x)
+        if x > 0:
+            started.set()
+            closed.wait()
+        return x
+
+    results = run_concurrently(call, list(range(100)), max_workers=1)
+    assert next(results)[0] == 0
+    started.wait()
+    results.close()
+    closed.set()
+    time.sleep(0.1)
+    # the call in progress finished, no other one started
+    assert called == [0, 1]
+
+
+def test_run_concurrently_rate_limited():
+    rate_limiter = RateLimiter(qps=1000)
+    flexmock(rate_limiter).should_receive('acquire').times(4).and_return(0)
+
+    results = sorted(run_concurrently(lambda x: x * x, [1, 2, 3, 4], max_workers=2,
+                                      rate_limiter=rate_limiter))
+    assert [result for _, result, _ in results] == [1, 4, 9, 16]
+
+
+def test_rate_limiter():
+    now = [100.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    flexmock(time).should_receive('time').replace_with(lambda: now[0])
+    flexmock(time).should_receive('sleep').replace_with(sleep)
+
+    limiter = RateLimiter(qps=2, burst=3)
+    # burst goes through without waiting
+    assert [limiter.acquire() for _ in range(3)] == [0, 0, 0]
+    assert slept == []
+    # then the rate applies
+    assert limiter.acquire() == pytest.approx(0.5)
+    # bucket refills while idle, but only up to burst
+    now[0] += 10
+    assert [limiter.acquire() for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire() == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize(('qps', 'burst'), [
+    (0, 1),
+    (-1, None),
+    (1, 0),
+])
+def test_rate_limiter_invalid(qps, burst):
+    with pytest.raises(OsbsValidationException):
+        RateLimiter(qps, burst)
+
+
+class TestRetryPolicy(object):
+    def test_delays_jittered_and_capped(self):
+        policy = RetryPolicy(max_retries=10, base_delay=2, max_delay=10, deadline=None,
+                             budget=RetryBudget())
+        flexmock(random).should_receive('uniform').replace_with(lambda low, high: high)
+        delays = [policy.next_delay(attempt, time.time()) for attempt in range(5)]
+        assert delays == [2, 4, 8, 10, 10]
+        assert policy.next_delay(10, time.time()) is None
+
+    def test_deadline(self):
+        policy = RetryPolicy(max_retries=10, base_delay=1, deadline=60, budget=RetryBudget())
+        assert policy.next_delay(0, time.time()) is not None
+        assert policy.next_delay(0, time.time() - 61) is None
+
+    def test_budget(self):
+        budget = RetryBudget(max_tokens=4, ratio=1)
+        policy = RetryPolicy(max_retries=10, base_delay=0, budget=budget)
+        assert policy.next_delay(0, time.time()) is not None
+        assert policy.next_delay(0, time.time()) is not None
+        # half of the budget is used up
+        assert policy.next_delay(0, time.time()) is None
+        policy.succeeded()
+        assert policy.next_delay(0, time.time()) is not None
+
+    def test_copy_shares_budget(self):
+        policy = RetryPolicy(max_retries=1, base_delay=1)
+        copied = policy.copy(max_retries=3)
+        assert copied.max_retries == 3
+        assert copied.base_delay == 1
+        assert copied.budget is policy.budget
+
+    @pytest.mark.parametrize(('status_codes', 'calls', 'should_raise'), [
+        ([409, 409, 200], 3, False),
+        ([409, 409, 409, 409], 3, True),
+        ([404], 1, True),
+    ])
+    def test_retry_on_conflict(self, status_codes, calls, should_raise):
+        flexmock(time).should_receive('sleep')
+        statuses = iter(status_codes)
+        called = []
+
+        @retry_on_conflict(policy=RetryPolicy(max_retries=2, base_delay=1))
+        def update():
+            called.append(1)
+            status_code = next(statuses)
+            if status_code != 200:
+                raise OsbsResponseException('failed', status_code)
+            return status_code
+
+        if should_raise:
+            with pytest.raises(OsbsResponseException):
+                update()
+        else:
+            assert update() == 200
+        assert len(called) == calls
+
+    def test_retry_on_exception(self):
+        flexmock(time).should_receive('sleep').once()
+        results = iter([ValueError('first'), 'ok'])
+
+        @retry_on_exception(ValueError, policy=RetryPolicy(max_retries=1, base_delay=1))
+        def call():
+            result = next(results)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        assert call() == 'ok'
@@ -0,0 +1,130 @@
+#!/usr/bin/python
+"""
+Copyright (c) 2018 Red Hat, Inc
+All rights reserved.
+
+This software may be modified and distributed under the terms
+of the BSD license. See the LICENSE file for details.
+
+
+Measure how fast a namespace-wide watch stream is decoded while waiting for
+a few builds.
+
+The "before" run guesses the encoding, decodes and parses every event, as
+watch_resource used to; the "after" run uses WatchEventDecoder, which skips
+events of other builds before parsing them.
+
+A recorded watch stream, one event per line, can be used instead of the
+generated one, e.g. one saved with
+
+    $ curl -H "Authorization: Bearer $TOKEN" \\
+        "$OPENSHIFT/oapi/v1/watch/namespaces/$NAMESPACE/builds/?timeoutSeconds=600" \\
+        > watch.jsonl
+    $ python tests/watch-events-benchmark.py --stream watch.jsonl --name BUILD_NAME
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import argparse
+import copy
+import json
+import logging
+import os
+import sys
+import time
+
+from requests.utils import guess_json_utf
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from osbs.core import WatchEventDecoder  # noqa:E402
+from tests.constants import TEST_BUILD  # noqa:E402
+
+BUILD_JSON = os.path.join(os.path.dirname(__file__), 'mock_jsons', '1.0.4',
+                          'build_%s.json' % TEST_BUILD)
+
+
+def make_stream(events, builds):
+    with open(BUILD_JSON) as fp:
+        build_json = json.load(fp)
+
+    lines = []
+    for i in range(events):
+        build = copy.deepcopy(build_json)
+        build['metadata']['name'] = 'build-%d' % (i % builds)
+        build['metadata']['resourceVersion'] = str(i)
+        # the way the API server serializes events: compact, type first
+        line = '{"type":"MODIFIED","object":%s}' % json.dumps(build, separators=(',', ':'))
+        lines.append(line.encode('utf-8'))
+    return lines
+
+
+def load_stream(path):
+    with open(path, 'rb') as fp:
+        return [line.rstrip(b'\n') for line in fp if line.strip()]
+
+
+def decode_all(lines, names):
+    # watch_resource before WatchEventDecoder
+    encoding = None
+    for line in lines:
+        if not encoding:
+            encoding = guess_json_utf(line)
+        j = json.loads(line.decode(encoding))
+        if j['object']['metadata']['name'] not in names:
+            continue
+
+
+def decode_skipping(lines, names):
+    decoder = WatchEventDecoder(names=names)
+    for line in lines:
+        if decoder.skip(line):
+            continue
+        changetype, obj = decoder.decode(line)
+        if obj['metadata']['name'] not in names:
+            continue
+
+
+def run(func, lines, names, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        func(lines, names)
+        took = time.time() - start
+        best = took if best is None else min(best, took)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark decoding of watch events")
+    parser.add_argument("--stream", metavar="FILE",
+                        help="recorded watch stream to use, one event per line")
+    parser.add_argument("--name", action="append", dest="names",
+                        help="name of build waited for (may be repeated)")
+    parser.add_argument("--events", type=int, default=10000,
+                        help="number of generated events")
+    parser.add_argument("--builds", type=int, default=500,
+                        help="number of builds in generated events")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="take the best of this many runs")
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    if args.stream:
+        lines = load_stream(args.stream)
+    else:
+        lines = make_stream(args.events, args.builds)
+    names = set(args.names or ['build-0'])
+    megabytes = sum(len(line) + 1 for line in lines) / (1024.0 * 1024)
+
+    before = run(decode_all, lines, names, args.repeat)
+    after = run(decode_skipping, lines, names, args.repeat)
+
+    print("watch stream, %d events, %.1f MB, waiting for %d builds (best of %d)" %
+          (len(lines), megabytes, len(names), args.repeat))
+    print("  before (parse every event): %8.0f events/s" % (len(lines) / before))
+    print("  after  (skip other builds): %8.0f events/s" % (len(lines) / after))
+    print("  speedup:                    %8.1fx" % (before / after))
+
+
+if __name__ == '__main__':
+    main()